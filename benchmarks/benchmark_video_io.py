@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+'''
+Benchmarks the throughput of the video I/O layer in `eta.core.video`.
+
+Synthetic videos are generated offline with ffmpeg's `testsrc` source at a
+range of resolutions, and each benchmark is run in a fresh process so that
+its peak memory usage can be measured in isolation. For each benchmark, the
+following metrics are reported:
+    - frames: the number of frames processed
+    - seconds: the wall-clock time
+    - fps: the number of frames processed per second
+    - mb_per_sec: the number of megabytes of decoded (RGB) frames processed
+        per second
+    - cpu_ms_per_frame: the CPU time (user + system) spent per frame by the
+        benchmark process and any ffmpeg processes that it spawned
+    - peak_rss_mb: the peak resident memory of the benchmark process
+    - child_peak_rss_mb: the peak resident memory of the largest process
+        spawned by the benchmark (e.g., ffmpeg)
+
+The results are written as JSON, and the results of a previous run can be
+passed via `--compare` to print the relative speed of each benchmark.
+
+Example usage:
+    # Benchmark 240p and 1080p videos
+    python benchmark_video_io.py --resolutions 240p 1080p \
+        --output results.json
+
+    # Compare against a previous run
+    python benchmark_video_io.py --compare baseline.json
+
+Copyright 2017-2018, Voxel51, LLC
+voxel51.com
+'''
+# pragma pylint: disable=redefined-builtin
+# pragma pylint: disable=unused-wildcard-import
+# pragma pylint: disable=wildcard-import
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import *
+# pragma pylint: enable=redefined-builtin
+# pragma pylint: enable=unused-wildcard-import
+# pragma pylint: enable=wildcard-import
+
+import argparse
+from collections import OrderedDict
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+
+import eta
+import eta.core.serial as etas
+import eta.core.utils as etau
+import eta.core.video as etav
+
+
+logger = logging.getLogger(__name__)
+
+
+# The supported resolutions, as (width, height)
+RESOLUTIONS = OrderedDict([
+    ("240p", (426, 240)),
+    ("480p", (854, 480)),
+    ("720p", (1280, 720)),
+    ("1080p", (1920, 1080)),
+    ("2160p", (3840, 2160)),
+])
+
+# The stride between frames in the sparse frame range benchmarks
+SPARSE_STRIDE = 30
+
+# The number of distinct decoded frames that the writer benchmarks cycle
+# through, which bounds their memory usage
+WRITE_POOL_SIZE = 30
+
+
+###### Benchmarks #############################################################
+
+
+def _read_ffmpeg_dense(video_path, frames):
+    return _read(etav.FFmpegVideoReader(video_path))
+
+
+def _read_ffmpeg_sparse(video_path, frames):
+    return _read(etav.FFmpegVideoReader(video_path, frames=frames))
+
+
+def _read_opencv_dense(video_path, frames):
+    return _read(etav.OpenCVVideoReader(video_path))
+
+
+def _read_opencv_sparse(video_path, frames):
+    return _read(etav.OpenCVVideoReader(video_path, frames=frames))
+
+
+def _read_auto_dense(video_path, frames):
+    return _read(etav.VideoReader.open(video_path))
+
+
+def _read_auto_sparse(video_path, frames):
+    return _read(etav.VideoReader.open(video_path, frames=frames))
+
+
+def _read(reader):
+    num_frames = 0
+    num_bytes = 0
+    with reader as r:
+        for img in r:
+            num_frames += 1
+            num_bytes += img.nbytes
+    return num_frames, num_bytes
+
+
+def _write_ffmpeg(video_path, frames):
+    return _write(video_path, etav.FFmpegVideoWriter)
+
+
+def _write_opencv(video_path, frames):
+    return _write(video_path, etav.OpenCVVideoWriter)
+
+
+def _write(video_path, writer_cls):
+    # Decode a small pool of frames up-front so that only the writer is timed
+    # without holding the entire decoded video in memory
+    num_frames = etav.get_frame_count(video_path)
+    with etav.FFmpegVideoReader(
+            video_path, frames="1-%d" % min(WRITE_POOL_SIZE, num_frames)) as r:
+        imgs = [img for img in r]
+        fps = r.frame_rate
+        size = r.frame_size
+
+    with etau.TempDir() as d:
+        outpath = os.path.join(d, "out.mp4")
+        start = _usage()
+        with writer_cls(outpath, fps, size) as w:
+            for idx in range(num_frames):
+                w.write(imgs[idx % len(imgs)])
+
+        # Exclude the decoding above from the measurements
+        return num_frames, num_frames * imgs[0].nbytes, start
+
+
+def _video_processor(video_path, frames):
+    num_frames = 0
+    num_bytes = 0
+    with etau.TempDir() as d:
+        outpath = os.path.join(d, "out.mp4")
+        with etav.VideoProcessor(video_path, out_video_path=outpath) as p:
+            for img in p:
+                p.write(img)
+                num_frames += 1
+                num_bytes += img.nbytes
+    return num_frames, num_bytes
+
+
+def _sample_first_frames(video_path, frames):
+    return _sample(etav.sample_first_frames(video_path, 16))
+
+
+def _uniformly_sample_frames(video_path, frames):
+    return _sample(etav.uniformly_sample_frames(video_path, 16))
+
+
+def _sliding_window_sample_frames(video_path, frames):
+    num_frames = 0
+    num_bytes = 0
+    for clips in etav.iter_sliding_window_clips(video_path, 16, 8):
+        num_frames += clips.shape[0] * clips.shape[1]
+        num_bytes += clips.nbytes
+    return num_frames, num_bytes
+
+
+def _sample(imgs):
+    return len(imgs), imgs.nbytes
+
+
+def _ffmpeg_run(video_path, frames):
+    num_frames = etav.get_frame_count(video_path)
+    width, height = etav.get_frame_size(video_path)
+    with etau.TempDir() as d:
+        outpath = os.path.join(d, "out.mp4")
+        etav.FFmpeg(size=(width // 2, -1)).run(video_path, outpath)
+    return num_frames, num_frames * width * height * 3
+
+
+# The available benchmarks
+BENCHMARKS = OrderedDict([
+    ("read_ffmpeg_dense", _read_ffmpeg_dense),
+    ("read_ffmpeg_sparse", _read_ffmpeg_sparse),
+    ("read_opencv_dense", _read_opencv_dense),
+    ("read_opencv_sparse", _read_opencv_sparse),
+    ("read_auto_dense", _read_auto_dense),
+    ("read_auto_sparse", _read_auto_sparse),
+    ("write_ffmpeg", _write_ffmpeg),
+    ("write_opencv", _write_opencv),
+    ("video_processor", _video_processor),
+    ("sample_first_frames", _sample_first_frames),
+    ("uniformly_sample_frames", _uniformly_sample_frames),
+    ("sliding_window_sample_frames", _sliding_window_sample_frames),
+    ("ffmpeg_run", _ffmpeg_run),
+])
+
+
+###### Harness ################################################################
+
+
+def make_test_video(outpath, size, fps, duration):
+    '''Generates a synthetic video with ffmpeg's `testsrc` source.
+
+    Args:
+        outpath: the output video path
+        size: the (width, height) of the video
+        fps: the frame rate of the video
+        duration: the duration of the video, in seconds
+    '''
+    ffmpeg = etav.FFmpeg(
+        in_opts=["-f", "lavfi"],
+        out_opts=etav.get_encoding_profile_opts("delivery"))
+    ffmpeg.run(
+        "testsrc=size=%dx%d:rate=%g:duration=%g" % (size + (fps, duration)),
+        outpath)
+
+
+def run_benchmark(name, video_path, frames):
+    '''Runs the given benchmark in a new process.
+
+    Args:
+        name: the name of the benchmark
+        video_path: the input video path
+        frames: the frames string to use for sparse benchmarks
+
+    Returns:
+        a dictionary of metrics
+    '''
+    pool = multiprocessing.Pool(1)
+    try:
+        return pool.apply(_run_benchmark, (name, video_path, frames))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _run_benchmark(name, video_path, frames):
+    start = _usage()
+    out = BENCHMARKS[name](video_path, frames)
+    end = _usage()
+
+    num_frames, num_bytes = out[:2]
+    if len(out) > 2:
+        # The benchmark reported its own start point
+        start = out[2]
+
+    seconds = end["time"] - start["time"]
+    cpu_ms = 1000.0 * (end["cpu"] - start["cpu"])
+    return OrderedDict([
+        ("frames", num_frames),
+        ("seconds", seconds),
+        ("fps", num_frames / seconds if seconds else None),
+        ("mb_per_sec", num_bytes / 2.0 ** 20 / seconds if seconds else None),
+        ("cpu_ms_per_frame", cpu_ms / num_frames if num_frames else None),
+        ("peak_rss_mb", end["rss"]),
+        ("child_peak_rss_mb", end["child_rss"]),
+    ])
+
+
+def _usage():
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    rss_scale = 2.0 ** -20 if sys.platform == "darwin" else 2.0 ** -10
+    return {
+        "time": time.time(),
+        "cpu": (
+            self_usage.ru_utime + self_usage.ru_stime +
+            child_usage.ru_utime + child_usage.ru_stime),
+        "rss": self_usage.ru_maxrss * rss_scale,
+        "child_rss": child_usage.ru_maxrss * rss_scale,
+    }
+
+
+def compare(results, baseline):
+    '''Prints the speed of each benchmark relative to a baseline run.
+
+    Args:
+        results: a results dictionary
+        baseline: a baseline results dictionary
+    '''
+    print("%-30s %-6s %10s %10s %8s" % (
+        "benchmark", "res", "fps", "base fps", "speedup"))
+    for res, benchmarks in results["results"].items():
+        for name, metrics in benchmarks.items():
+            try:
+                base_fps = baseline["results"][res][name]["fps"]
+            except KeyError:
+                continue
+            fps = metrics["fps"]
+            if not fps or not base_fps:
+                continue
+            print("%-30s %-6s %10.1f %10.1f %7.2fx" % (
+                name, res, fps, base_fps, fps / base_fps))
+
+
+def main(args):
+    '''Runs the benchmarks.'''
+    names = args.benchmarks or list(BENCHMARKS.keys())
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError("Unknown benchmark '%s'" % name)
+
+    results = OrderedDict([
+        ("eta_version", eta.version),
+        ("timestamp", etau.get_isotime()),
+        ("platform", platform.platform()),
+        ("python", platform.python_version()),
+        ("cpu_count", multiprocessing.cpu_count()),
+        ("fps", args.fps),
+        ("duration", args.duration),
+        ("results", OrderedDict()),
+    ])
+
+    with etau.TempDir() as d:
+        for res in args.resolutions:
+            if res not in RESOLUTIONS:
+                raise ValueError("Unknown resolution '%s'" % res)
+
+            video_path = os.path.join(d, "testsrc-%s.mp4" % res)
+            logger.info("Generating %s test video", res)
+            make_test_video(
+                video_path, RESOLUTIONS[res], args.fps, args.duration)
+
+            num_frames = etav.get_frame_count(video_path)
+            frames = ",".join(
+                str(f) for f in range(1, num_frames + 1, SPARSE_STRIDE))
+
+            results["results"][res] = OrderedDict()
+            for name in names:
+                logger.info("Running %s on %s video", name, res)
+                metrics = run_benchmark(name, video_path, frames)
+                results["results"][res][name] = metrics
+                logger.info(
+                    "%s (%s): %.1f frames/s, %.1f MB/s", name, res,
+                    metrics["fps"] or 0, metrics["mb_per_sec"] or 0)
+
+    if args.output:
+        etas.write_json(results, args.output)
+        logger.info("Results written to '%s'", args.output)
+    else:
+        print(etas.json_to_str(results))
+
+    if args.compare:
+        compare(results, etas.read_json(args.compare))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the video I/O layer of ETA.")
+    parser.add_argument(
+        "--resolutions", nargs="+", default=list(RESOLUTIONS.keys()),
+        help="the resolutions to benchmark, from %s" % list(RESOLUTIONS))
+    parser.add_argument(
+        "--benchmarks", nargs="+", default=None,
+        help="the benchmarks to run, from %s. By default, all are run" %
+        list(BENCHMARKS))
+    parser.add_argument(
+        "--fps", type=float, default=30,
+        help="the frame rate of the test videos")
+    parser.add_argument(
+        "--duration", type=float, default=10,
+        help="the duration of the test videos, in seconds")
+    parser.add_argument(
+        "--output", default=None,
+        help="a path to which to write the JSON results. By default, the "
+        "results are printed")
+    parser.add_argument(
+        "--compare", default=None,
+        help="the path to the JSON results of a previous run to compare with")
+    main(parser.parse_args())
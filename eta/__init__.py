@@ -66,6 +66,28 @@ class ETAConfig(EnvConfig):
         self.default_video_ext = self.parse_string(
             d, "default_video_ext", env_var="ETA_DEFAULT_VIDEO_EXT",
             default=".mp4")
+        self.video_encoding_profile = self.parse_string(
+            d, "video_encoding_profile", env_var="ETA_VIDEO_ENCODING_PROFILE",
+            default="delivery")
+        self.intermediate_video_encoding_profile = self.parse_string(
+            d, "intermediate_video_encoding_profile",
+            env_var="ETA_INTERMEDIATE_VIDEO_ENCODING_PROFILE",
+            default="intermediate")
+        self.stream_info_cache_size = int(self.parse_number(
+            d, "stream_info_cache_size", env_var="ETA_STREAM_INFO_CACHE_SIZE",
+            default=1024))
+        self.stream_info_cache_dir = self.parse_string(
+            d, "stream_info_cache_dir", env_var="ETA_STREAM_INFO_CACHE_DIR",
+            default="")
+        self.use_keyframe_index = self.parse_bool(
+            d, "use_keyframe_index", env_var="ETA_USE_KEYFRAME_INDEX",
+            default=False)
+        self.keyframe_index_dir = self.parse_string(
+            d, "keyframe_index_dir", env_var="ETA_KEYFRAME_INDEX_DIR",
+            default="")
+        self.video_reader_calibration_path = self.parse_string(
+            d, "video_reader_calibration_path",
+            env_var="ETA_VIDEO_READER_CALIBRATION_PATH", default="")
 
 
 def set_config_settings(**kwargs):
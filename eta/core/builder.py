@@ -525,11 +525,19 @@ class PipelineBuilder(object):
         pipeline_config.write_json(self.pipeline_config_path)
 
     def _build_module_configs(self):
+        published_paths = set(p for p in itervalues(self.request.outputs) if p)
         for module in self.execution_order:
+            # Modules whose outputs are all unpublished can use cheaper
+            # intermediate encodings
+            intermediate_outputs = not any(
+                p in published_paths
+                for p in itervalues(self.module_outputs[module]))
+
             # Build module config
             data = etau.join_dicts(
                 self.module_inputs[module], self.module_outputs[module])
             module_config = (etam.GenericModuleConfig.builder()
+                .set(base={"intermediate_outputs": intermediate_outputs})
                 .set(data=[data])
                 .set(parameters=self.module_parameters[module])
                 .validate())
@@ -246,6 +246,8 @@ class C3DFeaturizerConfig(C3DConfig):
         sample_method: the frame sampling method to use. The possible values
             are "first", "uniform", and "sliding_window"
         stride: the stride to use when the sampling method is "sliding_window"
+        batch_size: the maximum number of clips to feed through the network
+            at once when the sampling method is "sliding_window"
     '''
 
     def __init__(self, d):
@@ -253,6 +255,8 @@ class C3DFeaturizerConfig(C3DConfig):
         self.sample_method = self.parse_string(
             d, "sample_method", default="sliding_window")
         self.stride = self.parse_number(d, "stride", default=8)
+        self.batch_size = self.parse_number(
+            d, "batch_size", default=etav.DEFAULT_CLIP_BATCH_SIZE)
 
 
 class C3DFeaturizer(Featurizer):
@@ -289,32 +293,50 @@ class C3DFeaturizer(Featurizer):
 
         Returns:
             the feature vector, a 1D array of length 4096
-        '''
-        clips = self._sample_clips(video_path)
-
-        features = self.c3d.evaluate(clips, layer=self.c3d.fc2l)
-        if self.config.sample_method == "sliding_window":
-            # Average over sliding window clips
-            features = np.mean(features, axis=0)
-            features /= np.linalg.norm(features)
-        else:
-            features = features.reshape(-1)
 
+        Raises:
+            C3DFeaturizerError: if the sample method is "sliding_window" and
+                the video has fewer than 16 frames
+        '''
+        if self.config.sample_method != "sliding_window":
+            clips = self._sample_clips(video_path)
+            return self.c3d.evaluate(clips, layer=self.c3d.fc2l).reshape(-1)
+
+        # Average over sliding window clips, one batch at a time
+        features = np.zeros(self.dim())
+        num_clips = 0
+        for clips in etav.iter_sliding_window_clips(
+                video_path, 16, self.config.stride, size=(112, 112),
+                batch_size=self.config.batch_size):
+            batch_features = self.c3d.evaluate(clips, layer=self.c3d.fc2l)
+            features += np.sum(batch_features, axis=0)
+            num_clips += len(batch_features)
+
+        if num_clips == 0:
+            raise C3DFeaturizerError(
+                "Video '%s' has fewer than 16 frames, so no sliding window "
+                "clips can be sampled from it" % video_path)
+
+        features /= num_clips
+        features /= np.linalg.norm(features)
         return features
 
     def _sample_clips(self, video_path):
         sample_method = self.config.sample_method
-        stride = self.config.stride
         size = (112, 112)
 
         if sample_method == "first":
             clips = [etav.sample_first_frames(video_path, 16, size=size)]
         elif sample_method == "uniform":
             clips = [etav.uniformly_sample_frames(video_path, 16, size=size)]
-        elif sample_method == "sliding_window":
-            clips = etav.sliding_window_sample_frames(
-                video_path, 16, stride, size=size)
         else:
             raise ValueError("Invalid sample_method '%s'" % sample_method)
 
         return clips
+
+
+class C3DFeaturizerError(Exception):
+    '''Exception raised when a C3DFeaturizer is unable to featurize a
+    video.
+    '''
+    pass
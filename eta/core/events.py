@@ -29,6 +29,7 @@ import collections
 import numpy as np
 
 from eta.core.config import Config, Configurable
+from eta.core.frames import FrameSet
 from eta.core.serial import Serializable
 
 
@@ -70,6 +71,21 @@ class EventSeries(Serializable):
         '''Converts the EventSeries to a string.'''
         return ",".join([e.to_str() for e in self.events])
 
+    def to_frame_set(self):
+        '''Converts the EventSeries to a FrameSet containing the frames of
+        all events.
+        '''
+        return FrameSet(
+            [e.start for e in self.events], [e.stop for e in self.events])
+
+    @classmethod
+    def from_frame_set(cls, frame_set):
+        '''Constructs an EventSeries with one event per range of the given
+        FrameSet.
+        '''
+        return cls(events=[
+            Event(start, stop) for start, stop in frame_set.iter_ranges()])
+
     @classmethod
     def from_dict(cls, d):
         '''Constructs an EventSeries from a JSON dictionary.'''
@@ -104,20 +120,13 @@ class EventDetection(Serializable):
 
     def to_series(self):
         '''Converts the EventDetection into an EventSeries.'''
-        events = EventSeries()
-        start = None
-        in_event = False
-        for idx, b in enumerate(self.bools, 1):
-            if in_event:
-                if not b:
-                    events.add(Event(start, idx - 1))
-                    in_event = False
-            elif b:
-                start = idx
-                in_event = True
-        if in_event:
-            events.add(Event(start, len(self.bools)))
-        return events
+        return EventSeries.from_frame_set(self.to_frame_set())
+
+    def to_frame_set(self):
+        '''Converts the EventDetection into a FrameSet containing the
+        detected frames.
+        '''
+        return FrameSet.from_bools(self.bools)
 
     @classmethod
     def from_dict(cls, d):
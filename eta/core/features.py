@@ -20,7 +20,6 @@ import six
 # pragma pylint: enable=unused-wildcard-import
 # pragma pylint: enable=wildcard-import
 
-import errno
 import logging
 import os
 import shutil
@@ -28,9 +27,19 @@ import tempfile
 
 import cv2
 import numpy as np
-
-from eta.core.config import Config, Configurable
+try:
+    import lz4.frame as lz4f
+except ImportError:
+    lz4f = None
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+from eta.core.config import Config, ConfigError, Configurable
+from eta.core.frames import FrameSet
 from eta.core.numutils import GrowableArray
+import eta.core.serial as etas
 import eta.core.utils as etau
 import eta.core.types as etat
 import eta.core.video as etav
@@ -71,7 +80,9 @@ class Featurizer(Configurable):
 
     Subclasses of Featurizer must implement the `dim()` and `_featurize()`
     methods, and if necessary, should also implement the `_start()` and
-    `_stop()` methods.
+    `_stop()` methods. Subclasses that can featurize multiple inputs more
+    efficiently at once, e.g., in a single network evaluation, should also
+    implement the `_featurize_batch()` method.
 
     Subclasses must call the superclass constructor defined by this base class.
 
@@ -185,6 +196,36 @@ class Featurizer(Configurable):
         '''
         raise NotImplementedError("subclass must implement _featurize()")
 
+    def featurize_batch(self, data_list):
+        '''Featurizes a batch of input data.
+
+        Args:
+            data_list: a list of data to featurize
+
+        Returns:
+            a list of feature vectors, one per element of data_list
+        '''
+        self.start(warn_on_restart=False, keep_alive=False)
+        fvs = self._featurize_batch(data_list)
+        if self._keep_alive is False:
+            self.stop()
+
+        return fvs
+
+    def _featurize_batch(self, data_list):
+        '''The backend implementation of the batch feature extraction
+        routine. By default, `_featurize()` is called on each element of the
+        batch. Subclasses can override this method to featurize batches more
+        efficiently.
+
+        Args:
+            data_list: a list of data to featurize
+
+        Returns:
+            a list of feature vectors, one per element of data_list
+        '''
+        return [self._featurize(data) for data in data_list]
+
 
 class CanFeaturize(object):
     '''Mixin class that exposes the ability to featurize data just-in-time via
@@ -367,12 +408,568 @@ class FeaturizedFrameNotFoundError(OSError):
     pass
 
 
+# The name of the JSON file in which FeatureStores record their layout
+FEATURES_METADATA_FILENAME = "features.json"
+
+
+class FeatureStore(object):
+    '''Base class for stores of per-frame features on disk.
+
+    All frame numbers are 1-based.
+    '''
+
+    def __init__(self, path):
+        '''Creates a FeatureStore in the given directory.
+
+        Args:
+            path: the backing directory of the store, which is created if
+                necessary
+        '''
+        self.path = path
+        etau.ensure_dir(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def is_featurized(self, frame_number):
+        '''Determines whether the features of the given frame are stored.'''
+        raise NotImplementedError("subclass must implement is_featurized()")
+
+    def get_featurized_frames(self):
+        '''Returns a FrameSet of the frames whose features are stored.'''
+        raise NotImplementedError(
+            "subclass must implement get_featurized_frames()")
+
+    def get(self, frame_number):
+        '''Gets the features of the given frame.
+
+        Args:
+            frame_number: the frame number
+
+        Returns:
+            the feature vector
+
+        Raises:
+            FeaturizedFrameNotFoundError: if the frame is not featurized
+        '''
+        raise NotImplementedError("subclass must implement get()")
+
+    def get_frames(self, frame_numbers):
+        '''Gets the features of the given frames.
+
+        Args:
+            frame_numbers: an iterable of frame numbers
+
+        Returns:
+            a (# frames) x (# dims) array of features
+
+        Raises:
+            FeaturizedFrameNotFoundError: if any frame is not featurized
+        '''
+        return np.array([self.get(f) for f in frame_numbers])
+
+    def get_range(self, first, last):
+        '''Gets the features of the frames in [first, last].
+
+        Args:
+            first: the first frame number
+            last: the last frame number
+
+        Returns:
+            a (# frames) x (# dims) array of features
+
+        Raises:
+            FeaturizedFrameNotFoundError: if any frame is not featurized
+        '''
+        return self.get_frames(range(first, last + 1))
+
+    def put(self, frame_number, v):
+        '''Stores the features of the given frame.
+
+        Args:
+            frame_number: the frame number
+            v: the feature vector
+        '''
+        raise NotImplementedError("subclass must implement put()")
+
+    def as_stored(self, v):
+        '''Returns the given feature vector as get() would return it after
+        it was stored, e.g., with any quantization applied.
+
+        Args:
+            v: the feature vector
+
+        Returns:
+            the feature vector
+        '''
+        return v
+
+    def flush(self):
+        '''Ensures that all stored features have been written to disk.'''
+        pass
+
+    def clear(self):
+        '''Deletes all stored features. The backing directory itself is not
+        deleted.
+        '''
+        raise NotImplementedError("subclass must implement clear()")
+
+    def close(self):
+        '''Flushes the store and releases any open resources.'''
+        self.flush()
+
+
+class FeatureStoreError(Exception):
+    '''Exception raised when an invalid FeatureStore operation is
+    performed.
+    '''
+    pass
+
+
+# The supported formats of NpzFeatureStore and their file extensions
+FEATURE_FILE_FORMATS = {
+    "npz_compressed": ".npz",
+    "npz": ".npz",
+    "npy": ".npy",
+    "lz4": ".lz4",
+    "zstd": ".zst",
+}
+
+
+class NpzFeatureStore(FeatureStore):
+    '''FeatureStore that writes the features of each frame to a separate file
+    in the backing directory, indexed by frame number.
+
+    The following file formats are supported:
+
+        "npz_compressed" (default)
+            compressed `.npz` files
+
+        "npz"
+            uncompressed `.npz` files
+
+        "npy"
+            raw `.npy` files, which are the fastest to read and write
+
+        "lz4"
+            LZ4-compressed raw arrays. Requires the `lz4` package
+
+        "zstd"
+            Zstandard-compressed raw arrays. Requires the `zstandard` package
+
+    The format, data type, and dimension of the features are recorded in a
+    JSON metadata file when the first frame is stored, and the recorded
+    values take precedence when an existing store is opened, so readers need
+    not know how the features were written. When no format is specified,
+    directories of `.npz` files without metadata are read as
+    "npz_compressed".
+    '''
+
+    # The pattern of the features files, indexed by frame number, without
+    # their extension
+    FRAME_PATT = "%08d"
+
+    def __init__(self, path, format=None, dtype=None):
+        '''Creates an NpzFeatureStore in the given directory.
+
+        Args:
+            path: the backing directory of the store
+            format: the file format to use for new stores, from
+                FEATURE_FILE_FORMATS. The default is "npz_compressed"
+            dtype: an optional data type in which to store the features, for
+                example, "float16" to halve the size of float32 features. By
+                default, the data type of the first stored feature vector is
+                used
+
+        Raises:
+            FeatureStoreError: if the format is not supported, or if the
+                directory contains a different kind of store
+        '''
+        super(NpzFeatureStore, self).__init__(path)
+        self.format = format
+        self.dtype = np.dtype(dtype) if dtype is not None else None
+        self._dim = None
+
+        metadata = self._read_metadata()
+        if metadata is not None:
+            if metadata["format"] not in FEATURE_FILE_FORMATS:
+                raise FeatureStoreError(
+                    "'%s' does not contain an NpzFeatureStore" % path)
+            self._use_metadata(metadata)
+        elif not format:
+            self.format = "npz_compressed"
+
+        if self.format not in FEATURE_FILE_FORMATS:
+            raise FeatureStoreError(
+                "Unsupported format '%s'; supported values are %s" % (
+                    self.format, sorted(FEATURE_FILE_FORMATS)))
+        _check_codec(self.format)
+
+    def get_path(self, frame_number):
+        '''Returns the path of the features file for the given frame.'''
+        return os.path.join(
+            self.path,
+            self.FRAME_PATT % frame_number + FEATURE_FILE_FORMATS[self.format])
+
+    def is_featurized(self, frame_number):
+        return os.path.isfile(self.get_path(frame_number))
+
+    def get_featurized_frames(self):
+        ext = FEATURE_FILE_FORMATS[self.format]
+        return FrameSet.from_list([
+            int(os.path.splitext(f)[0]) for f in self._list_files()
+            if f.endswith(ext)])
+
+    def get(self, frame_number):
+        path = self.get_path(frame_number)
+        if not os.path.isfile(path):
+            raise FeaturizedFrameNotFoundError(
+                "Feature %d not found at '%s'" % (frame_number, path))
+
+        if self.format in ("npz_compressed", "npz"):
+            with np.load(path) as d:
+                v = d["v"]
+        elif self.format == "npy":
+            v = np.load(path)
+        else:
+            with open(path, "rb") as f:
+                v = np.frombuffer(
+                    _decompress(self.format, f.read()), dtype=self.dtype)
+
+        return _dequantize(v)
+
+    def put(self, frame_number, v):
+        v = np.asarray(v)
+        if self._dim is None:
+            self._write_metadata(v)
+        v = v.astype(self.dtype, copy=False)
+
+        path = self.get_path(frame_number)
+        if self.format == "npz_compressed":
+            np.savez_compressed(path, v=v)
+        elif self.format == "npz":
+            np.savez(path, v=v)
+        elif self.format == "npy":
+            np.save(path, v)
+        else:
+            with open(path, "wb") as f:
+                f.write(_compress(self.format, v.tobytes()))
+
+    def as_stored(self, v):
+        if self.dtype is None:
+            return v
+        return _dequantize(np.asarray(v).astype(self.dtype, copy=False))
+
+    def clear(self):
+        for f in self._list_files():
+            os.remove(os.path.join(self.path, f))
+
+        metadata_path = os.path.join(self.path, FEATURES_METADATA_FILENAME)
+        if os.path.isfile(metadata_path):
+            os.remove(metadata_path)
+        self._dim = None
+
+    def _list_files(self):
+        exts = set(FEATURE_FILE_FORMATS.values())
+        return [
+            f for f in os.listdir(self.path)
+            if os.path.splitext(f)[1] in exts and
+            os.path.splitext(f)[0].isdigit()]
+
+    def _read_metadata(self):
+        metadata_path = os.path.join(self.path, FEATURES_METADATA_FILENAME)
+        if not os.path.isfile(metadata_path):
+            return None
+        return etas.read_json(metadata_path)
+
+    def _use_metadata(self, metadata):
+        if (self.format and metadata["format"] != self.format) or (
+                self.dtype is not None and
+                np.dtype(metadata["dtype"]) != self.dtype):
+            logger.warning(
+                "Using the recorded format '%s' and dtype '%s' of the "
+                "existing features in '%s'", metadata["format"],
+                metadata["dtype"], self.path)
+        self.format = metadata["format"]
+        self.dtype = np.dtype(metadata["dtype"])
+        self._dim = metadata["dim"]
+
+    def _write_metadata(self, v):
+        if self.dtype is None:
+            self.dtype = v.dtype
+        self._dim = v.size
+        etas.write_json(
+            {"format": self.format, "dtype": self.dtype.str, "dim": v.size},
+            os.path.join(self.path, FEATURES_METADATA_FILENAME))
+
+
+class ChunkedFeatureStore(FeatureStore):
+    '''FeatureStore that appends the features of all frames to a single
+    file of fixed-size records in the backing directory.
+
+    Each record contains a frame number followed by its feature vector.
+    Records are only ever appended, so, if a frame is stored again, its
+    newest record supersedes the older ones, and a record that was partially
+    written when a process crashed is discarded the next time the store is
+    opened. The records are memory-mapped for reading, and an in-memory index
+    from frame numbers to records makes lookups O(1).
+
+    The dimension and data type of the features are recorded in a JSON
+    metadata file alongside the records when the first frame is stored.
+    Features stored as float16 are returned as float32.
+    '''
+
+    # The name of the records file in the backing directory
+    DATA_FILENAME = "features.dat"
+
+    # The format recorded in the metadata file
+    FORMAT = "chunked"
+
+    def __init__(self, path, format=None, dtype=None):
+        '''Creates a ChunkedFeatureStore in the given directory, loading any
+        features that were previously stored there.
+
+        Args:
+            path: the backing directory of the store
+            format: an optional format, which must be "chunked" if provided.
+                Accepted so that all stores can be built alike
+            dtype: an optional data type in which to store the features, for
+                example, "float16" to halve the size of float32 features. By
+                default, the data type of the first stored feature vector is
+                used
+
+        Raises:
+            FeatureStoreError: if an unsupported format was requested, or if
+                the directory contains a different kind of store
+        '''
+        if format is not None and format != self.FORMAT:
+            raise FeatureStoreError(
+                "ChunkedFeatureStore does not support format '%s'" % format)
+
+        super(ChunkedFeatureStore, self).__init__(path)
+        self._dtype = np.dtype(dtype) if dtype is not None else None
+        self._dim = None
+        self._record_dtype = None
+        self._rows = np.empty(0, dtype=np.int64)
+        self._num_records = 0
+        self._file = None
+        self._mmap = None
+        self._load()
+
+    @property
+    def data_path(self):
+        '''The path of the records file.'''
+        return os.path.join(self.path, self.DATA_FILENAME)
+
+    @property
+    def metadata_path(self):
+        '''The path of the metadata file.'''
+        return os.path.join(self.path, FEATURES_METADATA_FILENAME)
+
+    def is_featurized(self, frame_number):
+        return self._get_row(frame_number) >= 0
+
+    def get_featurized_frames(self):
+        return FrameSet.from_list(np.flatnonzero(self._rows >= 0))
+
+    def get(self, frame_number):
+        row = self._get_row(frame_number)
+        if row < 0:
+            raise FeaturizedFrameNotFoundError(
+                "Feature %d not found in '%s'" % (
+                    frame_number, self.data_path))
+
+        return _dequantize(np.array(self._get_records()["v"][row]))
+
+    def get_frames(self, frame_numbers):
+        frames = np.asarray(list(frame_numbers), dtype=np.int64)
+        rows = np.full(frames.shape, -1, dtype=np.int64)
+        valid = (frames >= 0) & (frames < self._rows.size)
+        rows[valid] = self._rows[frames[valid]]
+        if np.any(rows < 0):
+            raise FeaturizedFrameNotFoundError(
+                "Features %s not found in '%s'" % (
+                    FrameSet.from_list(frames[rows < 0]), self.data_path))
+
+        if not rows.size:
+            return np.empty((0, self._dim or 0), dtype=self._dtype)
+
+        return _dequantize(self._get_records()["v"][rows])
+
+    def put(self, frame_number, v):
+        v = np.asarray(v).reshape(-1)
+        if self._record_dtype is None:
+            self._create(v.size, self._dtype or v.dtype)
+
+        if v.size != self._dim:
+            raise FeatureStoreError(
+                "Expected features of dimension %d, but found %d" % (
+                    self._dim, v.size))
+
+        record = np.zeros(1, dtype=self._record_dtype)
+        record["frame"] = frame_number
+        record["v"] = v
+
+        if self._file is None:
+            self._file = open(self.data_path, "ab")
+        self._file.write(record.tobytes())
+
+        self._set_rows(
+            np.array([frame_number]), np.array([self._num_records]))
+        self._num_records += 1
+
+    def as_stored(self, v):
+        if self._dtype is None:
+            return v
+        return _dequantize(np.asarray(v).astype(self._dtype, copy=False))
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def clear(self):
+        self.close()
+        for path in (self.data_path, self.metadata_path):
+            if os.path.isfile(path):
+                os.remove(path)
+
+        self._dim = None
+        self._record_dtype = None
+        self._rows = np.empty(0, dtype=np.int64)
+        self._num_records = 0
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._mmap = None
+
+    def _load(self):
+        if not os.path.isfile(self.metadata_path):
+            return
+
+        metadata = etas.read_json(self.metadata_path)
+        if metadata.get("format") != self.FORMAT:
+            raise FeatureStoreError(
+                "'%s' does not contain a ChunkedFeatureStore" % self.path)
+        self._init_records(metadata["dim"], metadata["dtype"])
+
+        if not os.path.isfile(self.data_path):
+            return
+
+        size = os.path.getsize(self.data_path)
+        num_records = size // self._record_dtype.itemsize
+        if num_records * self._record_dtype.itemsize != size:
+            logger.warning(
+                "Discarding partially written record in '%s'",
+                self.data_path)
+            with open(self.data_path, "r+b") as f:
+                f.truncate(num_records * self._record_dtype.itemsize)
+
+        self._num_records = num_records
+        if num_records:
+            frames = self._get_records()["frame"]
+            self._set_rows(frames, np.arange(num_records))
+
+    def _create(self, dim, dtype):
+        self._init_records(dim, dtype)
+        etas.write_json(
+            {"format": self.FORMAT, "dtype": self._dtype.str,
+             "dim": self._dim},
+            self.metadata_path)
+
+    def _init_records(self, dim, dtype):
+        self._dim = int(dim)
+        self._dtype = np.dtype(dtype)
+        self._record_dtype = np.dtype(
+            [("frame", "<i8"), ("v", self._dtype, (self._dim,))])
+
+    def _get_row(self, frame_number):
+        if 0 <= frame_number < self._rows.size:
+            return self._rows[frame_number]
+        return -1
+
+    def _set_rows(self, frames, rows):
+        # Keep the newest record of each frame
+        frames, idx = np.unique(frames[::-1], return_index=True)
+        rows = rows[::-1][idx]
+
+        size = frames[-1] + 1
+        if size > self._rows.size:
+            # Grow the index geometrically
+            _rows = np.full(max(size, 2 * self._rows.size), -1, np.int64)
+            _rows[:self._rows.size] = self._rows
+            self._rows = _rows
+
+        self._rows[frames] = rows
+
+    def _get_records(self):
+        if self._mmap is None or self._mmap.size < self._num_records:
+            # Map the records, including any that were appended since the
+            # last mapping
+            if self._file is not None:
+                self._file.flush()
+            self._mmap = np.memmap(
+                self.data_path, dtype=self._record_dtype, mode="r",
+                shape=(self._num_records,))
+
+        return self._mmap
+
+
+# The available FeatureStore classes, keyed by name
+FEATURE_STORES = {
+    "npz": NpzFeatureStore,
+    "chunked": ChunkedFeatureStore,
+}
+
+
+def _dequantize(v):
+    # Features quantized to float16 are returned as float32
+    return v.astype(np.float32) if v.dtype == np.float16 else v
+
+
+def _check_codec(format):
+    if format == "lz4" and lz4f is None:
+        raise FeatureStoreError(
+            "The 'lz4' format requires the `lz4` package")
+    if format == "zstd" and zstd is None:
+        raise FeatureStoreError(
+            "The 'zstd' format requires the `zstandard` package")
+
+
+def _compress(format, data):
+    if format == "lz4":
+        return lz4f.compress(data)
+    return zstd.ZstdCompressor().compress(data)
+
+
+def _decompress(format, data):
+    if format == "lz4":
+        return lz4f.decompress(data)
+    return zstd.ZstdDecompressor().decompress(data)
+
+
+# The default number of frames passed to the frame featurizer at once
+DEFAULT_FEATURIZE_BATCH_SIZE = 32
+
+
 class VideoFramesFeaturizerConfig(Config):
     '''Specifies the configuration settings for the VideoFeaturizer class.'''
 
     def __init__(self, d):
         self.backing_path = self.parse_string(
             d, "backing_path", default="/tmp")
+        self.backing_store = self.parse_string(
+            d, "backing_store", default="npz")
+        self.backing_format = self.parse_string(
+            d, "backing_format", default=None)
+        self.backing_dtype = self.parse_string(
+            d, "backing_dtype", default=None)
         self.backing_manager = self.parse_string(
             d, "backing_manager", default="random")
         self.backing_manager_remove_random = self.parse_bool(
@@ -382,6 +979,29 @@ class VideoFramesFeaturizerConfig(Config):
         self.frame_featurizer = self.parse_object(
             d, "frame_featurizer", FeaturizerConfig)
         self.frames = self.parse_string(d, "frames", default="*")
+        self.batch_size = self.parse_number(
+            d, "batch_size", default=DEFAULT_FEATURIZE_BATCH_SIZE)
+
+        if self.backing_store not in FEATURE_STORES:
+            raise ConfigError(
+                "Unsupported backing_store '%s'; supported values are %s" % (
+                    self.backing_store, sorted(FEATURE_STORES)))
+        if (self.backing_format and
+                FEATURE_STORES[self.backing_store] is ChunkedFeatureStore):
+            raise ConfigError(
+                "backing_format is not supported by the '%s' backing "
+                "store" % self.backing_store)
+        if (self.backing_format and
+                self.backing_format not in FEATURE_FILE_FORMATS):
+            raise ConfigError(
+                "Unsupported backing_format '%s'; supported values are %s" % (
+                    self.backing_format, sorted(FEATURE_FILE_FORMATS)))
+        if self.backing_dtype:
+            try:
+                np.dtype(self.backing_dtype)
+            except TypeError:
+                raise ConfigError(
+                    "Invalid backing_dtype '%s'" % self.backing_dtype)
 
 
 class VideoFramesFeaturizer(Featurizer):
@@ -390,14 +1010,33 @@ class VideoFramesFeaturizer(Featurizer):
     A VideoFramesFeaturizer is a meta-Featurizer that uses the Featurizer
     specified by `frame_featurizer` internally to featurize the frames.
 
-    Featurized frames are stored on disk as compressed pickle files indexed by
-    frame number. The location of the files on disk is controlled by the
-    `backing_path` attribute. By default, the backing path is `/tmp`.
+    Featurized frames are stored on disk in a FeatureStore in the directory
+    specified by the `backing_path` attribute. By default, the backing path is
+    `/tmp`. The `backing_store` attribute selects the store:
+
+        "npz" (default)
+            the features of each frame are written to a separate file indexed
+            by frame number, in the format specified by `backing_format`. By
+            default, compressed `.npz` files are written. See
+            NpzFeatureStore
+
+        "chunked"
+            the features of all frames are appended to a single file. See
+            ChunkedFeatureStore
+
+    Features can be quantized on disk by setting `backing_dtype`, e.g., to
+    "float16". They are returned as float32.
 
     This class also allows a `frame_preprocessor` function to be installed
     that preprocesses each input frame before featurizing it. By default, no
     preprocessing is performed.
 
+    Only the frames whose features are not already in the backing store are
+    decoded, and they are passed to the frame featurizer's
+    `featurize_batch()` method in batches of up to `batch_size` frames. So,
+    resuming an interrupted featurization only processes the remaining
+    frames.
+
     **WARNING** if you use the same backing path for multiple videos your
     features will be invalid (features on disk are not overwritten, they are
     simply skipped).
@@ -426,8 +1065,9 @@ class VideoFramesFeaturizer(Featurizer):
     '''
 
     def __init__(self, config):
-        '''Creates a new VideoFramesFeaturizer and initializes the backing
-        storage.
+        '''Creates a new VideoFramesFeaturizer.
+
+        The backing store is not opened until it is first used.
 
         Args:
             config: a VideoFramesFeaturizerConfig instance
@@ -438,10 +1078,10 @@ class VideoFramesFeaturizer(Featurizer):
 
         super(VideoFramesFeaturizer, self).__init__()
 
-        self._frame_string = "%08d.npz"
         self._frame_preprocessor = None
         self._frame_featurizer = None
         self._backing_path = None
+        self._store = None
 
         backing_managers = {
             "random": self._backing_manager_random,
@@ -470,6 +1110,7 @@ class VideoFramesFeaturizer(Featurizer):
         `backing_path` for each video processed.
         '''
         if is_featurize_start:
+            etau.ensure_dir(self.config.backing_path)
             td = tempfile.mkdtemp(
                 dir=self.config.backing_path, prefix="eta.backing.")
             self.update_backing_path(td)
@@ -477,6 +1118,7 @@ class VideoFramesFeaturizer(Featurizer):
             return
 
         if self.config.backing_manager_remove_random:
+            self._close_store()
             shutil.rmtree(self._backing_manager_random_last_tempdir)
         self.update_backing_path(self.config.backing_path)
 
@@ -509,11 +1151,20 @@ class VideoFramesFeaturizer(Featurizer):
 
         return d
 
+    @property
+    def store(self):
+        '''The FeatureStore for the current backing path, which is opened
+        the first time that it is accessed.
+        '''
+        if self._store is None:
+            self._store = self._build_store(self._backing_path)
+        return self._store
+
     def is_featurized(self, frame_number):
         '''Checks the backing store to determine whether or not the frame
         number is already featurized and stored to disk.
         '''
-        return os.path.isfile(self.featurized_frame_path(frame_number))
+        return self.store.is_featurized(frame_number)
 
     def retrieve_featurized_frame(self, frame_number):
         '''The frame_number here is rendered into a string for the filepath.
@@ -523,11 +1174,7 @@ class VideoFramesFeaturizer(Featurizer):
         No checking is explicitly done here. Careful about starting from
         0 or 1.
         '''
-        p = self.featurized_frame_path(frame_number)
-        if not os.path.isfile(p):
-            raise FeaturizedFrameNotFoundError("Feature %d not found", p)
-
-        return np.load(p)["v"]
+        return self.store.get(frame_number)
 
     def featurize(self, video_path, frames=None, returnX=True):
         '''Featurizes the frames of the input video.
@@ -560,41 +1207,38 @@ class VideoFramesFeaturizer(Featurizer):
         frames = frames or self.config.frames
         logger.debug("Featurizing frames %s" % frames)
 
+        # Only decode the frames that are not already featurized
+        featurized = self.store.get_featurized_frames()
+        stored, missing, num_frames = self._get_frames_to_featurize(
+            video_path, frames, featurized)
+
         if returnX:
+            X = _FeatureMatrixBuilder(
+                self.store, stored.to_array(), num_frames=num_frames)
+        else:
             X = None
 
-        with etav.FFmpegVideoReader(video_path, frames=frames) as vr:
-            for img in vr:
-                self.most_recent_frame = vr.frame_number
-                path = self.featurized_frame_path(vr.frame_number)
-
-                try:
-                    # Try to load the existing feature
-                    v = self.retrieve_featurized_frame(vr.frame_number)
-                except FeaturizedFrameNotFoundError:
-                    # Build the per-frame Featurizer, if necessary
-                    if not self._frame_featurizer:
-                        self._frame_featurizer = \
-                            self.config.frame_featurizer.build()
-                        self._frame_featurizer.start()
-
+        if missing:
+            batch_size = max(int(self.config.batch_size), 1)
+            frame_numbers = []
+            imgs = []
+            with etav.FFmpegVideoReader(video_path, frames=missing) as vr:
+                for img in vr:
+                    self.most_recent_frame = vr.frame_number
                     if self._frame_preprocessor is not None:
-                        # Pre-process and then featurize the frame
-                        _img = self._frame_preprocessor(img)
-                        v = self._frame_featurizer.featurize(_img)
-                    else:
-                        # Featurize the frame
-                        v = self._frame_featurizer.featurize(img)
-
-                    # Write the feature to disk
-                    np.savez_compressed(path, v=v)
-
-                if returnX:
-                    if X is None:
-                        # Lazily build the GrowableArray now that we know the
-                        # dimension of the features
-                        X = GrowableArray(len(v))
-                    X.update(v)
+                        img = self._frame_preprocessor(img)
+                    frame_numbers.append(vr.frame_number)
+                    imgs.append(img)
+
+                    if len(imgs) >= batch_size:
+                        self._featurize_frames(frame_numbers, imgs, X)
+                        frame_numbers = []
+                        imgs = []
+
+            if imgs:
+                self._featurize_frames(frame_numbers, imgs, X)
+
+        self.store.flush()
 
         if self._frame_featurizer and not self._keep_alive:
             # Stop the frame featurizer
@@ -603,19 +1247,71 @@ class VideoFramesFeaturizer(Featurizer):
 
         return X.finalize() if returnX else None
 
+    def _get_frames_to_featurize(self, video_path, frames, featurized):
+        # Returns the requested frames that are already in the store, the
+        # frames to decode, and the expected number of requested frames
+        if frames is None or frames == "*":
+            stream_info = etav.VideoStreamInfo.build_for(video_path)
+            total_frame_count = stream_info.total_frame_count
+            if not stream_info.is_frame_count_exact:
+                # The frame count is an estimate, so decode the gaps in the
+                # stored frames, which must exist, and then read until the
+                # end of the video
+                last = featurized.last or 0
+                missing = etav.FrameRanges(
+                    list(featurized.complement(last).iter_ranges()) +
+                    [(last + 1, None)])
+                logger.debug(
+                    "Found %d featurized frames; featurizing the remaining "
+                    "frames", len(featurized))
+                return featurized, missing, total_frame_count
+        else:
+            total_frame_count = None
+
+        requested = etav.to_frame_set(
+            frames, total_frame_count=total_frame_count)
+        missing = requested - featurized
+        logger.debug(
+            "Found %d featurized frames; featurizing %d frames",
+            len(requested) - len(missing), len(missing))
+        return requested & featurized, missing, len(requested)
+
+    def _featurize_frames(self, frame_numbers, imgs, X):
+        # Build the per-frame Featurizer, if necessary
+        if not self._frame_featurizer:
+            self._frame_featurizer = self.config.frame_featurizer.build()
+            self._frame_featurizer.start()
+
+        vs = self._frame_featurizer.featurize_batch(imgs)
+
+        # Write the features to disk
+        store = self.store
+        for frame_number, v in zip(frame_numbers, vs):
+            store.put(frame_number, v)
+
+        if X is not None:
+            # Add the features as they are stored, so that X does not depend
+            # on which frames were already featurized
+            X.add(frame_numbers, [store.as_stored(v) for v in vs])
+
     def featurized_frame_path(self, frame_number):
-        '''Returns the backing path for the given frame number.'''
-        return os.path.join(
-            self._backing_path, self._frame_string % frame_number)
+        '''Returns the backing path for the given frame number.
+
+        Raises:
+            FeatureStoreError: if the "npz" backing store is not used
+        '''
+        store = self.store
+        if not isinstance(store, NpzFeatureStore):
+            raise FeatureStoreError(
+                "Frame paths are only available for the 'npz' store")
+
+        return store.get_path(frame_number)
 
     def flush_backing(self):
         '''Deletes all existing feautres on disk in the current backing path.
         The backing directory itself is not deleted.
         '''
-        files = [
-            f for f in os.listdir(self._backing_path) if f.endswith(".npz")]
-        for f in files:
-            os.remove(os.path.join(self._backing_path, f))
+        self.store.clear()
 
     def _stop(self):
         if self._frame_featurizer:
@@ -623,13 +1319,86 @@ class VideoFramesFeaturizer(Featurizer):
             self._frame_featurizer = None
 
     def update_backing_path(self, backing_path):
-        '''Update the backing path and create the directory tree, if needed.'''
+        '''Update the backing path. The directory tree is created, if needed,
+        when the backing store is first used.
+        '''
+        self._close_store()
         self._backing_path = backing_path
-        try:
-            os.makedirs(self._backing_path)
-        except OSError as e:
-            if e.errno != errno.EEXIST:
-                raise
+
+    def _close_store(self):
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def _build_store(self, backing_path):
+        store_cls = FEATURE_STORES[self.config.backing_store]
+        return store_cls(
+            backing_path, format=self.config.backing_format,
+            dtype=self.config.backing_dtype or None)
+
+
+class _FeatureMatrixBuilder(object):
+    '''Assembles a feature matrix in frame order from newly computed features
+    and the features of frames that were already in a FeatureStore.
+    '''
+
+    # The maximum number of stored features to read at once
+    READ_CHUNK_SIZE = 1024
+
+    def __init__(self, store, stored_frames, num_frames=None):
+        '''Creates a _FeatureMatrixBuilder.
+
+        Args:
+            store: the FeatureStore
+            stored_frames: a sorted array of the frames whose features should
+                be read from the store
+            num_frames: the expected number of rows of the matrix, if known,
+                in which case the matrix is preallocated when the dimension
+                of the features is known
+        '''
+        self._store = store
+        self._stored_frames = stored_frames
+        self._num_frames = num_frames
+        self._stored_idx = 0
+        self._X = None
+
+    def add(self, frame_numbers, vs):
+        '''Adds the given newly computed features, whose frame numbers must
+        be increasing across calls.
+        '''
+        for frame_number, v in zip(frame_numbers, vs):
+            self._add_stored(
+                np.searchsorted(self._stored_frames, frame_number))
+            self._update(v)
+
+    def finalize(self):
+        '''Returns the (# frames) x (# dims) feature matrix, or None if no
+        features were added.
+        '''
+        self._add_stored(len(self._stored_frames))
+        return self._X.finalize() if self._X is not None else None
+
+    def _add_stored(self, end):
+        # Adds the stored features before index `end` of the stored frames
+        while self._stored_idx < end:
+            last = min(end, self._stored_idx + self.READ_CHUNK_SIZE)
+            vs = self._store.get_frames(
+                self._stored_frames[self._stored_idx:last])
+            self._init(vs[0])
+            self._X.update_rows(vs)
+            self._stored_idx = last
+
+    def _update(self, v):
+        self._init(v)
+        self._X.update(v)
+
+    def _init(self, v):
+        if self._X is None:
+            # Lazily build the GrowableArray now that we know the dimension
+            # and data type of the features
+            v = np.asarray(v)
+            self._X = GrowableArray(
+                v.size, dtype=v.dtype, capacity=self._num_frames)
 
 
 class ORBFeaturizer(Featurizer):
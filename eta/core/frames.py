@@ -20,6 +20,8 @@ from builtins import *
 
 from collections import defaultdict
 
+import numpy as np
+
 from eta.core.data import DataContainer
 from eta.core.serial import Serializable
 
@@ -90,3 +92,291 @@ class FrameLabelContainer(DataContainer):
         for fl in self:
             flm[fl.frame_number].add(fl)
         return flm
+
+
+class FrameSet(object):
+    '''An immutable set of frame numbers, stored as sorted arrays of the first
+    and last frames of its disjoint, non-adjacent ranges.
+
+    Membership tests take O(log n) time in the number of ranges, and set
+    operations are vectorized over the ranges, so sets spanning tens of
+    thousands of ranges can be manipulated without materializing their
+    frames.
+
+    Frame numbers are 1-based, and ranges are inclusive of their endpoints.
+    '''
+
+    def __init__(self, firsts=None, lasts=None):
+        '''Constructs a FrameSet from arrays of the first and last frames of
+        its ranges.
+
+        The ranges may be given in any order and may overlap; they are sorted
+        and merged as necessary.
+
+        Args:
+            firsts: an optional array-like of the first frame of each range
+            lasts: an optional array-like of the last frame of each range
+
+        Raises:
+            FrameSetError: if the arrays have different lengths, or if any
+                range has last < first
+        '''
+        firsts = np.asarray(
+            firsts if firsts is not None else [], dtype=np.int64).ravel()
+        lasts = np.asarray(
+            lasts if lasts is not None else [], dtype=np.int64).ravel()
+        if firsts.shape != lasts.shape:
+            raise FrameSetError(
+                "Expected the same number of firsts and lasts, but found "
+                "%d != %d" % (firsts.size, lasts.size))
+        if np.any(lasts < firsts):
+            raise FrameSetError("Expected first <= last for all ranges")
+
+        self._firsts, self._lasts = _merge_ranges(firsts, lasts)
+
+    def __contains__(self, frame):
+        idx = np.searchsorted(self._firsts, frame, side="right") - 1
+        return bool(idx >= 0 and frame <= self._lasts[idx])
+
+    def __iter__(self):
+        for first, last in self.iter_ranges():
+            for frame in range(first, last + 1):
+                yield frame
+
+    def __len__(self):
+        return int(np.sum(self._lasts - self._firsts + 1))
+
+    def __bool__(self):
+        return self._firsts.size > 0
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, FrameSet) and
+            np.array_equal(self._firsts, other._firsts) and
+            np.array_equal(self._lasts, other._lasts))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        return self.difference(other)
+
+    def __str__(self):
+        return self.to_str()
+
+    @property
+    def firsts(self):
+        '''A read-only array of the first frame of each range.'''
+        return _read_only(self._firsts)
+
+    @property
+    def lasts(self):
+        '''A read-only array of the last frame of each range.'''
+        return _read_only(self._lasts)
+
+    @property
+    def num_ranges(self):
+        '''The number of disjoint ranges in the set.'''
+        return self._firsts.size
+
+    @property
+    def first(self):
+        '''The smallest frame in the set, or None if the set is empty.'''
+        return int(self._firsts[0]) if self else None
+
+    @property
+    def last(self):
+        '''The largest frame in the set, or None if the set is empty.'''
+        return int(self._lasts[-1]) if self else None
+
+    def contains(self, frames):
+        '''Tests whether each of the given frames is in the set.
+
+        Args:
+            frames: an array-like of frame numbers
+
+        Returns:
+            a boolean numpy array of the same shape as frames
+        '''
+        frames = np.asarray(frames)
+        if not self:
+            return np.zeros(frames.shape, dtype=bool)
+
+        idx = np.searchsorted(self._firsts, frames, side="right") - 1
+        return (idx >= 0) & (frames <= self._lasts[np.maximum(idx, 0)])
+
+    def iter_ranges(self):
+        '''Returns an iterator over the (first, last) tuples of the ranges in
+        the set.
+        '''
+        for first, last in zip(self._firsts.tolist(), self._lasts.tolist()):
+            yield first, last
+
+    def union(self, other):
+        '''Returns the union of this set with another FrameSet.'''
+        return FrameSet(
+            np.concatenate([self._firsts, other._firsts]),
+            np.concatenate([self._lasts, other._lasts]))
+
+    def intersection(self, other):
+        '''Returns the intersection of this set with another FrameSet.'''
+        return _combine(self, other, lambda a, b: a & b)
+
+    def difference(self, other):
+        '''Returns the frames in this set that are not in another FrameSet.
+        '''
+        return _combine(self, other, lambda a, b: a & ~b)
+
+    def complement(self, total_frame_count):
+        '''Returns the frames in [1, total_frame_count] that are not in this
+        set.
+
+        Args:
+            total_frame_count: the total number of frames in the video
+        '''
+        if total_frame_count < 1:
+            return FrameSet()
+        return FrameSet([1], [total_frame_count]).difference(self)
+
+    def to_array(self):
+        '''Returns a numpy array of the frames in the set, in ascending order.
+        '''
+        lengths = self._lasts - self._firsts + 1
+        offsets = np.cumsum(lengths) - lengths
+        return (
+            np.arange(np.sum(lengths), dtype=np.int64) +
+            np.repeat(self._firsts - offsets, lengths))
+
+    def to_list(self):
+        '''Returns a list of the frames in the set, in ascending order.'''
+        return self.to_array().tolist()
+
+    def to_bools(self, total_frame_count=None):
+        '''Returns a boolean array whose i-th entry indicates whether frame
+        i + 1 is in the set.
+
+        Args:
+            total_frame_count: an optional length for the array. By default,
+                the last frame in the set is used
+        '''
+        if total_frame_count is None:
+            total_frame_count = self.last or 0
+        bools = np.zeros(total_frame_count, dtype=bool)
+        frames = self.to_array()
+        bools[frames[frames <= total_frame_count] - 1] = True
+        return bools
+
+    def to_str(self):
+        '''Returns a frames string like "1-3,6,8-10" describing the set.'''
+        return ",".join(
+            "%d" % first if first == last else "%d-%d" % (first, last)
+            for first, last in self.iter_ranges())
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        '''Constructs a FrameSet from an iterable of (first, last) tuples.'''
+        ranges = np.asarray(list(ranges), dtype=np.int64).reshape(-1, 2)
+        return cls(ranges[:, 0], ranges[:, 1])
+
+    @classmethod
+    def from_str(cls, frames_str):
+        '''Constructs a FrameSet from a frames string like "1-3,6,8-10".
+
+        Raises:
+            FrameSetError: if the frames string is invalid
+        '''
+        ranges = []
+        for r in frames_str.split(","):
+            if not r:
+                continue
+            try:
+                v = [int(f) for f in r.split("-")]
+            except ValueError:
+                raise FrameSetError("Invalid frames string '%s'" % frames_str)
+            ranges.append((v[0], v[-1]))
+
+        return cls.from_ranges(ranges)
+
+    @classmethod
+    def from_list(cls, frames_list):
+        '''Constructs a FrameSet from an array-like of frame numbers, which
+        need not be sorted or unique.
+        '''
+        frames = np.unique(np.asarray(frames_list, dtype=np.int64))
+        if not frames.size:
+            return cls()
+        breaks = np.flatnonzero(np.diff(frames) != 1)
+        return cls(
+            frames[np.concatenate([[0], breaks + 1])],
+            frames[np.concatenate([breaks, [frames.size - 1]])])
+
+    @classmethod
+    def from_bools(cls, bools):
+        '''Constructs a FrameSet from an array-like of per-frame booleans,
+        whose i-th entry indicates whether frame i + 1 is in the set.
+        '''
+        bools = np.asarray(bools, dtype=bool).astype(np.int8)
+        edges = np.diff(np.concatenate([[0], bools, [0]]))
+        return cls(np.flatnonzero(edges == 1) + 1, np.flatnonzero(edges == -1))
+
+
+class FrameSetError(Exception):
+    '''Exception raised when an invalid FrameSet is encountered.'''
+    pass
+
+
+def _merge_ranges(firsts, lasts):
+    if not firsts.size:
+        return firsts, lasts
+
+    order = np.argsort(firsts, kind="mergesort")
+    firsts = firsts[order]
+    lasts = lasts[order]
+
+    # A range starts a new group if it begins after every preceding range
+    # ends, so overlapping and adjacent ranges are merged
+    max_lasts = np.maximum.accumulate(lasts)
+    starts_group = np.concatenate([[True], firsts[1:] > max_lasts[:-1] + 1])
+    idx = np.flatnonzero(starts_group)
+    return firsts[idx], np.maximum.reduceat(lasts, idx)
+
+
+def _combine(a, b, keep):
+    # Sweep over the range boundaries of both sets, treating each range as
+    # the half-open interval [first, last + 1), and keep the intervals between
+    # consecutive boundaries on which keep(in_a, in_b) is True
+    pos = np.concatenate([a._firsts, a._lasts + 1, b._firsts, b._lasts + 1])
+    if not pos.size:
+        return FrameSet()
+
+    na = a._firsts.size
+    nb = b._firsts.size
+    da = np.concatenate([np.ones(na), -np.ones(na), np.zeros(2 * nb)])
+    db = np.concatenate([np.zeros(2 * na), np.ones(nb), -np.ones(nb)])
+
+    order = np.argsort(pos, kind="mergesort")
+    pos = pos[order]
+    in_a = np.cumsum(da[order])
+    in_b = np.cumsum(db[order])
+
+    # Use the state after the last boundary at each position
+    bounds, idx = np.unique(pos, return_index=True)
+    last_idx = np.concatenate([idx[1:], [pos.size]]) - 1
+    mask = keep(in_a[last_idx] > 0, in_b[last_idx] > 0)
+
+    # Each kept interval [bounds[i], bounds[i + 1]) is a range; the last
+    # boundary always closes every range, so mask[-1] is False
+    kept = np.flatnonzero(mask)
+    return FrameSet(bounds[kept], bounds[kept + 1] - 1)
+
+
+def _read_only(arr):
+    arr = arr.view()
+    arr.flags.writeable = False
+    return arr
@@ -122,15 +122,45 @@ def read(path, flag=cv2.IMREAD_UNCHANGED):
     return _exchange_rb(cv2.imread(path, flag))
 
 
-def write(img, path):
+def write(img, path, params=None):
     '''Writes image to file. The output directory is created if necessary.
 
     Args:
         img: a numpy array
         path: the output path
+        params: an optional list of OpenCV image encoding params, e.g., as
+            returned by get_write_params()
     '''
     etau.ensure_basedir(path)
-    cv2.imwrite(path, _exchange_rb(img))
+    cv2.imwrite(path, _exchange_rb(img), params or [])
+
+
+def get_write_params(
+        path, png_compression=None, jpeg_quality=None, webp_quality=None):
+    '''Returns the OpenCV image encoding params to pass to write() when
+    writing an image to the given path.
+
+    Only the options relevant to the image format of the path are used.
+
+    Args:
+        path: the output path (or just its extension, e.g., ".png")
+        png_compression: an optional PNG compression level in [0, 9]. Lower
+            levels are faster but produce larger files
+        jpeg_quality: an optional JPEG quality in [0, 100]
+        webp_quality: an optional WebP quality in [1, 100]. Values above 100
+            select lossless compression
+
+    Returns:
+        a list of OpenCV image encoding params
+    '''
+    ext = os.path.splitext(path)[1].lower() or path.lower()
+    if ext == ".png" and png_compression is not None:
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(png_compression)]
+    if ext in (".jpg", ".jpeg") and jpeg_quality is not None:
+        return [cv2.IMWRITE_JPEG_QUALITY, int(jpeg_quality)]
+    if ext == ".webp" and webp_quality is not None:
+        return [cv2.IMWRITE_WEBP_QUALITY, int(webp_quality)]
+    return []
 
 
 ###### Image Manipulation #####################################################
@@ -179,6 +179,12 @@ def setup(module_config, pipeline_config_path=None):
     # Apply config settings
     eta.set_config_settings(**module_config.base.eta_config)
 
+    # Encode intermediate videos with the intermediate profile
+    if module_config.base.intermediate_outputs:
+        eta.set_config_settings(
+            video_encoding_profile=(
+                eta.config.intermediate_video_encoding_profile))
+
 
 class BaseModuleConfig(Config):
     '''Base module configuration class that defines common configuration
@@ -208,6 +214,10 @@ class BaseModuleConfigSettings(Config):
             before running the module
         logging_config: an `eta.core.log.LoggingConfig` instance defining
             the logging configuration settings for the module
+        intermediate_outputs: whether all outputs of the module are
+            intermediate pipeline outputs that are never published. If True,
+            videos are encoded using the
+            `eta.config.intermediate_video_encoding_profile` profile
     '''
 
     def __init__(self, d):
@@ -215,6 +225,8 @@ class BaseModuleConfigSettings(Config):
         self.logging_config = self.parse_object(
             d, "logging_config", etal.LoggingConfig,
             default=etal.LoggingConfig.default())
+        self.intermediate_outputs = self.parse_bool(
+            d, "intermediate_outputs", default=False)
 
 
 class GenericModuleConfig(Config):
@@ -225,6 +237,7 @@ class GenericModuleConfig(Config):
     '''
 
     def __init__(self, d):
+        self.base = self.parse_dict(d, "base", default={})
         self.data = self.parse_array(d, "data", default=[])
         self.parameters = self.parse_dict(d, "parameters", default={})
 
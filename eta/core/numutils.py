@@ -135,16 +135,38 @@ class Accumulator(object):
 
 
 class GrowableArray(object):
-    '''A class for building a numpy array from streaming data.'''
+    '''A class for building a numpy array from streaming data.
 
-    def __init__(self, rowlen):
+    Rows are copied into a preallocated numpy buffer whose capacity grows
+    geometrically when it fills up, so building an array is linear in the
+    number of bytes added. If the final number of rows is known up-front,
+    passing it as the `capacity` avoids any reallocation.
+    '''
+
+    # The default initial number of rows in the buffer
+    DEFAULT_CAPACITY = 256
+
+    # The factor by which the capacity of a full buffer is increased
+    GROWTH_FACTOR = 2
+
+    def __init__(self, rowlen, dtype=None, capacity=None):
         '''Creates a GrowableArray instance.
 
         Args:
             rowlen: the desired length of each row
+            dtype: an optional data type for the array. By default,
+                np.float64 is used
+            capacity: an optional initial number of rows to allocate. By
+                default, self.DEFAULT_CAPACITY is used
         '''
         self.rowlen = rowlen
-        self._data = []
+        self.dtype = np.dtype(dtype if dtype is not None else np.float64)
+        self._capacity = capacity or self.DEFAULT_CAPACITY
+        self._data = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
 
     def update(self, row):
         '''Add row to array.'''
@@ -153,15 +175,48 @@ class GrowableArray(object):
                 "Expected row length of %d, but found %d" % (
                     self.rowlen, len(row)))
 
-        for r in row:
-            self._data.append(r)
+        self._reserve(self._size + 1)
+        self._data[self._size] = row
+        self._size += 1
+
+    def update_rows(self, rows):
+        '''Add the rows of a 2D array-like to array.'''
+        rows = np.asarray(rows)
+        if rows.ndim != 2 or rows.shape[1] != self.rowlen:
+            raise GrowableArrayError(
+                "Expected rows of length %d, but found shape %s" % (
+                    self.rowlen, rows.shape))
+
+        num_rows = rows.shape[0]
+        self._reserve(self._size + num_rows)
+        self._data[self._size:self._size + num_rows] = rows
+        self._size += num_rows
 
     def finalize(self):
         '''Return numpy array.'''
-        return np.reshape(
-            self._data,
-            newshape=(len(self._data) // self.rowlen, self.rowlen),
-        )
+        if self._data is None:
+            return np.empty((0, self.rowlen), dtype=self.dtype)
+
+        if self._size == self._data.shape[0]:
+            return self._data
+
+        # Release the unused capacity
+        return self._data[:self._size].copy()
+
+    def _reserve(self, size):
+        if self._data is None:
+            self._data = np.empty(
+                (max(self._capacity, size), self.rowlen), dtype=self.dtype)
+            return
+
+        capacity = self._data.shape[0]
+        if size <= capacity:
+            return
+
+        capacity = max(size, int(capacity * self.GROWTH_FACTOR))
+        data = np.empty((capacity, self.rowlen), dtype=self.dtype)
+        data[:self._size] = self._data[:self._size]
+        self._data = data
 
 
 class GrowableArrayError(Exception):
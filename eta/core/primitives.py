@@ -55,7 +55,8 @@ class DenseOpticalFlow(object):
         # VideoProcessor ensures that the output video directory exists
 
         self.reset()
-        with etav.VideoProcessor(input_path, out_video_path=video_path) as p:
+        with etav.VideoProcessor(
+                input_path, out_video_path=video_path, out_async=True) as p:
             for img in p:
                 # Compute optical flow
                 flow_cart = self.process_frame(img)
@@ -222,10 +223,12 @@ class BackgroundSubtractor(object):
         try:
             if fgvideo_path:
                 fgw = etav.FFmpegVideoWriter(
-                    fgvideo_path, r.frame_rate, r.frame_size)
+                    fgvideo_path, r.frame_rate, r.frame_size,
+                    async_write=True)
             if bgvideo_path:
                 bgw = etav.FFmpegVideoWriter(
-                    bgvideo_path, r.frame_rate, r.frame_size)
+                    bgvideo_path, r.frame_rate, r.frame_size,
+                    async_write=True)
 
             self.reset()
             for img in r:
@@ -415,7 +418,8 @@ class EdgeDetector(object):
         # VideoProcessor ensures that the output video directory exists
 
         self.reset()
-        with etav.VideoProcessor(input_path, out_video_path=video_path) as p:
+        with etav.VideoProcessor(
+                input_path, out_video_path=video_path, out_async=True) as p:
             for img in p:
                 # Compute edges
                 edges = self.process_frame(img)
@@ -496,7 +500,8 @@ class FeaturePointDetector(object):
         # VideoProcessor ensures that the output video directory exists
 
         self.reset()
-        with etav.VideoProcessor(input_path, out_video_path=video_path) as p:
+        with etav.VideoProcessor(
+                input_path, out_video_path=video_path, out_async=True) as p:
             for img in p:
                 # Compute feature points
                 keypoints = self.process_frame(img)
@@ -487,10 +487,31 @@ class VGG16Featurizer(Featurizer):
         Returns:
             the feature vector, a 1D array of length 4096
         '''
+        return self._featurize_batch([img])[0]
+
+    def _featurize_batch(self, imgs):
+        '''Featurizes the input images using VGG-16 in a single evaluation
+        of the network.
+
+        The images are resized to 224 x 224 internally, if necessary.
+
+        Args:
+            imgs: a list of input images
+
+        Returns:
+            a list of feature vectors, each a 1D array of length 4096
+        '''
+        imgs = [self._preprocess(img) for img in imgs]
+        return list(self.vgg16.evaluate(imgs, layer=self.vgg16.fc2l))
+
+    @staticmethod
+    def _preprocess(img):
         if etai.is_gray(img):
             img = etai.gray_to_rgb(img)
         elif etai.has_alpha(img):
             img = img[:, :, :3]
 
-        imgs = [etai.resize(img, 224, 224)]
-        return self.vgg16.evaluate(imgs, layer=self.vgg16.fc2l)[0]
+        if img.shape[:2] != (224, 224):
+            img = etai.resize(img, 224, 224)
+
+        return img
@@ -26,18 +26,29 @@ import six
 # pragma pylint: enable=unused-wildcard-import
 # pragma pylint: enable=wildcard-import
 
+from collections import deque, OrderedDict
+import copy
 import errno
+import hashlib
 import json
 import logging
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import os
+import queue
 from subprocess import Popen, PIPE
 import threading
+import time
 
 import cv2
 import numpy as np
 
+import eta
+from eta.core.data import DataFileSequence, DataFileSequenceError
+from eta.core.frames import FrameSet
 import eta.core.image as etai
 from eta.core.serial import Serializable
+import eta.core.serial as etas
 import eta.core.utils as etau
 
 
@@ -49,6 +60,44 @@ SUPPORTED_VIDEO_FILE_FORMATS = [
 ]
 
 
+# Named sets of ffmpeg output options for encoding videos
+VIDEO_ENCODING_PROFILES = {
+    # Fast, lossless (in YUV 4:2:0) encoding for videos that are only
+    # consumed by subsequent processing steps
+    "intermediate": [
+        "-c:v", "libx264", "-preset", "ultrafast", "-qp", "0",
+        "-pix_fmt", "yuv420p", "-an"],
+    # High quality encoding for long-term storage
+    "archive": [
+        "-c:v", "libx264", "-preset", "slow", "-crf", "18",
+        "-pix_fmt", "yuv420p", "-an"],
+    # Balanced encoding for videos that are delivered to users
+    "delivery": [
+        "-c:v", "libx264", "-preset", "medium", "-crf", "23",
+        "-pix_fmt", "yuv420p", "-an"],
+}
+
+
+def get_encoding_profile_opts(profile=None):
+    '''Gets the ffmpeg output options for the given video encoding profile.
+
+    Args:
+        profile: the name of a profile in VIDEO_ENCODING_PROFILES. By default,
+            `eta.config.video_encoding_profile` is used
+
+    Returns:
+        a list of ffmpeg output options
+
+    Raises:
+        ValueError: if the profile is not supported
+    '''
+    profile = profile or eta.config.video_encoding_profile
+    try:
+        return list(VIDEO_ENCODING_PROFILES[profile])
+    except KeyError:
+        raise ValueError("Unsupported video encoding profile '%s'" % profile)
+
+
 def is_supported_video_file(path):
     '''Determines whether the given file has a supported video type.
 
@@ -111,7 +160,7 @@ def glob_videos(dir_):
 class VideoStreamInfo(Serializable):
     '''Class encapsulating the stream info for a video.'''
 
-    def __init__(self, stream_info):
+    def __init__(self, stream_info, inpath=None, use_cache=False):
         '''Constructs a VideoStreamInfo instance.
 
         This constructor should not normally be called directly. The proper way
@@ -119,8 +168,18 @@ class VideoStreamInfo(Serializable):
 
         Args:
             stream_info: a stream info dictionary generated by get_stream_info
+            inpath: the optional path to the video. When provided and the
+                video is a local file whose container does not report its
+                frame count, `total_frame_count` counts the packets of the
+                video the first time that it is accessed
+            use_cache: whether to record packet counts in the process-wide
+                stream info cache. By default, this is False
         '''
         self.stream_info = stream_info
+        self._inpath = inpath
+        self._use_cache = use_cache
+        self._should_count_packets = (
+            inpath is not None and _is_local_video_file(inpath))
 
     @property
     def encoding_str(self):
@@ -159,13 +218,52 @@ class VideoStreamInfo(Serializable):
     def total_frame_count(self):
         '''The total number of frames in the video, or 0 if it could not be
         determined.
+
+        See `frame_count_method` for how the count was obtained. Counts whose
+        method is not in EXACT_FRAME_COUNT_METHODS are estimates.
         '''
-        try:
-            # this fails for directories of frames
-            return int(self.stream_info["nb_frames"])
-        except KeyError:
-            # this seems to work for directories of frames
-            return int(self.stream_info.get("duration_ts", 0))
+        return self._get_frame_count()[0]
+
+    @property
+    def frame_count_method(self):
+        '''The method used to compute `total_frame_count`. One of:
+            - "metadata": the `nb_frames` field of the container
+            - "packets": the number of packets counted by a demux-only
+                `ffprobe -count_packets` pass
+            - "duration_ts": the duration of an image sequence in frames
+            - "duration": an estimate of duration * frame_rate
+            - "unknown": the frame count could not be determined
+        '''
+        return self._get_frame_count()[1]
+
+    @property
+    def is_frame_count_exact(self):
+        '''Whether `total_frame_count` is exact rather than an estimate.'''
+        return self.frame_count_method in EXACT_FRAME_COUNT_METHODS
+
+    def _get_frame_count(self):
+        if FRAME_COUNT_KEY in self.stream_info:
+            count = int(self.stream_info[FRAME_COUNT_KEY])
+            method = self.stream_info[FRAME_COUNT_METHOD_KEY]
+        else:
+            # Stream info that was not generated by _probe_stream_info(),
+            # e.g., from an older JSON file
+            count, method = _compute_frame_count(
+                self.stream_info, is_video_file=self._should_count_packets)
+
+        if method not in EXACT_FRAME_COUNT_METHODS and \
+                self._should_count_packets:
+            # Only attempt to count packets once per instance
+            self._should_count_packets = False
+            num_packets = _try_count_packets(self._inpath)
+            if num_packets:
+                count, method = num_packets, "packets"
+                self.stream_info[FRAME_COUNT_KEY] = count
+                self.stream_info[FRAME_COUNT_METHOD_KEY] = method
+                if self._use_cache:
+                    _STREAM_INFO_CACHE.put(self._inpath, self.stream_info)
+
+        return count, method
 
     def get_raw_value(self, key):
         '''Gets a value from the raw stream info dictionary.
@@ -182,17 +280,44 @@ class VideoStreamInfo(Serializable):
         return self.stream_info[key]
 
     @classmethod
-    def build_for(cls, inpath):
+    def build_for(cls, inpath, use_cache=True):
         '''Builds a VideoStreamInfo object for the given video using
         `ffprobe -show_streams`.
 
         Args:
             inpath: the path to the input video
+            use_cache: whether to use the process-wide stream info cache. By
+                default, this is True
 
         Returns:
             a VideoStreamInfo instance
         '''
-        return cls(get_stream_info(inpath))
+        return cls(
+            get_stream_info(inpath, use_cache=use_cache), inpath=inpath,
+            use_cache=use_cache)
+
+    @classmethod
+    def build_for_batch(cls, inpaths, max_workers=None, use_cache=True):
+        '''Builds VideoStreamInfo objects for the given videos by running
+        `ffprobe -show_streams` on them in parallel.
+
+        Args:
+            inpaths: a list of input video paths
+            max_workers: the maximum number of ffprobe processes to run
+                concurrently. By default, the number of CPUs is used
+            use_cache: whether to use the process-wide stream info cache. By
+                default, this is True
+
+        Returns:
+            a list of VideoStreamInfo instances, in the same order as inpaths
+        '''
+        inpaths = list(inpaths)
+        stream_infos = get_stream_info_batch(
+            inpaths, max_workers=max_workers, use_cache=use_cache)
+        return [
+            cls(stream_info, inpath=inpath, use_cache=use_cache)
+            for stream_info, inpath in zip(stream_infos, inpaths)
+        ]
 
     @classmethod
     def from_dict(cls, d):
@@ -207,11 +332,22 @@ class VideoStreamInfoError(Exception):
     pass
 
 
-def get_stream_info(inpath):
+def get_stream_info(inpath, use_cache=True):
     '''Get stream info for the video using `ffprobe -show_streams`.
 
+    When `use_cache` is True, the result is looked up in (and stored in) the
+    process-wide VideoStreamInfoCache, so repeated calls for an unchanged
+    video file do not spawn additional ffprobe processes.
+
+    The probe does not demux the video, so, when the container does not
+    report its frame count, the recorded count is an estimate. Use
+    `VideoStreamInfo.build_for()` to count the packets of such videos on
+    demand.
+
     Args:
         inpath: video path
+        use_cache: whether to use the process-wide stream info cache. By
+            default, this is True
 
     Returns:
         stream: a dictionary of stream info
@@ -219,9 +355,223 @@ def get_stream_info(inpath):
     Raises:
         FFprobeError: if no stream info was found
     '''
+    if not use_cache:
+        return _probe_stream_info(inpath)
+
+    stream_info = _STREAM_INFO_CACHE.get(inpath)
+    if stream_info is None:
+        stream_info = _probe_stream_info(inpath)
+        _STREAM_INFO_CACHE.put(inpath, stream_info)
+
+    return stream_info
+
+
+def get_stream_info_batch(inpaths, max_workers=None, use_cache=True):
+    '''Get stream info for the videos using `ffprobe -show_streams`, running
+    up to `max_workers` ffprobe processes concurrently.
+
+    Args:
+        inpaths: a list of video paths
+        max_workers: the maximum number of ffprobe processes to run
+            concurrently. By default, the number of CPUs is used
+        use_cache: whether to use the process-wide stream info cache. By
+            default, this is True
+
+    Returns:
+        a list of stream info dictionaries, in the same order as inpaths
+
+    Raises:
+        FFprobeError: if no stream info was found for any of the videos
+    '''
+    inpaths = list(inpaths)
+    if not inpaths:
+        return []
+
+    max_workers = max_workers or multiprocessing.cpu_count()
+    pool = ThreadPool(min(max_workers, len(inpaths)))
+    try:
+        return pool.map(
+            lambda inpath: get_stream_info(inpath, use_cache=use_cache),
+            inpaths)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def invalidate_stream_info_cache(inpath=None):
+    '''Invalidates the process-wide stream info cache.
+
+    Args:
+        inpath: an optional video path whose cached stream info to invalidate.
+            By default, the entire cache is invalidated
+    '''
+    _STREAM_INFO_CACHE.invalidate(inpath=inpath)
+
+
+class VideoStreamInfoCache(object):
+    '''An LRU cache of video stream info dictionaries.
+
+    Entries are keyed by the absolute path, size, and modification time of
+    each video file, so modified videos are automatically re-probed. Paths
+    that are not regular files (e.g., image sequence patterns) are never
+    cached.
+
+    The cache can optionally be persisted to a directory on disk, in which
+    case entries survive across processes.
+    '''
+
+    def __init__(self, max_size=None, cache_dir=None):
+        '''Creates a VideoStreamInfoCache instance.
+
+        Args:
+            max_size: the maximum number of entries to keep in memory. By
+                default, `eta.config.stream_info_cache_size` is used
+            cache_dir: an optional directory in which to persist entries. By
+                default, `eta.config.stream_info_cache_dir` is used, and an
+                empty value disables on-disk caching
+        '''
+        self._max_size = max_size
+        self._cache_dir = cache_dir
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self):
+        '''The maximum number of entries to keep in memory.'''
+        if self._max_size is not None:
+            return self._max_size
+        return eta.config.stream_info_cache_size
+
+    @property
+    def cache_dir(self):
+        '''The directory in which entries are persisted, or None.'''
+        if self._cache_dir is not None:
+            return self._cache_dir
+        return eta.config.stream_info_cache_dir or None
+
+    def get(self, inpath):
+        '''Gets the cached stream info for the given video, if any.
+
+        Args:
+            inpath: the video path
+
+        Returns:
+            a copy of the cached stream info dictionary, or None if the video
+                is not cached
+        '''
+        key = self._make_key(inpath)
+        if key is None:
+            return None
+
+        with self._lock:
+            stream_info = self._cache.pop(key, None)
+            if stream_info is not None:
+                self._cache[key] = stream_info
+
+        if stream_info is None:
+            stream_info = self._read_from_disk(key)
+            if stream_info is None:
+                return None
+            self._add(key, stream_info)
+
+        return copy.deepcopy(stream_info)
+
+    def put(self, inpath, stream_info):
+        '''Adds the stream info for the given video to the cache.
+
+        Args:
+            inpath: the video path
+            stream_info: the stream info dictionary
+        '''
+        key = self._make_key(inpath)
+        if key is None:
+            return
+
+        stream_info = copy.deepcopy(stream_info)
+        self._add(key, stream_info)
+        self._write_to_disk(key, stream_info)
+
+    def invalidate(self, inpath=None):
+        '''Invalidates cache entries.
+
+        Args:
+            inpath: an optional video path whose entries to invalidate. By
+                default, all entries are invalidated
+        '''
+        if inpath is None:
+            with self._lock:
+                self._cache.clear()
+            if self.cache_dir and os.path.isdir(self.cache_dir):
+                for filename in os.listdir(self.cache_dir):
+                    if filename.endswith(".json"):
+                        etau.delete_file(
+                            os.path.join(self.cache_dir, filename))
+            return
+
+        path = os.path.abspath(inpath)
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == path]:
+                del self._cache[key]
+
+        key = self._make_key(inpath)
+        if key is not None:
+            cache_path = self._get_cache_path(key)
+            if cache_path and os.path.isfile(cache_path):
+                etau.delete_file(cache_path)
+
+    def _add(self, key, stream_info):
+        with self._lock:
+            self._cache.pop(key, None)
+            self._cache[key] = stream_info
+            while len(self._cache) > max(self.max_size, 0):
+                self._cache.popitem(last=False)
+
+    def _read_from_disk(self, key):
+        cache_path = self._get_cache_path(key)
+        if not cache_path or not os.path.isfile(cache_path):
+            return None
+
+        try:
+            return etas.read_json(cache_path)
+        except ValueError:
+            logger.warning("Ignoring invalid cache file '%s'", cache_path)
+            return None
+
+    def _write_to_disk(self, key, stream_info):
+        cache_path = self._get_cache_path(key)
+        if cache_path:
+            etas.write_json(stream_info, cache_path, pretty_print=False)
+
+    def _get_cache_path(self, key):
+        if not self.cache_dir:
+            return None
+        name = hashlib.md5(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, name + ".json")
+
+    @staticmethod
+    def _make_key(inpath):
+        try:
+            st = os.stat(inpath)
+        except OSError:
+            return None
+        return (os.path.abspath(inpath), st.st_size, st.st_mtime)
+
+
+# Keys under which _probe_stream_info() records the frame count of a video,
+# and the method used to compute it, in its stream info dictionary
+FRAME_COUNT_KEY = "eta_frame_count"
+FRAME_COUNT_METHOD_KEY = "eta_frame_count_method"
+
+# The frame count methods that yield exact counts. The counts of the other
+# methods are estimates
+EXACT_FRAME_COUNT_METHODS = ("metadata", "packets")
+
+
+def _probe_stream_info(inpath):
     try:
         ffprobe = FFprobe(opts=[
             "-show_streams",             # get stream info
+            "-show_format",              # get container info
             "-print_format", "json",     # return in JSON format
         ])
         out = ffprobe.run(inpath, decode=True)
@@ -230,15 +580,88 @@ def get_stream_info(inpath):
 
         for stream in info["streams"]:
             if stream["codec_type"] == "video":
-                return stream
-
-        logger.warning(
-            "No stream found with codec_type = video. Returning the first "
-            "stream")
-        return info["streams"][0]  # default to the first stream
+                break
+        else:
+            logger.warning(
+                "No stream found with codec_type = video. Returning the "
+                "first stream")
+            stream = info["streams"][0]  # default to the first stream
     except:
         raise FFprobeError("Unable to get stream info for '%s'" % inpath)
 
+    count, method = _compute_frame_count(
+        stream, format_info=info.get("format", None),
+        is_video_file=_is_local_video_file(inpath))
+    stream[FRAME_COUNT_KEY] = count
+    stream[FRAME_COUNT_METHOD_KEY] = method
+    return stream
+
+
+def _compute_frame_count(stream_info, format_info=None, is_video_file=False):
+    # Container metadata
+    count = _parse_positive_int(stream_info.get("nb_frames", None))
+    if count:
+        return count, "metadata"
+
+    if not is_video_file and "duration_ts" in stream_info:
+        # This works for image sequences, whose time base is one frame
+        count = _parse_positive_int(stream_info["duration_ts"])
+        if count:
+            return count, "duration_ts"
+
+    # Duration-based estimate
+    try:
+        duration = stream_info.get("duration", None)
+        if duration in (None, "N/A") and format_info:
+            duration = format_info.get("duration", None)
+        frame_rate = VideoStreamInfo(stream_info).frame_rate
+        count = int(round(float(duration) * frame_rate))
+        if count > 0:
+            return count, "duration"
+    except (TypeError, ValueError, VideoStreamInfoError):
+        pass
+
+    return 0, "unknown"
+
+
+def _try_count_packets(inpath):
+    try:
+        return _count_packets(inpath)
+    except (etau.ExecutableNotFoundError, etau.ExecutableRuntimeError,
+            ValueError) as e:
+        logger.warning("Unable to count packets in '%s': %s", inpath, e)
+        return None
+
+
+def _count_packets(inpath):
+    ffprobe = FFprobe(opts=[
+        "-select_streams", "v:0",                   # first video stream
+        "-count_packets",                           # demux, but don't decode
+        "-show_entries", "stream=nb_read_packets",  # only the packet count
+        "-print_format", "json",                    # return in JSON format
+    ])
+    out = ffprobe.run(inpath, decode=True)
+    streams = json.loads(out).get("streams", [])
+    if not streams:
+        return None
+    return _parse_positive_int(streams[0].get("nb_read_packets", None))
+
+
+def _is_local_video_file(inpath):
+    return os.path.isfile(inpath) and is_supported_video_file(inpath)
+
+
+def _parse_positive_int(val):
+    try:
+        val = int(val)
+    except (TypeError, ValueError):
+        return None
+    return val if val > 0 else None
+
+
+# The process-wide stream info cache used by get_stream_info()
+_STREAM_INFO_CACHE = VideoStreamInfoCache()
+
 
 def get_encoding_str(inpath, use_ffmpeg=True):
     '''Get the encoding string of the input video.
@@ -247,8 +670,10 @@ def get_encoding_str(inpath, use_ffmpeg=True):
         inpath: video path
         use_ffmpeg: whether to use ffmpeg (True) or OpenCV (False)
     '''
-    r = FFmpegVideoReader(inpath) if use_ffmpeg else OpenCVVideoReader(inpath)
-    with r:
+    if use_ffmpeg:
+        return VideoStreamInfo.build_for(inpath).encoding_str
+
+    with OpenCVVideoReader(inpath) as r:
         return r.encoding_str
 
 
@@ -259,8 +684,10 @@ def get_frame_rate(inpath, use_ffmpeg=True):
         inpath: video path
         use_ffmpeg: whether to use ffmpeg (True) or OpenCV (False)
     '''
-    r = FFmpegVideoReader(inpath) if use_ffmpeg else OpenCVVideoReader(inpath)
-    with r:
+    if use_ffmpeg:
+        return VideoStreamInfo.build_for(inpath).frame_rate
+
+    with OpenCVVideoReader(inpath) as r:
         return r.frame_rate
 
 
@@ -271,8 +698,10 @@ def get_frame_size(inpath, use_ffmpeg=True):
         inpath: video path
         use_ffmpeg: whether to use ffmpeg (True) or OpenCV (False)
     '''
-    r = FFmpegVideoReader(inpath) if use_ffmpeg else OpenCVVideoReader(inpath)
-    with r:
+    if use_ffmpeg:
+        return VideoStreamInfo.build_for(inpath).frame_size
+
+    with OpenCVVideoReader(inpath) as r:
         return r.frame_size
 
 
@@ -283,8 +712,10 @@ def get_frame_count(inpath, use_ffmpeg=True):
         inpath: video path
         use_ffmpeg: whether to use ffmpeg (True) or OpenCV (False)
     '''
-    r = FFmpegVideoReader(inpath) if use_ffmpeg else OpenCVVideoReader(inpath)
-    with r:
+    if use_ffmpeg:
+        return VideoStreamInfo.build_for(inpath).total_frame_count
+
+    with OpenCVVideoReader(inpath) as r:
         return r.total_frame_count
 
 
@@ -321,7 +752,8 @@ def sample_first_frames(arg, k, size=None):
             of size [num_frames, height, width, num_channels]
         k: number of frames to extract
         size: an optional [width, height] to resize the sampled frames. By
-            default, the native dimensions of the frames are used
+            default, the native dimensions of the frames are used. Frames read
+            from disk are resized by the decoder
 
     Returns:
         A numpy array of size [k, height, width, num_channels]
@@ -329,15 +761,15 @@ def sample_first_frames(arg, k, size=None):
     # Read frames ...
     if isinstance(arg, six.string_types):
         # ... from disk
-        with FFmpegVideoReader(arg, frames="1-%d" % k) as vr:
+        with FFmpegVideoReader(arg, frames="1-%d" % k, size=size) as vr:
             imgs = [img for img in vr]
     else:
         # ... from tensor
         imgs = arg[:k]
 
-    # Resize frames, if necessary
-    if size:
-        imgs = [etai.resize(img, *size) for img in imgs]
+        # Resize frames, if necessary
+        if size:
+            imgs = [etai.resize(img, *size) for img in imgs]
 
     return np.array(imgs)
 
@@ -351,7 +783,8 @@ def uniformly_sample_frames(arg, k, size=None):
             of size [num_frames, height, width, num_channels]
         k: the number of frames to extract
         size: an optional [width, height] to resize the sampled frames. By
-            default, the native dimensions of the frames are used
+            default, the native dimensions of the frames are used. Frames read
+            from disk are resized by the decoder
 
     Returns:
         A numpy array of size [k, height, width, num_channels]
@@ -360,20 +793,24 @@ def uniformly_sample_frames(arg, k, size=None):
 
     # Compute 1-based frames
     num_frames = get_frame_count(arg) if is_video_file else len(arg)
-    frames = [int(round(i)) for i in np.linspace(1, min(num_frames, k), k)]
+    frames = [int(round(i)) for i in np.linspace(1, num_frames, k)]
 
     # Read frames ...
     if is_video_file:
         # ... from disk
-        with FFmpegVideoReader(arg, frames=frames) as vr:
-            imgs = [img for img in vr]
+        imgs = {}
+        with FFmpegVideoReader(
+                arg, frames=sorted(set(frames)), size=size) as vr:
+            for img in vr:
+                imgs[vr.frame_number] = img
+        imgs = [imgs[f] for f in frames]
     else:
         # ... from tensor
         imgs = [arg[f - 1] for f in frames]
 
-    # Resize frames, if necessary
-    if size:
-        imgs = [etai.resize(img, *size) for img in imgs]
+        # Resize frames, if necessary
+        if size:
+            imgs = [etai.resize(img, *size) for img in imgs]
 
     return np.array(imgs)
 
@@ -382,48 +819,123 @@ def sliding_window_sample_frames(arg, k, stride, size=None):
     '''Samples clips from the video using a sliding window of the given
     length and stride.
 
+    This function returns all clips in a single tensor. Use
+    `iter_sliding_window_clips` to process long videos in constant memory.
+
     Args:
         arg: can be either the path to the input video or an array of frames
             of size [num_frames, height, width, num_channels]
         k: the size of each window
         stride: the stride for sliding window
         size: an optional [width, height] to resize the sampled frames. By
-            default, the native dimensions of the frames are used
+            default, the native dimensions of the frames are used. Frames read
+            from disk are resized by the decoder
 
     Returns:
         A numpy array of size [XXXX, k, height, width, num_channels]
     '''
+    clips = [
+        np.array(batch) for batch in iter_sliding_window_clips(
+            arg, k, stride, size=size)]
+    if not clips:
+        return np.array(clips)
+    return np.concatenate(clips)
+
+
+DEFAULT_CLIP_BATCH_SIZE = 16
+
+
+def iter_sliding_window_clips(arg, k, stride, size=None, batch_size=None):
+    '''Returns a generator that yields batches of clips sampled from the
+    video using a sliding window of the given length and stride.
+
+    The frames are decoded sequentially into a rolling buffer holding the
+    frames spanned by one batch of clips, and each batch is a strided view
+    into that buffer, so memory usage is independent of the video length and
+    frames shared by overlapping clips are not duplicated.
+
+    Note that each yielded batch is only valid until the next batch is
+    requested, since the underlying buffer is reused. Copy the batch (e.g.,
+    via `np.array(batch)`) if it must outlive the iteration step.
+
+    Args:
+        arg: can be either the path to the input video or an array of frames
+            of size [num_frames, height, width, num_channels]
+        k: the size of each window
+        stride: the stride for sliding window
+        size: an optional [width, height] to resize the sampled frames. By
+            default, the native dimensions of the frames are used. Frames read
+            from disk are resized by the decoder
+        batch_size: the maximum number of clips in each batch. By default,
+            DEFAULT_CLIP_BATCH_SIZE is used
+
+    Returns:
+        a generator that yields read-only numpy arrays of size
+            [<= batch_size, k, height, width, num_channels]
+    '''
+    k = int(k)
+    stride = int(stride)
+    batch_size = int(batch_size or DEFAULT_CLIP_BATCH_SIZE)
     is_video_file = isinstance(arg, six.string_types)
 
-    # Determine clip indices
+    # Determine the number of clips and the last frame that they span
     num_frames = get_frame_count(arg) if is_video_file else len(arg)
-    delta = np.arange(1, k + 1)
-    offsets = np.array(list(range(0, num_frames + 1 - k, stride)))
-    clip_inds = offsets[:, np.newaxis] + delta[np.newaxis, :]
-    frames = list(np.unique(clip_inds))
+    if num_frames < k:
+        return
+    num_clips = (num_frames - k) // stride + 1
+    last_frame = (num_clips - 1) * stride + k
+
+    # The number of frames spanned by a full batch of clips
+    span = (batch_size - 1) * stride + k
+
+    buf = None
+    count = 0  # number of frames currently in the buffer
+    skip = 0  # number of frames to skip before the next clip starts
+    for img in _iter_frames(arg, last_frame, size):
+        if skip:
+            skip -= 1
+            continue
+
+        if buf is None:
+            buf = np.empty((span,) + img.shape, dtype=img.dtype)
+        buf[count] = img
+        count += 1
+
+        n = min(batch_size, num_clips)
+        if count < (n - 1) * stride + k:
+            continue
+
+        batch = np.lib.stride_tricks.as_strided(
+            buf, shape=(n, k) + buf.shape[1:],
+            strides=(stride * buf.strides[0],) + buf.strides)
+        batch.flags.writeable = False
+        yield batch
+
+        num_clips -= n
+        if not num_clips:
+            break
+
+        # Slide the frames needed by the next batch to the front
+        consumed = n * stride
+        if consumed < count:
+            buf[:count - consumed] = buf[consumed:count]
+            count -= consumed
+        else:
+            skip = consumed - count
+            count = 0
 
-    # Read frames ...
-    imgs = {}
-    if is_video_file:
+
+def _iter_frames(arg, last_frame, size):
+    if isinstance(arg, six.string_types):
         # ... from disk
-        with FFmpegVideoReader(arg, frames=frames) as vr:
+        with FFmpegVideoReader(
+                arg, frames="1-%d" % last_frame, size=size) as vr:
             for img in vr:
-                imgs[vr.frame_number] = img
+                yield img
     else:
         # ... from tensor
-        for fn in frames:
-            imgs[fn] = arg[fn - 1]
-
-    # Resize frames, if necessary
-    if size:
-        imgs = {fn: etai.resize(img, *size) for fn, img in iteritems(imgs)}
-
-    # Generate clips tensor
-    clips = []
-    for inds in clip_inds:
-        clips.append(np.array([imgs[k] for k in inds]))
-
-    return np.array(clips)
+        for img in arg[:last_frame]:
+            yield etai.resize(img, *size) if size else img
 
 
 class VideoProcessor(object):
@@ -443,21 +955,46 @@ class VideoProcessor(object):
             inpath,
             frames=None,
             in_use_ffmpeg=True,
+            in_fps=None,
+            in_size=None,
+            in_scale=None,
+            in_prefetch=None,
             out_use_ffmpeg=True,
             out_images_path=None,
             out_video_path=None,
             out_clips_path=None,
             out_fps=None,
             out_size=None,
-            out_opts=None):
+            out_opts=None,
+            out_async=False,
+            out_specs=None,
+            out_images_workers=0,
+            out_images_opts=None):
         '''Constructs a new VideoProcessor instance.
 
         Args:
             inpath: path to the input video. Passed directly to a VideoReader
             frames: an optional string specifying the range(s) of frames to
                 process. Passed directly to a VideoReader
-            in_use_ffmpeg: whether to use FFmpegVideoReader to read input
-                videos rather than OpenCVVideoReader
+            in_use_ffmpeg: whether to use FFmpegVideoReader (True, the
+                default) or OpenCVVideoReader (False) to read the input. If
+                None, the reader is chosen by VideoReader.open(), which
+                calibrates the backends the first time that it encounters
+                each encoding and resolution
+            in_fps: an optional frame rate at which to resample the input
+                video. Resampling is performed by the decoder, and `frames`
+                refers to the resampled frames. Not applicable when
+                in_use_ffmpeg = False
+            in_size: an optional (width, height) to which to resize the input
+                frames. At most one dimension can be -1, in which case the
+                aspect ratio is preserved. Resizing is performed by the
+                decoder. Not applicable when in_use_ffmpeg = False
+            in_scale: an optional positive number by which to scale the input
+                frames. Scaling is performed by the decoder. Not applicable
+                when in_use_ffmpeg = False
+            in_prefetch: an optional number of frames to decode ahead of the
+                consumer on a background thread via a PrefetchingVideoReader.
+                By default, frames are decoded synchronously
             out_use_ffmpeg: whether to use FFmpegVideoWriter to write output
                 videos rather than OpenCVVideoWriter
             out_images_path: a path like "/path/to/frames/%05d.png" with one
@@ -480,15 +1017,48 @@ class VideoProcessor(object):
             out_opts: a list of output video options for FFmpeg. Passed
                 directly to FFmpegVideoWriter. Only applicable when
                 out_use_ffmpeg = True
+            out_async: whether to encode output videos on a background thread
+                concurrently with processing. If True, images passed to
+                write() must not be modified in-place afterwards. Only
+                applicable when out_use_ffmpeg = True
+            out_specs: an optional list of VideoOutputSpec instances
+                describing additional outputs, each with its own frame rate,
+                size, frame subset, and encoding options. Every frame passed
+                to write() is fanned out to all of them, so the input is only
+                decoded once. The `frames` read by the processor must include
+                the frames requested by the specs
+            out_images_workers: the number of threads to use to encode and
+                write images to out_images_path and to the `images_path` of
+                each output spec. If 0 (the default), images are written
+                synchronously. If None, the number of CPUs is used. When
+                images are written asynchronously, images passed to write()
+                must not be modified in-place afterwards
+            out_images_opts: an optional dictionary of image encoding options
+                for out_images_path, e.g., {"png_compression": 1}. See
+                ImageSequenceWriter for the supported options
 
         Raises:
             VideoProcessorError: if insufficient options are supplied to
-                construct a VideoWriter
+                construct a VideoWriter, or if decoder-side resampling or
+                resizing was requested with in_use_ffmpeg = False
         '''
-        if in_use_ffmpeg:
-            self._reader = FFmpegVideoReader(inpath, frames=frames)
+        if in_use_ffmpeg is None:
+            self._reader = VideoReader.open(
+                inpath, frames=frames, fps=in_fps, size=in_size,
+                scale=in_scale)
+        elif in_use_ffmpeg:
+            self._reader = FFmpegVideoReader(
+                inpath, frames=frames, fps=in_fps, size=in_size,
+                scale=in_scale)
+        elif in_fps or in_size or in_scale:
+            raise VideoProcessorError(
+                "Decoder-side resampling and resizing are not supported "
+                "when in_use_ffmpeg = False")
         else:
             self._reader = OpenCVVideoReader(inpath, frames=frames)
+        if in_prefetch:
+            self._reader = PrefetchingVideoReader(
+                self._reader, prefetch=in_prefetch)
         self._video_clip_writer = None
         self._video_writer = None
         self._write_images = bool(out_images_path)
@@ -512,11 +1082,26 @@ class VideoProcessor(object):
                 "manually specify a frame rate" % str(self._reader.frame_rate))
         self.out_size = out_size if out_size else self._reader.frame_size
         self.out_opts = out_opts
+        self.out_async = out_async
 
         if self._write_video:
             self._video_writer = self._new_video_writer(
                 self.out_video_path)
 
+        self._images_writer = None
+        if self._write_images:
+            self._images_writer = ImageSequenceWriter(
+                out_images_path, num_workers=out_images_workers,
+                **(out_images_opts or {}))
+
+        self.out_specs = out_specs or []
+        self._spec_writers = [
+            _VideoOutputSpecWriter(
+                spec, self._reader.frame_rate, self._reader.frame_size,
+                use_ffmpeg=out_use_ffmpeg, async_write=out_async,
+                images_workers=out_images_workers)
+            for spec in self.out_specs]
+
     def __enter__(self):
         return self
 
@@ -581,31 +1166,40 @@ class VideoProcessor(object):
     def write(self, img):
         '''Writes the given image to the output writer(s).'''
         if self._write_images:
-            etai.write(img, self.out_images_path % self._reader.frame_number)
+            self._images_writer.write(img, self._reader.frame_number)
         if self._write_video:
             self._video_writer.write(img)
         if self._write_clips:
-            self._video_clip_writer.write(img)
+            self._video_clip_writer.write(img, self._reader.frame_number)
+        for writer in self._spec_writers:
+            writer.write(
+                img, self._reader.frame_number, self._reader.frame_range)
 
     def close(self):
         '''Closes the video processor.'''
         self._reader.close()
+        if self._images_writer is not None:
+            self._images_writer.close()
         if self._video_writer is not None:
             self._video_writer.close()
         if self._video_clip_writer is not None:
             self._video_clip_writer.close()
+        for writer in self._spec_writers:
+            writer.close()
 
     def _reset_video_clip_writer(self):
         if self._video_clip_writer is not None:
             self._video_clip_writer.close()
 
-        outpath = self.out_clips_path % self._reader.frame_range
-        self._video_clip_writer = self._new_video_writer(outpath)
+        self._video_clip_writer = _VideoClipWriter(
+            self.out_clips_path, self._reader.frame_range,
+            self._new_video_writer)
 
     def _new_video_writer(self, outpath):
         if self.out_use_ffmpeg:
             return FFmpegVideoWriter(
-                outpath, self.out_fps, self.out_size, out_opts=self.out_opts)
+                outpath, self.out_fps, self.out_size, out_opts=self.out_opts,
+                async_write=self.out_async)
 
         return OpenCVVideoWriter(
             outpath, self.out_fps, self.out_size)
@@ -615,102 +1209,881 @@ class VideoProcessorError(Exception):
     pass
 
 
-class VideoReader(object):
-    '''Base class for reading videos.'''
+class VideoOutputSpec(object):
+    '''Class describing an output of a VideoProcessor.
 
-    def __init__(self, inpath, frames):
-        self.inpath = inpath
-        if frames is None:
-            self.frames = "1-%d" % self.total_frame_count
-            self._ranges = FrameRanges.from_str(self.frames)
-        elif isinstance(frames, six.string_types):
-            # Frames string
-            if frames == "*":
-                frames = "1-%d" % self.total_frame_count
-            self.frames = frames
-            self._ranges = FrameRanges.from_str(frames)
-        elif isinstance(frames, list):
-            # Frames list
-            self._ranges = FrameRanges.from_list(frames)
-            self.frames = self._ranges.to_str()
-        elif isinstance(frames, (FrameRange, FrameRanges)):
-            # FrameRange or FrameRanges
-            self._ranges = frames
-            self.frames = frames.to_str()
-        else:
-            raise VideoReaderError("Invalid frames %s" % frames)
+    Output specs allow a single VideoProcessor to generate several outputs
+    (e.g., a downscaled preview video, a frame dump at 1 fps, and full
+    resolution clips) from one decoded stream.
+    '''
 
-    def __enter__(self):
-        return self
+    def __init__(
+            self,
+            images_path=None,
+            video_path=None,
+            clips_path=None,
+            frames=None,
+            fps=None,
+            size=None,
+            encoding_profile=None,
+            out_opts=None):
+        '''Constructs a new VideoOutputSpec instance.
 
-    def __exit__(self, *args):
-        self.close()
+        Args:
+            images_path: a path like "/path/to/frames/%05d.png" with one
+                placeholder that specifies where to save frames as individual
+                images
+            video_path: a path like "/path/to/video.mp4" that specifies where
+                to save a single video containing all of the output frames
+            clips_path: a path like "/path/to/video/%05d-%05d.mp4" with two
+                placeholders that specifies where to save a video clip for
+                each frame range
+            frames: an optional string like "1-3,6,8-10" or list of input
+                frame numbers to write. By default, all frames passed to the
+                processor are written
+            fps: an optional output frame rate. Frames are dropped as
+                necessary to achieve this rate. By default, or if fps exceeds
+                the input frame rate, the input frame rate is used
+            size: an optional output (width, height) of the frames. At most
+                one dimension can be -1, in which case the aspect ratio is
+                preserved. By default, the input frame size is used
+            encoding_profile: the name of the encoding profile to use for
+                output videos. By default, the ETA config profile is used
+            out_opts: an optional list of output video options for FFmpeg.
+                If provided, encoding_profile is ignored
+        '''
+        self.images_path = images_path
+        self.video_path = video_path
+        self.clips_path = clips_path
+        self.frames = frames
+        self.fps = fps
+        self.size = size
+        self.encoding_profile = encoding_profile
+        self.out_opts = out_opts
 
-    def __iter__(self):
-        return self
 
-    def __next__(self):
-        return self.read()
+class _VideoClipWriter(object):
+    '''Writes a video clip to a path like "/path/to/video/%05d-%05d.mp4"
+    generated from the (first, last) frames of its range.
 
-    @property
-    def frame_number(self):
-        '''The current frame number, or -1 if no frames have been read.'''
-        return self._ranges.frame
+    The last frame of an open-ended range is not known until the end of the
+    video is reached, so such clips are written to a temporary path and are
+    renamed when they are closed.
+    '''
 
-    @property
-    def frame_range(self):
-        '''The (first, last) frames for the current range, or (-1, -1) if no
-        frames have been read.
+    def __init__(self, clips_path, frame_range, new_video_writer):
+        self.clips_path = clips_path
+        self.first, self.last = frame_range
+        if self.last is not None:
+            self.outpath = clips_path % (self.first, self.last)
+        else:
+            root, ext = os.path.splitext(clips_path % (self.first, self.first))
+            self.outpath = root + "-partial" + ext
+
+        self._writer = new_video_writer(self.outpath)
+        self._last_frame = self.first
+
+    def write(self, img, frame_number):
+        self._writer.write(img)
+        self._last_frame = frame_number
+
+    def close(self, last_frame=None):
+        '''Closes the clip.
+
+        Args:
+            last_frame: the last frame of an open-ended range. By default, the
+                last frame written to the clip is used
         '''
-        return self._ranges.frame_range
+        self._writer.close()
+        if self.last is None:
+            outpath = self.clips_path % (
+                self.first, last_frame or self._last_frame)
+            etau.move_file(self.outpath, outpath)
+            self.outpath = outpath
 
-    @property
-    def is_new_frame_range(self):
-        '''Whether the current frame is the first in a new range.'''
-        return self._ranges.is_new_frame_range
 
-    @property
-    def encoding_str(self):
-        raise NotImplementedError("subclass must implement encoding_str")
+class _VideoOutputSpecWriter(object):
+    '''Writes the frames passed to a VideoProcessor to the outputs described
+    by a VideoOutputSpec.
+    '''
 
-    @property
-    def frame_size(self):
-        raise NotImplementedError("subclass must implement frame_size")
+    def __init__(
+            self, spec, in_fps, in_size, use_ffmpeg=True, async_write=False,
+            images_workers=0):
+        self.spec = spec
+        self.use_ffmpeg = use_ffmpeg
+        self.async_write = async_write
+
+        self.in_fps = in_fps
+        if spec.fps is not None and 0 < spec.fps < in_fps:
+            self.out_fps = spec.fps
+        else:
+            self.out_fps = in_fps
+        self.out_size = _compute_frame_size(in_size, size=spec.size)
 
-    @property
-    def frame_rate(self):
-        raise NotImplementedError("subclass must implement frame_rate")
+        if spec.out_opts is not None or spec.encoding_profile is None:
+            self.out_opts = spec.out_opts
+        else:
+            self.out_opts = get_encoding_profile_opts(spec.encoding_profile)
 
-    @property
-    def total_frame_count(self):
-        raise NotImplementedError("subclass must implement total_frame_count")
+        self._frames = None
+        if spec.frames is not None:
+            self._frames = to_frame_set(spec.frames)
 
-    def read(self):
-        raise NotImplementedError("subclass must implement read()")
+        self._images_writer = None
+        if spec.images_path:
+            self._images_writer = ImageSequenceWriter(
+                spec.images_path, num_workers=images_workers)
+
+        self._video_writer = None
+        self._clip_writer = None
+        self._clip_writer_range = None
+        self._clip_range = None
+        self._last_frame = None
+        self._last_out_idx = -1
+
+        if spec.video_path:
+            self._video_writer = self._new_video_writer(spec.video_path)
+
+    def write(self, img, frame_number, frame_range):
+        # Frame subset
+        if self._frames is not None:
+            firsts = self._frames.firsts
+            idx = np.searchsorted(firsts, frame_number, side="right") - 1
+            if idx < 0 or frame_number > self._frames.lasts[idx]:
+                return
+            frame_range = (int(firsts[idx]), int(self._frames.lasts[idx]))
+
+        if self._last_frame is None or frame_number != self._last_frame + 1:
+            self._clip_range = tuple(frame_range)
+        self._last_frame = frame_number
+
+        # Frame rate
+        if self.out_fps < self.in_fps:
+            out_idx = int((frame_number - 1) * self.out_fps / self.in_fps)
+            if out_idx <= self._last_out_idx:
+                return
+            self._last_out_idx = out_idx
+
+        # Frame size
+        if tuple(self.out_size) != (img.shape[1], img.shape[0]):
+            img = etai.resize(img, *self.out_size)
+
+        if self._images_writer is not None:
+            self._images_writer.write(img, frame_number)
+        if self._video_writer is not None:
+            self._video_writer.write(img)
+        if self.spec.clips_path:
+            if self._clip_range != self._clip_writer_range:
+                if self._clip_writer is not None:
+                    self._clip_writer.close()
+                self._clip_writer = _VideoClipWriter(
+                    self.spec.clips_path, self._clip_range,
+                    self._new_video_writer)
+                self._clip_writer_range = self._clip_range
+            self._clip_writer.write(img, frame_number)
 
     def close(self):
-        raise NotImplementedError("subclass must implement close()")
+        if self._images_writer is not None:
+            self._images_writer.close()
+        if self._video_writer is not None:
+            self._video_writer.close()
+        if self._clip_writer is not None:
+            # Frames at the end of the range may have been dropped by
+            # resampling, but they still belong to the clip
+            self._clip_writer.close(last_frame=self._last_frame)
+
+    def _new_video_writer(self, outpath):
+        if self.use_ffmpeg:
+            return FFmpegVideoWriter(
+                outpath, self.out_fps, self.out_size, out_opts=self.out_opts,
+                async_write=self.async_write)
 
+        return OpenCVVideoWriter(outpath, self.out_fps, self.out_size)
 
-class VideoReaderError(Exception):
-    pass
 
+class ParallelVideoProcessor(object):
+    '''Class for applying a stateless per-frame function to a video using
+    multiple processes.
 
-class FFmpegVideoReader(VideoReader):
-    '''Class for reading video using ffmpeg.
+    The input video is split into contiguous, keyframe-aligned frame ranges,
+    each of which is read, processed, and encoded by a separate worker process
+    with its own VideoProcessor. The encoded segments are then concatenated
+    into the output video using ffmpeg's concat demuxer, without re-encoding.
 
-    The input video can be a standalone video file like "/path/to/video.mp4"
-    or a directory of frames like "/path/to/frames/%05d.png". This path is
-    passed directly to ffmpeg.
+    The typical usage is:
+    ```
+    def process_frame(img):
+        return ... # process img
 
-    A frames string like "1-5,10-15" can optionally be passed to only read
-    certain frame ranges.
+    ParallelVideoProcessor(
+        "/path/to/video.mp4", "/path/to/output.mp4", process_frame).run()
+    ```
 
-    This class uses 1-based indexing for all frame operations.
+    Note that `process_frame` is called in worker processes, so it must be
+    picklable (e.g., a module-level function) and must not depend on state
+    carried between frames.
     '''
 
-    def __init__(self, inpath, frames=None):
-        '''Constructs a new VideoReader with ffmpeg backend.
+    def __init__(
+            self,
+            inpath,
+            outpath,
+            process_frame,
+            num_workers=None,
+            num_segments=None,
+            out_fps=None,
+            out_size=None,
+            out_opts=None):
+        '''Constructs a new ParallelVideoProcessor instance.
+
+        Args:
+            inpath: path to the input video file
+            outpath: path to the output video file
+            process_frame: a picklable function that accepts an image and
+                returns the processed image to write
+            num_workers: the number of worker processes to use. By default,
+                the number of CPUs is used
+            num_segments: the number of segments into which to split the
+                video. By default, num_workers segments are used
+            out_fps: an optional frame rate for the output video. By default,
+                the input frame rate is used
+            out_size: the frame size for the output video. If out_size is
+                None, the input frame size is assumed
+            out_opts: an optional list of output video options for FFmpeg.
+                All segments are encoded with these options, so they can be
+                concatenated without re-encoding
+        '''
+        self.inpath = inpath
+        self.outpath = outpath
+        self.process_frame = process_frame
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.num_segments = num_segments or self.num_workers
+        self.out_fps = out_fps or get_frame_rate(inpath)
+        self.out_size = out_size
+        self.out_opts = out_opts
+
+    def get_segments(self):
+        '''Computes the frame ranges into which the video will be split.
+
+        Segment boundaries are moved to the nearest keyframe so that each
+        worker can seek directly to the start of its segment.
+
+        When the frame count of the video is only an estimate, segments only
+        start at keyframes, which are known to exist, and the last segment is
+        open-ended, i.e., it extends to the end of the video. If no keyframes
+        are available in this case, the video is processed as a single
+        segment.
+
+        Returns:
+            a list of (first, last) frame number tuples, where `last` is None
+                for an open-ended segment
+        '''
+        stream_info = VideoStreamInfo.build_for(self.inpath)
+        total_frame_count = stream_info.total_frame_count
+        is_exact = stream_info.is_frame_count_exact
+
+        try:
+            keyframes = np.array(get_keyframe_numbers(self.inpath), dtype=int)
+        except FFprobeError as e:
+            logger.warning(
+                "Unable to find keyframes in '%s'; segments will not be "
+                "keyframe aligned: %s", self.inpath, e)
+            keyframes = np.array([], dtype=int)
+
+        if is_exact:
+            keyframes = keyframes[
+                (keyframes > 1) & (keyframes <= total_frame_count)]
+        else:
+            keyframes = keyframes[keyframes > 1]
+            if not keyframes.size:
+                logger.warning(
+                    "The frame count of '%s' is an estimate and its keyframes "
+                    "are unknown; processing it as a single segment",
+                    self.inpath)
+                return [(1, None)]
+
+            total_frame_count = max(total_frame_count, int(keyframes[-1]))
+
+        num_segments = min(self.num_segments, total_frame_count)
+        starts = set([1])
+        for idx in range(1, num_segments):
+            start = 1 + (idx * total_frame_count) // num_segments
+            if keyframes.size:
+                start = int(keyframes[np.argmin(np.abs(keyframes - start))])
+            starts.add(start)
+
+        starts = sorted(starts)
+        stops = [s - 1 for s in starts[1:]]
+        stops.append(total_frame_count if is_exact else None)
+        return list(zip(starts, stops))
+
+    def run(self):
+        '''Processes the video.'''
+        segments = self.get_segments()
+        ext = os.path.splitext(self.outpath)[1]
+        with etau.TempDir() as d:
+            tasks = []
+            for idx, (first, last) in enumerate(segments, 1):
+                segment_path = os.path.join(d, "%05d%s" % (idx, ext))
+                tasks.append((
+                    self.inpath, FrameRange(first, last).to_str(),
+                    segment_path, self.process_frame, self.out_fps,
+                    self.out_size, self.out_opts))
+
+            logger.info(
+                "Processing %d segments of '%s' with %d workers",
+                len(tasks), self.inpath, self.num_workers)
+            pool = multiprocessing.Pool(min(self.num_workers, len(tasks)))
+            try:
+                segment_paths = pool.map(_process_video_segment, tasks)
+            finally:
+                pool.close()
+                pool.join()
+
+            concat_videos(segment_paths, self.outpath)
+
+
+def _process_video_segment(args):
+    inpath, frames, outpath, process_frame, out_fps, out_size, out_opts = args
+    with VideoProcessor(
+            inpath, frames=frames, out_video_path=outpath, out_fps=out_fps,
+            out_size=out_size, out_opts=out_opts) as p:
+        for img in p:
+            p.write(process_frame(img))
+
+    return outpath
+
+
+def concat_videos(inpaths, outpath):
+    '''Concatenates the given videos using ffmpeg's concat demuxer.
+
+    The streams are copied without re-encoding, so the input videos must have
+    been encoded with the same codec and parameters.
+
+    Args:
+        inpaths: a list of input video paths
+        outpath: the output video path
+    '''
+    with etau.TempDir() as d:
+        list_path = os.path.join(d, "concat.txt")
+        with open(list_path, "w") as f:
+            for inpath in inpaths:
+                inpath = os.path.abspath(inpath).replace("'", "'\\''")
+                f.write("file '%s'\n" % inpath)
+
+        ffmpeg = FFmpeg(
+            in_opts=["-f", "concat", "-safe", "0"],
+            out_opts=["-c", "copy"])
+        ffmpeg.run(list_path, outpath)
+
+
+def extract_clip(inpath, outpath, first, last, keyframes=None):
+    '''Extracts the given frame range of the video into a new video by
+    copying the encoded streams, i.e., without decoding or re-encoding.
+
+    Since a stream copy can only start at a keyframe, the start of the clip
+    is moved back to the nearest keyframe at or before `first`. Use
+    VideoProcessor when frame-exact clips are required.
+
+    Args:
+        inpath: the input video path
+        outpath: the output video path
+        first: the first frame of the clip (1-based)
+        last: the last frame of the clip (1-based, inclusive)
+        keyframes: an optional sorted list of keyframe numbers, as returned
+            by get_keyframe_numbers(). If omitted, the keyframes are computed
+
+    Returns:
+        the (first, last) frames that were actually written to the clip
+    '''
+    if keyframes is None:
+        keyframes = get_keyframe_numbers(inpath)
+
+    # Snap to the last keyframe at or before the requested first frame
+    idx = int(np.searchsorted(keyframes, first, side="right"))
+    start = keyframes[idx - 1] if idx > 0 else 1
+
+    # Seek to the middle of the keyframe so that rounding cannot land on the
+    # previous keyframe
+    frame_rate = get_frame_rate(inpath)
+    ffmpeg = FFmpeg(
+        in_opts=["-ss", "%.6f" % ((start - 0.5) / frame_rate)],
+        out_opts=[
+            "-frames:v", str(last - start + 1),
+            "-c", "copy",
+            "-an",
+        ])
+    ffmpeg.run(inpath, outpath)
+    return start, last
+
+
+def get_keyframe_numbers(inpath, use_index=None):
+    '''Gets the frame numbers of the keyframes in the video using a
+    demux-only `ffprobe -show_packets` pass.
+
+    Args:
+        inpath: the input video path
+        use_index: whether to load (or build and save) the KeyframeIndex for
+            the video rather than probing it directly. By default,
+            `eta.config.use_keyframe_index` is used
+
+    Returns:
+        a sorted list of 1-based keyframe numbers
+
+    Raises:
+        FFprobeError: if the keyframes could not be determined
+    '''
+    if use_index is None:
+        use_index = eta.config.use_keyframe_index
+
+    if use_index:
+        return KeyframeIndex.get_for(inpath).frames.tolist()
+
+    return _probe_keyframes(inpath)[0]
+
+
+class KeyframeIndex(object):
+    '''An index of the keyframes of a video.
+
+    The index is built once via a demux-only ffprobe pass and saved as a
+    compact .npz file, either next to the video or, if
+    `eta.config.keyframe_index_dir` is set, in that directory under the
+    content hash of the video. Subsequent lookups (in this or any later
+    process) load the saved index instead of probing the video again.
+
+    Attributes:
+        frames: a sorted array of the 1-based keyframe numbers
+        times: an array of the presentation times of the keyframes, in
+            seconds relative to the start of the video
+        content_hash: the content hash of the indexed video, if known
+    '''
+
+    # The extension of index files stored next to their videos
+    SIDECAR_EXT = ".keyframes.npz"
+
+    def __init__(self, frames, times, content_hash=None):
+        '''Constructs a KeyframeIndex.
+
+        Args:
+            frames: an array-like of 1-based keyframe numbers
+            times: an array-like of the presentation times of the keyframes,
+                in seconds relative to the start of the video
+            content_hash: an optional content hash of the indexed video
+        '''
+        self.frames = np.asarray(frames, dtype=np.int64)
+        self.times = np.asarray(times, dtype=np.float64)
+        self.content_hash = content_hash
+
+    @property
+    def num_keyframes(self):
+        '''The number of keyframes in the video.'''
+        return self.frames.size
+
+    def get_preceding_keyframe(self, frame_number):
+        '''Returns the last keyframe at or before the given frame, or None if
+        there is no such keyframe.
+        '''
+        idx = np.searchsorted(self.frames, frame_number, side="right")
+        return int(self.frames[idx - 1]) if idx > 0 else None
+
+    def write(self, path):
+        '''Writes the index to the given .npz file.'''
+        etau.ensure_basedir(path)
+        with open(path, "wb") as f:
+            np.savez(
+                f, frames=self.frames, times=self.times,
+                content_hash=np.array(self.content_hash or ""))
+
+    @classmethod
+    def load(cls, path):
+        '''Loads a KeyframeIndex from the given .npz file.'''
+        with np.load(path) as d:
+            return cls(
+                d["frames"], d["times"],
+                content_hash=str(d["content_hash"]) or None)
+
+    @classmethod
+    def build_for(cls, inpath):
+        '''Builds the KeyframeIndex for the given video via a demux-only
+        `ffprobe -show_packets` pass.
+
+        Raises:
+            FFprobeError: if the keyframes could not be determined
+        '''
+        frames, times = _probe_keyframes(inpath)
+        return cls(frames, times, content_hash=_compute_content_hash(inpath))
+
+    @classmethod
+    def get_for(cls, inpath):
+        '''Gets the KeyframeIndex for the given video, loading it from disk
+        if it was previously built and otherwise building and saving it.
+
+        Raises:
+            FFprobeError: if the keyframes could not be determined
+        '''
+        key = VideoStreamInfoCache._make_key(inpath)
+        index = _KEYFRAME_INDICES.get(key, None)
+        if index is not None:
+            return index
+
+        content_hash = _compute_content_hash(inpath)
+        path = cls.get_index_path(inpath, content_hash=content_hash)
+        index = None
+        if os.path.isfile(path):
+            try:
+                index = cls.load(path)
+            except Exception as e:
+                logger.warning(
+                    "Unable to load keyframe index '%s': %s", path, e)
+            if index is not None and index.content_hash != content_hash:
+                logger.debug("Keyframe index '%s' is stale", path)
+                index = None
+
+        if index is None:
+            index = cls.build_for(inpath)
+            try:
+                index.write(path)
+            except EnvironmentError as e:
+                logger.warning(
+                    "Unable to write keyframe index '%s': %s", path, e)
+
+        if key is not None:
+            _KEYFRAME_INDICES[key] = index
+        return index
+
+    @classmethod
+    def get_index_path(cls, inpath, content_hash=None):
+        '''Returns the path at which the index for the given video is stored.
+
+        Args:
+            inpath: the input video path
+            content_hash: the content hash of the video, if known. Only used
+                when `eta.config.keyframe_index_dir` is set
+        '''
+        index_dir = eta.config.keyframe_index_dir
+        if not index_dir:
+            return inpath + cls.SIDECAR_EXT
+
+        content_hash = content_hash or _compute_content_hash(inpath)
+        return os.path.join(index_dir, content_hash + ".npz")
+
+
+# The keyframe indices loaded by KeyframeIndex.get_for() in this process
+_KEYFRAME_INDICES = {}
+
+
+def _probe_keyframes(inpath):
+    try:
+        stream_info = VideoStreamInfo.build_for(inpath)
+        frame_rate = stream_info.frame_rate
+        start_time = float(stream_info.stream_info.get("start_time", 0))
+
+        ffprobe = FFprobe(opts=[
+            "-select_streams", "v:0",                   # first video stream
+            "-show_entries", "packet=pts_time,flags",   # only what we need
+            "-print_format", "json",                    # return in JSON format
+        ])
+        out = ffprobe.run(inpath, decode=True)
+        packets = json.loads(out)["packets"]
+    except Exception:
+        raise FFprobeError("Unable to get keyframes for '%s'" % inpath)
+
+    keyframes = {}
+    for packet in packets:
+        if "K" not in packet.get("flags", ""):
+            continue
+        try:
+            t = float(packet["pts_time"]) - start_time
+        except (KeyError, ValueError):
+            continue
+        keyframes[int(round(t * frame_rate)) + 1] = t
+
+    frames = sorted(keyframes)
+    return frames, [keyframes[f] for f in frames]
+
+
+def _compute_content_hash(inpath, chunk_size=1 << 20):
+    # Hashes the size of the file along with its first and last chunks, which
+    # identifies a video file without reading all of it
+    size = os.path.getsize(inpath)
+    md5 = hashlib.md5(str(size).encode("utf-8"))
+    with open(inpath, "rb") as f:
+        md5.update(f.read(chunk_size))
+        if size > chunk_size:
+            f.seek(max(size - chunk_size, chunk_size))
+            md5.update(f.read(chunk_size))
+    return md5.hexdigest()
+
+
+class VideoReader(object):
+    '''Base class for reading videos.
+
+    In addition to iterating over the frames specified at construction time,
+    readers that support random access implement `get_frame()`, which can be
+    freely interleaved with iteration.
+
+    When all frames are requested and `total_frame_count` is only an
+    estimate, the reader reads the open-ended range "1-", i.e., until the end
+    of the video.
+    '''
+
+    # The default number of recently accessed frames cached by get_frame()
+    DEFAULT_CACHE_SIZE = 8
+
+    def __init__(self, inpath, frames):
+        self.inpath = inpath
+        if frames is None or frames == "*":
+            # All frames
+            if self.is_frame_count_exact:
+                self._ranges = FrameRanges([(1, self.total_frame_count)])
+            else:
+                self._ranges = FrameRanges([(1, None)])
+            self.frames = self._ranges.to_str()
+        elif isinstance(frames, six.string_types):
+            # Frames string
+            self.frames = frames
+            self._ranges = FrameRanges.from_str(frames)
+        elif isinstance(frames, list):
+            # Frames list
+            self._ranges = FrameRanges.from_list(frames)
+            self.frames = self._ranges.to_str()
+        elif isinstance(frames, FrameRange):
+            # FrameRange
+            self._ranges = FrameRanges([(frames.first, frames.last)])
+            self.frames = frames.to_str()
+        elif isinstance(frames, FrameRanges):
+            # FrameRanges
+            self._ranges = frames
+            self.frames = frames.to_str()
+        elif isinstance(frames, FrameSet):
+            # FrameSet
+            self._ranges = FrameRanges.from_frame_set(frames)
+            self.frames = frames.to_str()
+        else:
+            raise VideoReaderError("Invalid frames %s" % frames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.read()
+
+    @property
+    def frame_number(self):
+        '''The current frame number, or -1 if no frames have been read.'''
+        return self._ranges.frame
+
+    @property
+    def frame_range(self):
+        '''The (first, last) frames for the current range, or (-1, -1) if no
+        frames have been read. `last` is None if the range is open-ended.
+        '''
+        return self._ranges.frame_range
+
+    @property
+    def is_new_frame_range(self):
+        '''Whether the current frame is the first in a new range.'''
+        return self._ranges.is_new_frame_range
+
+    @property
+    def is_frame_count_exact(self):
+        '''Whether `total_frame_count` is exact rather than an estimate.'''
+        return True
+
+    @property
+    def encoding_str(self):
+        raise NotImplementedError("subclass must implement encoding_str")
+
+    @property
+    def frame_size(self):
+        raise NotImplementedError("subclass must implement frame_size")
+
+    @property
+    def frame_rate(self):
+        raise NotImplementedError("subclass must implement frame_rate")
+
+    @property
+    def total_frame_count(self):
+        raise NotImplementedError("subclass must implement total_frame_count")
+
+    def read(self):
+        raise NotImplementedError("subclass must implement read()")
+
+    def get_frame(self, frame_number):
+        '''Gets the given frame of the video.
+
+        Args:
+            frame_number: the frame number
+
+        Returns:
+            the frame
+        '''
+        raise NotImplementedError("subclass must implement get_frame()")
+
+    def get_frames(self, frame_numbers):
+        '''Gets the given frames of the video.
+
+        The distinct frames are decoded in ascending order, so the decoder
+        only moves forward, regardless of the order of `frame_numbers`.
+
+        Args:
+            frame_numbers: an iterable of frame numbers
+
+        Returns:
+            a list of frames, in the same order as frame_numbers
+        '''
+        frame_numbers = list(frame_numbers)
+        imgs = {}
+        for frame_number in sorted(set(frame_numbers)):
+            imgs[frame_number] = self.get_frame(frame_number)
+
+        return [imgs[frame_number] for frame_number in frame_numbers]
+
+    def close(self):
+        raise NotImplementedError("subclass must implement close()")
+
+    @staticmethod
+    def open(inpath, frames=None, backend=None, **kwargs):
+        '''Opens a VideoReader for the given input, choosing its backend.
+
+        Image sequences like "/path/to/frames/%05d.png" are read via an
+        ImageSequenceReader. Video files are read via whichever of
+        FFmpegVideoReader and OpenCVVideoReader decoded videos with the same
+        encoding and resolution fastest under the same access pattern (dense
+        or sparse), as recorded by a VideoReaderCalibration. Keyword
+        arguments that only one backend supports, e.g., `size`, force that
+        backend.
+
+        Args:
+            inpath: path to the input video or image sequence
+            frames: one of the following optional quantities specifying a
+                collection of frames to process:
+                    - None (all frames - the default)
+                    - "*" (all frames)
+                    - a string like "1-3,6,8-10"
+                    - a list like [1, 2, 3, 6, 8, 9, 10]
+                    - a FrameRange or FrameRanges instance
+                    - a FrameSet instance
+            backend: an optional backend to use, from VIDEO_READER_BACKENDS.
+                By default, the backend is chosen automatically
+            **kwargs: optional keyword arguments for the constructor of the
+                reader. Arguments whose value is None are ignored
+
+        Returns:
+            a VideoReader
+
+        Raises:
+            VideoReaderError: if an unsupported backend was requested, or if
+                the keyword arguments are not supported for the input
+        '''
+        kwargs = {k: v for k, v in iteritems(kwargs) if v is not None}
+        is_auto = backend is None
+        if is_auto:
+            backend = _choose_video_reader_backend(inpath, frames, kwargs)
+
+        if backend == "images":
+            return ImageSequenceReader(inpath, frames=frames, **kwargs)
+
+        if backend == "ffmpeg":
+            return FFmpegVideoReader(inpath, frames=frames, **kwargs)
+
+        if backend == "opencv":
+            try:
+                return OpenCVVideoReader(inpath, frames=frames, **kwargs)
+            except VideoReaderError:
+                if not is_auto:
+                    raise
+                logger.warning(
+                    "OpenCV failed to open '%s'; falling back to ffmpeg",
+                    inpath)
+                return FFmpegVideoReader(inpath, frames=frames, **kwargs)
+
+        raise VideoReaderError(
+            "Unsupported backend '%s'; supported values are %s" % (
+                backend, VIDEO_READER_BACKENDS))
+
+
+class VideoReaderError(Exception):
+    pass
+
+
+class _EndOfVideoError(VideoReaderError):
+    '''Exception raised when a reader reaches the end of the video before the
+    requested frame.
+    '''
+    pass
+
+
+class _FrameCache(object):
+    '''An LRU cache of decoded frames, keyed by frame number.'''
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._frames = OrderedDict()
+
+    def get(self, frame_number):
+        img = self._frames.pop(frame_number, None)
+        if img is not None:
+            self._frames[frame_number] = img
+        return img
+
+    def put(self, frame_number, img):
+        if self.max_size <= 0:
+            return
+
+        self._frames.pop(frame_number, None)
+        self._frames[frame_number] = img
+        while len(self._frames) > self.max_size:
+            self._frames.popitem(last=False)
+
+    def clear(self):
+        self._frames.clear()
+
+
+class FFmpegVideoReader(VideoReader):
+    '''Class for reading video using ffmpeg.
+
+    The input video can be a standalone video file like "/path/to/video.mp4"
+    or a directory of frames like "/path/to/frames/%05d.png". This path is
+    passed directly to ffmpeg.
+
+    A frames string like "1-5,10-15" can optionally be passed to only read
+    certain frame ranges. When the gap between consecutive requested frames
+    of a video file exceeds a threshold, ffmpeg is restarted with an
+    input-side seek rather than decoding and discarding the skipped frames.
+
+    The reader can optionally resize, resample, and convert the pixel format
+    of the frames inside ffmpeg, so that only the bytes that are actually
+    needed are piped back to Python.
+
+    This class uses 1-based indexing for all frame operations.
+    '''
+
+    # The default number of skipped frames above which the reader will seek
+    DEFAULT_SEEK_THRESHOLD = 250
+
+    # The supported output pixel formats and their number of channels
+    PIX_FMT_CHANNELS = {"rgb24": 3, "bgr24": 3, "gray": 1}
+
+    def __init__(
+            self, inpath, frames=None, num_buffers=None, copy=False,
+            seek_threshold=None, fps=None, size=None, scale=None,
+            pix_fmt="rgb24", cache_size=None, use_keyframe_index=None):
+        '''Constructs a new VideoReader with ffmpeg backend.
+
+        By default, each frame is read from the ffmpeg pipe directly into a
+        newly allocated numpy array. When `num_buffers` is provided, frames
+        are instead read into a ring of `num_buffers` preallocated arrays that
+        are recycled as reading proceeds, so the array returned by `read()` is
+        only valid until `num_buffers` more frames have been read. Callers
+        that need to hold onto frames in this mode should pass `copy=True`.
 
         Args:
             inpath: path to the input video, which can be a standalone video
@@ -724,41 +2097,517 @@ class FFmpegVideoReader(VideoReader):
                     - a string like "1-3,6,8-10"
                     - a list like [1, 2, 3, 6, 8, 9, 10]
                     - a FrameRange or FrameRanges instance
+                    - a FrameSet instance
+            num_buffers: an optional number of preallocated frame buffers to
+                recycle when reading frames. By default, a new array is
+                allocated for each frame
+            copy: whether to return a copy of each frame when reading into
+                preallocated buffers. Only applicable when `num_buffers` is
+                provided. The default is False
+            seek_threshold: the number of skipped frames above which the
+                reader seeks to the next requested frame rather than decoding
+                the skipped frames. A negative value disables seeking. By
+                default, self.DEFAULT_SEEK_THRESHOLD is used
+            fps: an optional frame rate at which to resample the video. If
+                provided, `frames` refers to the resampled frames
+            size: an optional (width, height) to which to resize each frame.
+                At most one dimension can be -1, in which case the aspect
+                ratio is preserved
+            scale: an optional positive number by which to scale each frame.
+                Only applicable when `size` is not provided
+            pix_fmt: the pixel format of the returned frames. Supported values
+                are "rgb24" (the default), "bgr24", and "gray". Grayscale
+                frames are returned as 2D arrays
+            cache_size: the number of recently accessed frames to cache in
+                get_frame(). By default, self.DEFAULT_CACHE_SIZE is used
+            use_keyframe_index: whether to use the KeyframeIndex of the video
+                to decide when to seek. When an index is available, the
+                reader seeks only if doing so skips decoding more than
+                `seek_threshold` frames, i.e., if there is a keyframe far
+                enough past the current position. By default,
+                `eta.config.use_keyframe_index` is used. Not applicable when
+                resampling the video
+
+        Raises:
+            VideoReaderError: if an unsupported pixel format was requested
         '''
+        if pix_fmt not in self.PIX_FMT_CHANNELS:
+            raise VideoReaderError("Unsupported pixel format '%s'" % pix_fmt)
+
         self._stream_info = VideoStreamInfo.build_for(inpath)
+        self._in_frame_size = self._stream_info.frame_size
+        self._out_frame_size = _compute_frame_size(
+            self._in_frame_size, size=size, scale=scale)
+        self._out_frame_rate = fps if fps is not None and fps > 0 else None
+        self._pix_fmt = pix_fmt
+        self._ffmpeg = None
+        self._raw_frame = None
+        self._decoder_frame = 0
+
+        if seek_threshold is None:
+            seek_threshold = self.DEFAULT_SEEK_THRESHOLD
+        self._seek_threshold = seek_threshold
+        self._can_seek = is_supported_video_file(inpath)
+
+        if use_keyframe_index is None:
+            use_keyframe_index = eta.config.use_keyframe_index
+        self._keyframe_index = None
+        if (use_keyframe_index and self._can_seek and
+                self._out_frame_rate is None):
+            try:
+                self._keyframe_index = KeyframeIndex.get_for(inpath)
+            except FFprobeError as e:
+                logger.warning(e)
+
+        width, height = self.frame_size
+        num_channels = self.PIX_FMT_CHANNELS[pix_fmt]
+        if num_channels > 1:
+            self._frame_shape = (height, width, num_channels)
+        else:
+            self._frame_shape = (height, width)
+        self._copy = copy and bool(num_buffers)
+        self._buffers = [
+            np.empty(self._frame_shape, dtype=np.uint8)
+            for _ in range(num_buffers or 0)
+        ]
+        self._buffer_idx = 0
+
+        if cache_size is None:
+            cache_size = self.DEFAULT_CACHE_SIZE
+        self._cache = _FrameCache(cache_size)
+
+        super(FFmpegVideoReader, self).__init__(inpath, frames)
+
+        self._open_ffmpeg()
+
+    @property
+    def encoding_str(self):
+        '''Return the video encoding string.'''
+        return self._stream_info.encoding_str
+
+    @property
+    def frame_size(self):
+        '''The (width, height) of each frame returned by the reader.'''
+        return self._out_frame_size
+
+    @property
+    def frame_rate(self):
+        '''The frame rate of the frames returned by the reader.'''
+        return self._out_frame_rate or self._stream_info.frame_rate
+
+    @property
+    def total_frame_count(self):
+        '''The total number of frames in the video, or 0 if it could not be
+        determined.
+
+        When the video is being resampled, this is the number of frames in
+        the resampled video.
+        '''
+        count = self._stream_info.total_frame_count
+        if self._out_frame_rate is None:
+            return count
+
+        return int(
+            count * self._out_frame_rate / self._stream_info.frame_rate)
+
+    @property
+    def is_frame_count_exact(self):
+        '''Whether `total_frame_count` is exact rather than an estimate.
+
+        The frame count of a resampled video is always an estimate.
+        '''
+        return (
+            self._out_frame_rate is None and
+            self._stream_info.is_frame_count_exact)
+
+    def read(self):
+        '''Reads the next frame.
+
+        Returns:
+            img: the next frame
+
+        Raises:
+            StopIteration: if there are no more frames to process, including
+                when the end of the video is reached in an open-ended range
+            VideoReaderError: if unable to load the next frame from file
+        '''
+        frame = next(self._ranges)
+        try:
+            return self._decode(frame)
+        except _EndOfVideoError:
+            if self._ranges.is_open_ended:
+                raise StopIteration
+            raise
+
+    def get_frame(self, frame_number):
+        '''Gets the given frame of the video.
+
+        The open decoder is reused when moving forward by at most the seek
+        threshold; otherwise, the reader seeks (or, for non-seekable inputs,
+        restarts decoding) before reading the frame. Recently accessed frames
+        are served from an LRU cache, so the returned array must not be
+        modified in-place.
+
+        This method can be interleaved with iteration over the reader.
+
+        Args:
+            frame_number: the frame number
+
+        Returns:
+            the frame
+
+        Raises:
+            VideoReaderError: if unable to load the frame
+        '''
+        img = self._cache.get(frame_number)
+        if img is None:
+            img = self._decode(frame_number)
+            if self._buffers and not self._copy:
+                img = img.copy()
+            self._cache.put(frame_number, img)
+
+        return img
+
+    def close(self):
+        '''Closes the video reader.'''
+        self._ffmpeg.close()
+        self._cache.clear()
+
+    def _decode(self, frame):
+        if frame < 1:
+            raise VideoReaderError("Invalid frame number %d" % frame)
+
+        if frame <= self._decoder_frame:
+            self._rewind(frame)
+        elif self._should_seek(frame):
+            self._seek(frame)
+
+        while self._decoder_frame < frame:
+            num_bytes = self._grab()
+            if num_bytes == 0:
+                raise _EndOfVideoError(
+                    "Failed to grab frame %d; the video has ended" %
+                    (self._decoder_frame + 1))
+            if num_bytes != self._raw_frame.nbytes:
+                raise VideoReaderError(
+                    "Failed to grab frame %d" % (self._decoder_frame + 1))
+            self._decoder_frame += 1
+
+        return self._retrieve()
+
+    def _open_ffmpeg(self, start_frame=1):
+        in_opts = None
+        if start_frame > 1:
+            # Input-side seeking jumps to the nearest preceding keyframe and
+            # then decodes (without outputting) up to the requested time, so
+            # the first frame piped to us is exactly `start_frame`. We aim
+            # half a frame early to be robust to timestamp rounding
+            t = (start_frame - 1.5) / self.frame_rate
+            in_opts = ["-ss", "%.6f" % t]
+
+        if self._out_frame_size != self._in_frame_size:
+            size = self._out_frame_size
+        else:
+            size = None
+
         self._ffmpeg = FFmpeg(
+            fps=self._out_frame_rate,
+            size=size,
+            in_opts=in_opts,
             out_opts=[
                 "-f", 'image2pipe',         # pipe frames to stdout
                 "-vcodec", "rawvideo",      # output will be raw video
-                "-pix_fmt", "rgb24",        # pixel format
+                "-pix_fmt", self._pix_fmt,  # pixel format
             ],
         )
-        self._ffmpeg.run(inpath, "-")
-        self._raw_frame = None
+        self._ffmpeg.run(self.inpath, "-")
+        self._decoder_frame = start_frame - 1
+
+    def _should_seek(self, frame):
+        if not self._can_seek or self._seek_threshold < 0:
+            return False
+
+        if self._keyframe_index is not None:
+            # Seeking only saves the frames between the current position and
+            # the keyframe from which ffmpeg will decode
+            keyframe = self._keyframe_index.get_preceding_keyframe(frame)
+            if keyframe is None:
+                return False
+            return keyframe - self._decoder_frame - 1 > self._seek_threshold
+
+        return frame - self._decoder_frame - 1 > self._seek_threshold
+
+    def _seek(self, frame):
+        logger.debug("Seeking to frame %d of '%s'", frame, self.inpath)
+        self._ffmpeg.close()
+        self._open_ffmpeg(start_frame=frame)
+
+    def _rewind(self, frame):
+        if self._can_seek:
+            self._seek(frame)
+        else:
+            logger.debug("Restarting decoding of '%s'", self.inpath)
+            self._ffmpeg.close()
+            self._open_ffmpeg()
+
+    def _grab(self):
+        if self._buffers:
+            self._raw_frame = self._buffers[self._buffer_idx]
+        else:
+            self._raw_frame = np.empty(self._frame_shape, dtype=np.uint8)
+
+        return self._ffmpeg.read_into(self._raw_frame)
+
+    def _retrieve(self):
+        if not self._buffers:
+            return self._raw_frame
+
+        self._buffer_idx = (self._buffer_idx + 1) % len(self._buffers)
+        return self._raw_frame.copy() if self._copy else self._raw_frame
+
+
+class PrefetchingVideoReader(VideoReader):
+    '''Class that wraps a VideoReader and decodes frames ahead of the
+    consumer on a background thread.
+
+    Frames are read from the wrapped reader into a bounded queue, so decoding
+    overlaps with whatever processing the consumer performs on each frame.
+    The `frame_number`, `frame_range`, and `is_new_frame_range` properties
+    describe the frame most recently returned by `read()`, exactly as they do
+    for the wrapped reader.
+
+    If the wrapped reader recycles frame buffers (e.g., a FFmpegVideoReader
+    with `num_buffers`), it must either copy its frames or use more than
+    `prefetch + 1` buffers, since up to that many frames are in flight.
+    '''
+
+    # The default number of frames to decode ahead of the consumer
+    DEFAULT_PREFETCH = 8
+
+    def __init__(self, reader, prefetch=None):
+        '''Constructs a new PrefetchingVideoReader.
+
+        Args:
+            reader: the VideoReader to wrap. The reader is closed when this
+                reader is closed
+            prefetch: the maximum number of frames to decode ahead of the
+                consumer. By default, self.DEFAULT_PREFETCH is used
+        '''
+        self.inpath = reader.inpath
+        self.frames = reader.frames
+
+        self._reader = reader
+        self._encoding_str = reader.encoding_str
+        self._frame_size = reader.frame_size
+        self._frame_rate = reader.frame_rate
+        self._total_frame_count = reader.total_frame_count
+        self._is_frame_count_exact = reader.is_frame_count_exact
+
+        self._frame_number = -1
+        self._frame_range = (-1, -1)
+        self._is_new_frame_range = False
+        self._is_exhausted = False
+
+        self._queue = queue.Queue(maxsize=prefetch or self.DEFAULT_PREFETCH)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._prefetch)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def frame_number(self):
+        '''The current frame number, or -1 if no frames have been read.'''
+        return self._frame_number
+
+    @property
+    def frame_range(self):
+        '''The (first, last) frames for the current range, or (-1, -1) if no
+        frames have been read.
+        '''
+        return self._frame_range
+
+    @property
+    def is_new_frame_range(self):
+        '''Whether the current frame is the first in a new range.'''
+        return self._is_new_frame_range
+
+    @property
+    def encoding_str(self):
+        '''Return the video encoding string.'''
+        return self._encoding_str
+
+    @property
+    def frame_size(self):
+        '''The (width, height) of each frame.'''
+        return self._frame_size
+
+    @property
+    def frame_rate(self):
+        '''The frame rate.'''
+        return self._frame_rate
+
+    @property
+    def total_frame_count(self):
+        '''The total number of frames in the video.'''
+        return self._total_frame_count
+
+    @property
+    def is_frame_count_exact(self):
+        '''Whether `total_frame_count` is exact rather than an estimate.'''
+        return self._is_frame_count_exact
+
+    def read(self):
+        '''Reads the next frame.
+
+        Returns:
+            img: the next frame
+
+        Raises:
+            StopIteration: if there are no more frames to process
+            VideoReaderError: if unable to load the next frame from file
+        '''
+        if self._is_exhausted:
+            raise StopIteration
+
+        item = self._queue.get()
+        if isinstance(item, Exception):
+            self._is_exhausted = True
+            if isinstance(item, StopIteration):
+                raise StopIteration
+            raise item
+
+        img, self._frame_number, self._frame_range, \
+            self._is_new_frame_range = item
+        return img
+
+    def close(self):
+        '''Stops the prefetching thread and closes the wrapped reader.'''
+        self._stop_event.set()
+        while self._thread.is_alive():
+            # Unblock the prefetching thread if it is waiting on a full queue
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._thread.join(0.01)
+
+        self._reader.close()
+
+    def _prefetch(self):
+        r = self._reader
+        try:
+            while not self._stop_event.is_set():
+                img = r.read()
+                self._put(
+                    (img, r.frame_number, r.frame_range, r.is_new_frame_range))
+        except Exception as e:
+            # StopIteration included; it is re-raised by read()
+            self._put(e)
+
+    def _put(self, item):
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+
+class ImageSequenceReader(VideoReader):
+    '''Class for reading a sequence of images on disk as a video.
+
+    The input is a pattern like "/path/to/frames/%05d.png" describing a
+    sequence of image files, which are decoded directly via `etai.read`
+    rather than being piped through ffmpeg. Only the requested frames are
+    read from disk, so sparse access into long sequences is cheap.
+
+    Frame 1 of the video corresponds to the image with the smallest index in
+    the sequence, so, for example, "%05d.png" sequences starting from 0 or 1
+    are both supported.
+
+    Images can optionally be decoded ahead of the consumer on a thread pool.
+
+    This class uses 1-based indexing for all frame operations.
+    '''
+
+    # The frame rate reported for image sequences, which matches the default
+    # frame rate that ffmpeg assumes for them
+    DEFAULT_FRAME_RATE = 25.0
+
+    def __init__(
+            self, inpath, frames=None, frame_rate=None, num_workers=None,
+            prefetch=None, cache_size=None):
+        '''Constructs a new ImageSequenceReader.
+
+        Args:
+            inpath: a pattern like "/path/to/frames/%05d.png" describing the
+                images to read
+            frames: one of the following optional quantities specifying a
+                collection of frames to process:
+                    - None (all frames - the default)
+                    - "*" (all frames)
+                    - a string like "1-3,6,8-10"
+                    - a list like [1, 2, 3, 6, 8, 9, 10]
+                    - a FrameRange or FrameRanges instance
+                    - a FrameSet instance
+            frame_rate: an optional frame rate to report for the sequence. By
+                default, self.DEFAULT_FRAME_RATE is used
+            num_workers: an optional number of threads to use to decode
+                images. By default, images are decoded synchronously in
+                read()
+            prefetch: the maximum number of images to decode ahead of the
+                consumer when num_workers is provided. By default,
+                2 * num_workers images are prefetched
+            cache_size: the number of recently accessed frames to cache in
+                get_frame(). By default, self.DEFAULT_CACHE_SIZE is used
 
-        super(FFmpegVideoReader, self).__init__(inpath, frames)
+        Raises:
+            VideoReaderError: if the sequence did not match any files on disk
+        '''
+        try:
+            self._sequence = DataFileSequence(inpath)
+        except DataFileSequenceError as e:
+            raise VideoReaderError(str(e))
+
+        self._frame_rate = frame_rate or self.DEFAULT_FRAME_RATE
+        self._frame_size = None
+        if cache_size is None:
+            cache_size = self.DEFAULT_CACHE_SIZE
+        self._cache = _FrameCache(cache_size)
+
+        super(ImageSequenceReader, self).__init__(inpath, frames)
+
+        self._pool = None
+        self._pending = deque()
+        self._frames = None
+        self._next_idx = 0
+        if num_workers:
+            self._pool = ThreadPool(num_workers)
+            self._prefetch = prefetch or 2 * num_workers
+            self._frames = self._ranges.to_list()
 
     @property
     def encoding_str(self):
-        '''Return the video encoding string.'''
-        return self._stream_info.encoding_str
+        '''Return the video encoding string, i.e., the image extension.'''
+        return self._sequence.extension.lstrip(".")
 
     @property
     def frame_size(self):
         '''The (width, height) of each frame.'''
-        return self._stream_info.frame_size
+        if self._frame_size is None:
+            img = self._read_frame(1)
+            self._frame_size = (img.shape[1], img.shape[0])
+        return self._frame_size
 
     @property
     def frame_rate(self):
         '''The frame rate.'''
-        return self._stream_info.frame_rate
+        return self._frame_rate
 
     @property
     def total_frame_count(self):
-        '''The total number of frames in the video, or 0 if it could not be
-        determined.
-        '''
-        return self._stream_info.total_frame_count
+        '''The total number of frames in the sequence.'''
+        return self._sequence.upper_bound - self._sequence.lower_bound + 1
 
     def read(self):
         '''Reads the next frame.
@@ -770,32 +2619,63 @@ class FFmpegVideoReader(VideoReader):
             StopIteration: if there are no more frames to process
             VideoReaderError: if unable to load the next frame from file
         '''
-        for _ in range(max(0, self.frame_number), next(self._ranges)):
-            if not self._grab():
-                raise VideoReaderError(
-                    "Failed to grab frame %d" % self.frame_number)
-        return self._retrieve()
+        frame = next(self._ranges)
+        if self._pool is None:
+            return self._read_frame(frame)
+
+        self._fill_pending()
+        return self._pending.popleft().get()
+
+    def get_frame(self, frame_number):
+        '''Gets the given frame of the sequence.
+
+        Only the image for the requested frame is read from disk. Recently
+        accessed frames are served from an LRU cache, so the returned array
+        must not be modified in-place.
+
+        Args:
+            frame_number: the frame number
+
+        Returns:
+            the frame
+
+        Raises:
+            VideoReaderError: if unable to load the frame
+        '''
+        img = self._cache.get(frame_number)
+        if img is None:
+            img = self._read_frame(frame_number)
+            self._cache.put(frame_number, img)
+
+        return img
 
     def close(self):
         '''Closes the video reader.'''
-        self._ffmpeg.close()
-
-    def _grab(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        self._pending.clear()
+        self._cache.clear()
+
+    def _fill_pending(self):
+        while (len(self._pending) < self._prefetch and
+                self._next_idx < len(self._frames)):
+            frame = self._frames[self._next_idx]
+            self._pending.append(
+                self._pool.apply_async(self._read_frame, (frame,)))
+            self._next_idx += 1
+
+    def _read_frame(self, frame):
+        index = self._sequence.lower_bound + frame - 1
         try:
-            width, height = self.frame_size
-            self._raw_frame = self._ffmpeg.read(width * height * 3)
-            return True
-        except Exception:
-            return False
+            path = self._sequence.gen_path(index)
+        except DataFileSequenceError:
+            raise VideoReaderError("Frame %d is out of bounds" % frame)
+        if not os.path.isfile(path):
+            raise VideoReaderError("Image '%s' not found" % path)
 
-    def _retrieve(self):
-        try:
-            vec = np.fromstring(self._raw_frame, dtype="uint8")
-            width, height = self.frame_size
-            return vec.reshape((height, width, 3))
-        except ValueError:
-            raise VideoReaderError(
-                "Unable to parse frame %d" % self.frame_number)
+        return etai.read(path)
 
 
 class OpenCVVideoReader(VideoReader):
@@ -812,7 +2692,11 @@ class OpenCVVideoReader(VideoReader):
     This class uses 1-based indexing for all frame operations.
     '''
 
-    def __init__(self, inpath, frames=None):
+    # The number of skipped frames above which get_frame() seeks rather than
+    # grabbing the skipped frames
+    SEEK_THRESHOLD = 250
+
+    def __init__(self, inpath, frames=None, cache_size=None):
         '''Constructs a new VideoReader with OpenCV backend.
 
         Args:
@@ -827,6 +2711,9 @@ class OpenCVVideoReader(VideoReader):
                     - a string like "1-3,6,8-10"
                     - a list like [1, 2, 3, 6, 8, 9, 10]
                     - a FrameRange or FrameRanges instance
+                    - a FrameSet instance
+            cache_size: the number of recently accessed frames to cache in
+                get_frame(). By default, self.DEFAULT_CACHE_SIZE is used
 
         Raises:
             VideoReaderError: if the input video could not be opened.
@@ -835,6 +2722,11 @@ class OpenCVVideoReader(VideoReader):
         if not self._cap.isOpened():
             raise VideoReaderError("Unable to open '%s'" % inpath)
 
+        self._decoder_frame = 0
+        if cache_size is None:
+            cache_size = self.DEFAULT_CACHE_SIZE
+        self._cache = _FrameCache(cache_size)
+
         super(OpenCVVideoReader, self).__init__(inpath, frames)
 
     @property
@@ -884,6 +2776,14 @@ class OpenCVVideoReader(VideoReader):
             # OpenCV 2
             return int(self._cap.get(cv2.cv.CV_CAP_PROP_FRAME_COUNT))
 
+    @property
+    def is_frame_count_exact(self):
+        '''Whether `total_frame_count` is exact rather than an estimate.
+
+        OpenCV's frame count is not reliable, so this is always False.
+        '''
+        return False
+
     def read(self):
         '''Reads the next frame.
 
@@ -891,18 +2791,351 @@ class OpenCVVideoReader(VideoReader):
             img: the next frame
 
         Raises:
-            StopIteration: if there are no more frames to process
+            StopIteration: if there are no more frames to process, including
+                when the end of the video is reached in an open-ended range
             VideoReaderError: if unable to load the next frame from file
         '''
-        for idx in range(max(0, self.frame_number), next(self._ranges)):
-            if not self._cap.grab():
-                raise VideoReaderError(
-                    "Failed to grab frame %d" % (idx + 1))
-        return etai.bgr_to_rgb(self._cap.retrieve()[1])
+        frame = next(self._ranges)
+        try:
+            return self._decode(frame)
+        except _EndOfVideoError:
+            if self._ranges.is_open_ended:
+                raise StopIteration
+            raise
+
+    def get_frame(self, frame_number):
+        '''Gets the given frame of the video.
+
+        The open capture is reused when moving forward by at most
+        self.SEEK_THRESHOLD frames; otherwise, the capture seeks to the frame.
+        Recently accessed frames are served from an LRU cache, so the returned
+        array must not be modified in-place.
+
+        This method can be interleaved with iteration over the reader.
+
+        Args:
+            frame_number: the frame number
+
+        Returns:
+            the frame
+
+        Raises:
+            VideoReaderError: if unable to load the frame
+        '''
+        img = self._cache.get(frame_number)
+        if img is None:
+            img = self._decode(frame_number)
+            self._cache.put(frame_number, img)
+
+        return img
 
     def close(self):
         '''Closes the video reader.'''
         self._cap.release()
+        self._cache.clear()
+
+    def _decode(self, frame):
+        if frame < 1:
+            raise VideoReaderError("Invalid frame number %d" % frame)
+
+        if (frame <= self._decoder_frame or
+                frame - self._decoder_frame - 1 > self.SEEK_THRESHOLD):
+            self._seek(frame)
+
+        while self._decoder_frame < frame:
+            if not self._cap.grab():
+                # OpenCV does not distinguish the end of the video from
+                # decoding errors
+                raise _EndOfVideoError(
+                    "Failed to grab frame %d" % (self._decoder_frame + 1))
+            self._decoder_frame += 1
+
+        return etai.bgr_to_rgb(self._cap.retrieve()[1])
+
+    def _seek(self, frame):
+        try:
+            # OpenCV 3
+            prop = cv2.CAP_PROP_POS_FRAMES
+        except AttributeError:
+            # OpenCV 2
+            prop = cv2.cv.CV_CAP_PROP_POS_FRAMES
+        self._cap.set(prop, frame - 1)
+        self._decoder_frame = frame - 1
+
+
+# The backends supported by VideoReader.open()
+VIDEO_READER_BACKENDS = ("ffmpeg", "opencv", "images")
+
+# Constructor arguments that only FFmpegVideoReader supports
+_FFMPEG_READER_ARGS = {
+    "num_buffers", "copy", "seek_threshold", "fps", "size", "scale",
+    "pix_fmt", "use_keyframe_index",
+}
+
+# Constructor arguments that only ImageSequenceReader supports
+_IMAGE_SEQUENCE_READER_ARGS = {"frame_rate", "num_workers", "prefetch"}
+
+# The fraction of the frames spanned by a frame collection above which it is
+# read as a dense, rather than sparse, access pattern
+DENSE_ACCESS_THRESHOLD = 0.5
+
+
+def _choose_video_reader_backend(inpath, frames, kwargs):
+    ffmpeg_only = _FFMPEG_READER_ARGS.intersection(kwargs)
+    images_only = _IMAGE_SEQUENCE_READER_ARGS.intersection(kwargs)
+    if ffmpeg_only and images_only:
+        raise VideoReaderError(
+            "Arguments %s and %s are not supported by the same backend" % (
+                sorted(ffmpeg_only), sorted(images_only)))
+
+    if _is_image_sequence(inpath):
+        return "ffmpeg" if ffmpeg_only else "images"
+
+    if images_only:
+        raise VideoReaderError(
+            "Arguments %s are only supported for image sequences" %
+            sorted(images_only))
+
+    if ffmpeg_only or not is_supported_video_file(inpath):
+        return "ffmpeg"
+
+    return _VIDEO_READER_CALIBRATION.get_backend(
+        inpath, get_access_pattern(frames))
+
+
+def _is_image_sequence(inpath):
+    return "%" in inpath and etai.is_supported_image(inpath)
+
+
+def get_access_pattern(frames):
+    '''Classifies the given collection of frames as a "dense" or "sparse"
+    access pattern.
+
+    A collection is dense if it contains more than DENSE_ACCESS_THRESHOLD of
+    the frames between its first and last frames.
+
+    Args:
+        frames: one of the following quantities specifying a collection of
+            frames:
+                - None (all frames)
+                - "*" (all frames)
+                - a string like "1-3,6,8-10"
+                - a list like [1, 2, 3, 6, 8, 9, 10]
+                - a FrameRange or FrameRanges instance
+                - a FrameSet instance
+
+    Returns:
+        "dense" or "sparse"
+
+    Raises:
+        VideoReaderError: if the frames were invalid
+    '''
+    if frames is None or frames == "*" or isinstance(frames, FrameRange):
+        return "dense"
+
+    if isinstance(frames, FrameRanges) and frames.is_open_ended:
+        return "dense"
+
+    frame_set = to_frame_set(frames)
+    if not frame_set:
+        return "dense"
+
+    span = frame_set.last - frame_set.first + 1
+    if len(frame_set) > DENSE_ACCESS_THRESHOLD * span:
+        return "dense"
+    return "sparse"
+
+
+def to_frame_set(frames, total_frame_count=None):
+    '''Converts the given collection of frames to a FrameSet.
+
+    Args:
+        frames: one of the following quantities specifying a collection of
+            frames:
+                - None (all frames)
+                - "*" (all frames)
+                - a string like "1-3,6,8-10"
+                - a list like [1, 2, 3, 6, 8, 9, 10]
+                - a FrameRange or FrameRanges instance
+                - a FrameSet instance
+        total_frame_count: the total number of frames in the video, which is
+            required when `frames` is None or "*"
+
+    Returns:
+        a FrameSet
+
+    Raises:
+        VideoReaderError: if the frames were invalid or open-ended
+    '''
+    if frames is None or frames == "*":
+        if total_frame_count is None:
+            raise VideoReaderError(
+                "total_frame_count is required to convert all frames to a "
+                "FrameSet")
+        if total_frame_count < 1:
+            return FrameSet()
+        return FrameSet.from_ranges([(1, total_frame_count)])
+
+    if isinstance(frames, FrameSet):
+        return frames
+    if isinstance(frames, six.string_types):
+        return FrameSet.from_str(frames)
+    if isinstance(frames, list):
+        return FrameSet.from_list(frames)
+    if isinstance(frames, (FrameRange, FrameRanges)) and \
+            frames.is_open_ended:
+        raise VideoReaderError(
+            "Cannot convert open-ended frames %s to a FrameSet" %
+            frames.to_str())
+    if isinstance(frames, FrameRanges):
+        return frames.to_frame_set()
+    if isinstance(frames, FrameRange):
+        return FrameSet([frames.first], [frames.last])
+
+    raise VideoReaderError("Invalid frames %s" % frames)
+
+
+class VideoReaderCalibration(object):
+    '''Records the measured decoding throughput of the FFmpegVideoReader and
+    OpenCVVideoReader backends, so that VideoReader.open() can choose the
+    faster one.
+
+    Measurements are keyed by the encoding and resolution of the video and by
+    the access pattern ("dense" or "sparse"). The first time a combination is
+    encountered, it is calibrated by decoding a few frames of the video at
+    hand with each backend. Measurements are kept in memory and, if a path is
+    provided, are also persisted as JSON so that they are shared across
+    processes.
+    '''
+
+    # The number of frames decoded by each backend to calibrate dense access
+    NUM_DENSE_FRAMES = 48
+
+    # The number of frames decoded by each backend to calibrate sparse access
+    NUM_SPARSE_FRAMES = 8
+
+    def __init__(self, path=None):
+        '''Constructs a VideoReaderCalibration.
+
+        Args:
+            path: an optional JSON file in which to persist measurements. By
+                default, `eta.config.video_reader_calibration_path` is used,
+                if set
+        '''
+        self._path = path
+        self._throughputs = {}
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        '''The JSON file in which measurements are persisted, or None.'''
+        return self._path or eta.config.video_reader_calibration_path or None
+
+    def get_backend(self, inpath, access_pattern):
+        '''Gets the fastest backend for reading the given video.
+
+        Args:
+            inpath: the path to the video
+            access_pattern: the access pattern, "dense" or "sparse"
+
+        Returns:
+            the name of the backend, "ffmpeg" or "opencv"
+        '''
+        throughputs = self.get_throughputs(inpath, access_pattern)
+        ffmpeg_fps = throughputs.get("ffmpeg", 0)
+        opencv_fps = throughputs.get("opencv", 0)
+        return "opencv" if opencv_fps > ffmpeg_fps else "ffmpeg"
+
+    def get_throughputs(self, inpath, access_pattern):
+        '''Gets the measured throughputs of each backend for the given video,
+        calibrating them if necessary.
+
+        Args:
+            inpath: the path to the video
+            access_pattern: the access pattern, "dense" or "sparse"
+
+        Returns:
+            a dictionary mapping backend names to frames per second. A
+                backend that failed to read the video has throughput 0
+        '''
+        stream_info = VideoStreamInfo.build_for(inpath)
+        width, height = stream_info.frame_size
+        key = "%s-%dx%d-%s" % (
+            stream_info.encoding_str, width, height, access_pattern)
+
+        # Calibrations are serialized so that they don't skew each other
+        with self._lock:
+            throughputs = self._throughputs.get(key)
+            if throughputs is None and self.path:
+                throughputs = self._read_from_disk(key)
+            if throughputs is None:
+                throughputs = self._calibrate(
+                    inpath, stream_info.total_frame_count, access_pattern)
+                if self.path:
+                    self._write_to_disk(key, throughputs)
+            self._throughputs[key] = throughputs
+
+        return throughputs
+
+    def clear(self):
+        '''Clears the measurements from memory and from disk.'''
+        with self._lock:
+            self._throughputs.clear()
+            path = self.path
+            if path and os.path.isfile(path):
+                os.remove(path)
+
+    def _calibrate(self, inpath, total_frame_count, access_pattern):
+        if access_pattern == "sparse" and total_frame_count > 0:
+            frames = sorted(set(
+                int(round(f)) for f in np.linspace(
+                    1, total_frame_count, self.NUM_SPARSE_FRAMES)))
+        else:
+            num_frames = self.NUM_DENSE_FRAMES
+            if total_frame_count > 0:
+                num_frames = min(num_frames, total_frame_count)
+            frames = "1-%d" % num_frames
+
+        throughputs = {}
+        for backend, reader_cls in (
+                ("ffmpeg", FFmpegVideoReader),
+                ("opencv", OpenCVVideoReader)):
+            try:
+                throughputs[backend] = self._measure(
+                    reader_cls, inpath, frames)
+            except Exception as e:
+                logger.warning(
+                    "Backend '%s' failed to read '%s': %s", backend, inpath,
+                    e)
+                throughputs[backend] = 0
+
+        logger.debug(
+            "Calibrated %s access to '%s': %s", access_pattern, inpath,
+            throughputs)
+        return throughputs
+
+    @staticmethod
+    def _measure(reader_cls, inpath, frames):
+        start = time.time()
+        num_frames = 0
+        with reader_cls(inpath, frames=frames) as r:
+            for _ in r:
+                num_frames += 1
+        elapsed = time.time() - start
+        return num_frames / elapsed if elapsed > 0 else float(num_frames)
+
+    def _read_from_disk(self, key):
+        if not os.path.isfile(self.path):
+            return None
+        return etas.read_json(self.path).get(key)
+
+    def _write_to_disk(self, key, throughputs):
+        d = etas.read_json(self.path) if os.path.isfile(self.path) else {}
+        d[key] = throughputs
+        etas.write_json(d, self.path)
+
+
+_VIDEO_READER_CALIBRATION = VideoReaderCalibration()
 
 
 class VideoWriter(object):
@@ -926,9 +3159,22 @@ class VideoWriterError(Exception):
 
 
 class FFmpegVideoWriter(VideoWriter):
-    '''Class for writing videos using ffmpeg.'''
+    '''Class for writing videos using ffmpeg.
 
-    def __init__(self, outpath, fps, size, out_opts=None):
+    Frames are passed to ffmpeg without being copied whenever they are
+    already C-contiguous. When `async_write` is True, frames are handed to
+    ffmpeg by a background thread via a bounded queue, so encoding proceeds
+    concurrently with the caller's processing. In this mode, the caller must
+    not modify a frame in-place after passing it to `write()`.
+    '''
+
+    # The default maximum number of frames queued for encoding when writing
+    # asynchronously
+    DEFAULT_QUEUE_SIZE = 8
+
+    def __init__(
+            self, outpath, fps, size, out_opts=None, async_write=False,
+            queue_size=None):
         '''Constructs a VideoWriter with ffmpeg backend.
 
         Args:
@@ -937,11 +3183,21 @@ class FFmpegVideoWriter(VideoWriter):
             fps: the frame rate
             size: the (width, height) of each frame
             out_opts: an optional list of output options for FFmpeg
+            async_write: whether to pass frames to ffmpeg on a background
+                thread. The default is False
+            queue_size: the maximum number of frames to queue for encoding
+                when `async_write` is True. When the queue is full, `write()`
+                blocks until the encoder catches up. By default,
+                self.DEFAULT_QUEUE_SIZE is used
         '''
         self.outpath = outpath
         self.fps = fps
         self.size = size
 
+        self._queue = None
+        self._thread = None
+        self._error = None
+
         self._ffmpeg = FFmpeg(
             in_opts=[
                 "-f", "rawvideo",           # input will be raw video
@@ -954,17 +3210,75 @@ class FFmpegVideoWriter(VideoWriter):
         )
         self._ffmpeg.run("-", self.outpath)
 
+        if async_write:
+            self._queue = queue.Queue(
+                maxsize=queue_size or self.DEFAULT_QUEUE_SIZE)
+            self._thread = threading.Thread(target=self._stream_frames)
+            self._thread.daemon = True
+            self._thread.start()
+
     def write(self, img):
         '''Appends the image to the output video.
 
         Args:
             img: an image in ETA format (RGB)
+
+        Raises:
+            VideoWriterError: if a previous asynchronous write failed
         '''
-        self._ffmpeg.stream(img.tostring())
+        buf = memoryview(np.ascontiguousarray(img))
+        if self._queue is None:
+            self._ffmpeg.stream(buf)
+            return
+
+        while True:
+            self._check_error()
+            try:
+                self._queue.put(buf, timeout=0.1)
+                return
+            except queue.Full:
+                pass
 
     def close(self):
-        '''Closes the video writer.'''
-        self._ffmpeg.close()
+        '''Closes the video writer.
+
+        When writing asynchronously, this method blocks until all queued
+        frames have been passed to ffmpeg.
+
+        Raises:
+            VideoWriterError: if an asynchronous write failed
+        '''
+        if self._thread is not None:
+            while self._thread.is_alive():
+                try:
+                    self._queue.put(None, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            self._thread.join()
+            self._thread = None
+
+        try:
+            self._ffmpeg.close()
+        finally:
+            self._check_error()
+
+    def _stream_frames(self):
+        while True:
+            buf = self._queue.get()
+            if buf is None:
+                return
+
+            try:
+                self._ffmpeg.stream(buf)
+            except Exception as e:
+                self._error = e
+                return
+
+    def _check_error(self):
+        if self._error is not None:
+            raise VideoWriterError(
+                "Failed to write to '%s': %s" % (self.outpath, self._error))
 
 
 class OpenCVVideoWriter(VideoWriter):
@@ -1009,6 +3323,102 @@ class OpenCVVideoWriter(VideoWriter):
         threading.Thread(target=self._writer.release, args=()).start()
 
 
+class ImageSequenceWriter(object):
+    '''Class for writing frames as a sequence of images on disk.
+
+    Images are encoded and written on a thread pool, with a bounded number of
+    frames in flight. Errors are raised in the order in which the frames were
+    written, and close() blocks until all frames have been written.
+
+    Since frames are written asynchronously, images passed to write() must
+    not be modified in-place afterwards.
+    '''
+
+    def __init__(
+            self, outpatt, num_workers=None, max_in_flight=None,
+            png_compression=None, jpeg_quality=None, webp_quality=None):
+        '''Constructs a new ImageSequenceWriter.
+
+        Args:
+            outpatt: a pattern like "/path/to/frames/%05d.png" with one
+                placeholder that specifies where to write the frames
+            num_workers: the number of threads to use to encode and write
+                images. By default, the number of CPUs is used. If 0, images
+                are written synchronously in write()
+            max_in_flight: the maximum number of frames that can be waiting to
+                be written before write() blocks. By default,
+                2 * num_workers frames are allowed
+            png_compression: an optional PNG compression level in [0, 9]
+            jpeg_quality: an optional JPEG quality in [0, 100]
+            webp_quality: an optional WebP quality in [1, 100]
+        '''
+        self.outpatt = outpatt
+        self._params = etai.get_write_params(
+            outpatt, png_compression=png_compression,
+            jpeg_quality=jpeg_quality, webp_quality=webp_quality)
+
+        # Create the output directory up-front so that the workers don't race
+        # to create it
+        etau.ensure_basedir(outpatt)
+
+        if num_workers is None:
+            num_workers = multiprocessing.cpu_count()
+        self._pool = ThreadPool(num_workers) if num_workers > 0 else None
+        self._max_in_flight = max_in_flight or 2 * max(num_workers, 1)
+        self._pending = deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, img, frame_number):
+        '''Writes the image for the given frame.
+
+        Args:
+            img: the image
+            frame_number: the frame number, which is used to fill in the
+                output pattern
+
+        Raises:
+            VideoWriterError: if a previously written frame failed to write
+        '''
+        path = self.outpatt % frame_number
+        if self._pool is None:
+            etai.write(img, path, params=self._params)
+            return
+
+        while len(self._pending) >= self._max_in_flight:
+            self._wait_for_next()
+
+        self._pending.append(self._pool.apply_async(
+            etai.write, (img, path), {"params": self._params}))
+
+    def close(self):
+        '''Waits for all pending frames to be written and closes the writer.
+
+        Raises:
+            VideoWriterError: if any frame failed to write
+        '''
+        if self._pool is None:
+            return
+
+        try:
+            while self._pending:
+                self._wait_for_next()
+        finally:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _wait_for_next(self):
+        try:
+            self._pending.popleft().get()
+        except Exception as e:
+            raise VideoWriterError("Failed to write image: %s" % e)
+
+
 class FFprobe(object):
     '''Interface for the ffprobe binary.'''
 
@@ -1101,9 +3511,7 @@ class FFmpeg(object):
 
     DEFAULT_GLOBAL_OPTS = ["-loglevel", "error"]
 
-    DEFAULT_VIDEO_OUT_OPTS = [
-        "-c:v", "libx264", "-preset", "medium", "-crf", "23",
-        "-pix_fmt", "yuv420p", "-an"]
+    DEFAULT_VIDEO_OUT_OPTS = VIDEO_ENCODING_PROFILES["delivery"]
 
     def __init__(
             self,
@@ -1127,7 +3535,8 @@ class FFmpeg(object):
                 default, self.DEFAULT_GLOBAL_OPTS is used
             in_opts: an optional list of input options for ffmpeg
             out_opts: an optional list of output options for ffmpeg. By
-                default, self.DEFAULT_VIDEO_OUT_OPTS is used when the output
+                default, the options for the encoding profile specified by
+                `eta.config.video_encoding_profile` are used when the output
                 path is a video file
         '''
         self.is_input_streaming = False
@@ -1167,7 +3576,7 @@ class FFmpeg(object):
         self.is_output_streaming = (outpath == "-")
 
         if self._out_opts is None and is_supported_video_file(outpath):
-            out_opts = self.DEFAULT_VIDEO_OUT_OPTS
+            out_opts = get_encoding_profile_opts()
         else:
             out_opts = self._out_opts or []
 
@@ -1197,7 +3606,8 @@ class FFmpeg(object):
                 raise etau.ExecutableRuntimeError(self.cmd, err)
 
     def stream(self, string):
-        '''Writes the string to ffmpeg's stdin stream.
+        '''Writes the string (or other bytes-like object, e.g., a
+        memoryview) to ffmpeg's stdin stream.
 
         Raises:
             FFmpegStreamingError: if input streaming mode is not active
@@ -1216,6 +3626,32 @@ class FFmpeg(object):
             raise FFmpegStreamingError("Not currently output streaming")
         return self._p.stdout.read(num_bytes)
 
+    def read_into(self, buf):
+        '''Reads bytes from ffmpeg's stdout stream directly into the given
+        array, until the array is full or the stream is exhausted.
+
+        Args:
+            buf: a C-contiguous numpy array
+
+        Returns:
+            the number of bytes read
+
+        Raises:
+            FFmpegStreamingError: if output streaming mode is not active
+        '''
+        if not self.is_output_streaming:
+            raise FFmpegStreamingError("Not currently output streaming")
+
+        view = buf.reshape(-1).view(np.uint8)
+        num_bytes = 0
+        while num_bytes < view.size:
+            n = self._p.stdout.readinto(view[num_bytes:])
+            if not n:
+                break
+            num_bytes += n
+
+        return num_bytes
+
     def close(self):
         '''Closes a streaming ffmpeg program.
 
@@ -1289,29 +3725,66 @@ class FOURCC(object):
 
 
 class FrameRanges(object):
-    '''A monotonically increasing and disjoint series of frames.'''
+    '''A monotonically increasing and disjoint series of frames.
+
+    The ranges are stored as arrays of their first and last frames, like a
+    FrameSet, except that adjacent ranges are not merged, so "1-5,6-10"
+    remains two ranges. Iteration only tracks the current frame and range
+    index, and membership tests take O(log n) time in the number of ranges.
+
+    The last range of the series can be open-ended, i.e., extend to the end of
+    the video.
+    '''
 
     def __init__(self, ranges):
         '''Constructs a frame range series from a list of (first, last) tuples,
-        which must be disjoint and monotonically increasing.
+        which must be disjoint and monotonically increasing. The `last` value
+        of the final tuple can be None, in which case that range is
+        open-ended.
 
         Raises:
             FrameRangesError: if the series is not disjoint and monotonically
                 increasing
+            FrameRangeError: if any range has last < first
         '''
-        self._idx = 0
-        self._ranges = []
-        self._started = False
+        firsts = []
+        lasts = []
+        self._open_first = None
 
         end = -1
         for first, last in ranges:
+            if end is None:
+                raise FrameRangesError(
+                    "Only the last range can be open-ended")
             if first <= end:
                 raise FrameRangesError(
                     "Expected first:%d > last:%d" % (first, end))
+            if last is None:
+                self._open_first = first
+            elif last < first:
+                raise FrameRangeError(
+                    "Expected first:%d <= last:%d" % (first, last))
+            else:
+                firsts.append(first)
+                lasts.append(last)
 
-            self._ranges.append(FrameRange(first, last))
             end = last
 
+        self._firsts = np.array(firsts, dtype=np.int64)
+        self._lasts = np.array(lasts, dtype=np.int64)
+
+        self._idx = -1
+        self._frame = -1
+        self._first = -1
+        self._last = -1
+
+    def __contains__(self, frame):
+        if self._open_first is not None and frame >= self._open_first:
+            return True
+
+        idx = np.searchsorted(self._firsts, frame, side="right") - 1
+        return bool(idx >= 0 and frame <= self._lasts[idx])
+
     def __iter__(self):
         return self
 
@@ -1321,61 +3794,99 @@ class FrameRanges(object):
         Raises:
             StopIteration: if there are no more frames to process
         '''
-        self._started = True
-        try:
-            frame = next(self._ranges[self._idx])
-        except StopIteration:
-            self._idx += 1
-            return next(self)
-        except IndexError:
-            raise StopIteration
+        if self._frame < 0 or (
+                self._last is not None and self._frame >= self._last):
+            if not self._start_range(self._idx + 1):
+                raise StopIteration
+
+            self._frame = self._first
+        else:
+            self._frame += 1
 
-        return frame
+        return self._frame
 
     @property
     def frame(self):
         '''The current frame number, or -1 if no frames have been read.'''
-        if self._started:
-            return self._ranges[self._idx].idx
-
-        return -1
+        return self._frame
 
     @property
     def frame_range(self):
         '''The (first, last) values for the current range, or (-1, -1) if no
-        frames have been read.
+        frames have been read. `last` is None if the range is open-ended.
         '''
-        if self._started:
-            return self._ranges[self._idx].first, self._ranges[self._idx].last
+        if self._frame < 0:
+            return (-1, -1)
 
-        return (-1, -1)
+        return self._first, self._last
 
     @property
     def is_new_frame_range(self):
         '''Whether the current frame is the first in a new range.'''
-        if self._started:
-            return self._ranges[self._idx].is_first_frame
+        return self._frame >= 0 and self._frame == self._first
 
-        return False
+    @property
+    def is_open_ended(self):
+        '''Whether the last range extends to the end of the video.'''
+        return self._open_first is not None
+
+    def iter_ranges(self):
+        '''Returns an iterator over the (first, last) tuples of the ranges.
+        `last` is None for an open-ended range.
+        '''
+        for first, last in zip(self._firsts.tolist(), self._lasts.tolist()):
+            yield first, last
+
+        if self._open_first is not None:
+            yield self._open_first, None
 
     def to_list(self):
-        '''Return a list of frames in the frame ranges.'''
-        frames = []
-        for r in self._ranges:
-            frames += r.to_list()
+        '''Return a list of frames in the frame ranges.
 
-        return frames
+        Raises:
+            FrameRangesError: if the last range is open-ended
+        '''
+        return self.to_frame_set().to_list()
 
     def to_str(self):
         '''Return a string representation of the frame ranges.'''
-        return ",".join([r.to_str() for r in self._ranges])
+        return ",".join(
+            [FrameRange(first, last).to_str()
+             for first, last in self.iter_ranges()])
+
+    def to_frame_set(self):
+        '''Returns a FrameSet containing the frames in the frame ranges.
+
+        Raises:
+            FrameRangesError: if the last range is open-ended
+        '''
+        if self.is_open_ended:
+            raise FrameRangesError(
+                "Cannot convert open-ended frame ranges to a FrameSet")
+
+        return FrameSet(self._firsts, self._lasts)
+
+    def _start_range(self, idx):
+        num_ranges = self._firsts.size
+        if idx < num_ranges:
+            self._first = int(self._firsts[idx])
+            self._last = int(self._lasts[idx])
+        elif idx == num_ranges and self._open_first is not None:
+            self._first = self._open_first
+            self._last = None
+        else:
+            return False
+
+        self._idx = idx
+        return True
 
     @classmethod
     def from_str(cls, frames_str):
         '''Constructs a FrameRanges object from a frames string.
 
         Args:
-            frames_str: a string like "1-3,6,8-10"
+            frames_str: a string like "1-3,6,8-10", whose last range can be
+                open-ended, like "1-3,6-"
 
         Raises:
             FrameRangesError: if the frames string is invalid
@@ -1398,7 +3909,19 @@ class FrameRanges(object):
         Raises:
             FrameRangesError: if the frames list is invalid
         '''
-        return cls(_list_to_ranges(frames_list))
+        return cls.from_frame_set(FrameSet.from_list(frames_list))
+
+    @classmethod
+    def from_frame_set(cls, frame_set):
+        '''Constructs a FrameRanges object from a FrameSet.
+
+        Args:
+            frame_set: a FrameSet
+        '''
+        frame_ranges = cls([])
+        frame_ranges._firsts = frame_set.firsts.copy()
+        frame_ranges._lasts = frame_set.lasts.copy()
+        return frame_ranges
 
 
 class FrameRangesError(Exception):
@@ -1409,14 +3932,18 @@ class FrameRangesError(Exception):
 class FrameRange(object):
     '''An iterator over a range of frames.'''
 
-    def __init__(self, first, last):
+    def __init__(self, first, last=None):
         '''Constructs a frame range with the given first and last values,
         inclusive.
 
+        If `last` is None, the range is open-ended, i.e., it extends to the end
+        of the video. Video readers stop iterating over such ranges when they
+        reach the end of the video.
+
         Raises:
             FrameRangeError: if last < first
         '''
-        if last < first:
+        if last is not None and last < first:
             raise FrameRangeError(
                 "Expected first:%d <= last:%d" % (first, last))
 
@@ -1432,6 +3959,11 @@ class FrameRange(object):
         '''Whether the current frame is first in the range.'''
         return self.idx == self.first
 
+    @property
+    def is_open_ended(self):
+        '''Whether the range extends to the end of the video.'''
+        return self.last is None
+
     def __next__(self):
         '''Returns the next frame number.
 
@@ -1440,7 +3972,7 @@ class FrameRange(object):
         '''
         if self.idx < 0:
             self.idx = self.first
-        elif self.idx < self.last:
+        elif self.last is None or self.idx < self.last:
             self.idx += 1
         else:
             raise StopIteration
@@ -1448,11 +3980,23 @@ class FrameRange(object):
         return self.idx
 
     def to_list(self):
-        '''Return a list of frames in the range.'''
+        '''Return a list of frames in the range.
+
+        Raises:
+            FrameRangeError: if the range is open-ended
+        '''
+        if self.is_open_ended:
+            raise FrameRangeError(
+                "Cannot list the frames of open-ended range %s" %
+                self.to_str())
+
         return list(range(self.first, self.last + 1))
 
     def to_str(self):
         '''Return a string representation of the range.'''
+        if self.is_open_ended:
+            return "%d-" % self.first
+
         if self.first == self.last:
             return "%d" % self.first
 
@@ -1463,12 +4007,15 @@ class FrameRange(object):
         '''Constructs a FrameRange object from a string.
 
         Args:
-            frames_str: a string like "1-5"
+            frames_str: a string like "1-5", or an open-ended string like "6-"
 
         Raises:
             FrameRangeError: if the frame range string is invalid
         '''
         try:
+            if frames_str.endswith('-'):
+                return cls(int(frames_str[:-1]))
+
             v = list(map(int, frames_str.split('-')))
             return cls(v[0], v[-1])
         except ValueError:
@@ -1485,11 +4032,11 @@ class FrameRange(object):
         Raises:
             FrameRangeError: if the frame range list is invalid
         '''
-        ranges = list(_list_to_ranges(frames_list))
-        if len(ranges) != 1:
+        frame_set = FrameSet.from_list(frames_list)
+        if frame_set.num_ranges != 1:
             raise FrameRangeError("Invalid frame range list %s" % frames_list)
 
-        return cls(*ranges[0])
+        return cls(frame_set.first, frame_set.last)
 
 
 class FrameRangeError(Exception):
@@ -1497,17 +4044,10 @@ class FrameRangeError(Exception):
     pass
 
 
-def _list_to_ranges(vals):
-    if not vals:
-        raise StopIteration
-
-    vals = sorted(vals)
-    first = last = vals[0]
-    for val in vals[1:]:
-        if val == last + 1:
-            last += 1
-        else:
-            yield (first, last)
-            first = last = val
-
-    yield (first, last)
+def _compute_frame_size(frame_size, size=None, scale=None):
+    if size:
+        size = etai.parse_frame_size(size)
+        return etai.infer_missing_dims(size, frame_size)
+    if scale:
+        return etai.scale_frame_size(frame_size, scale)
+    return frame_size
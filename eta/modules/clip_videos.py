@@ -26,7 +26,7 @@ from builtins import *
 import logging
 import sys
 
-from eta.core.config import Config
+from eta.core.config import Config, ConfigError
 import eta.core.events as etae
 import eta.core.image as etai
 import eta.core.module as etam
@@ -108,16 +108,48 @@ class ParametersConfig(Config):
     Parameters:
         frames (eta.core.types.String): [None] A frames string specifying the
             clips to generate
+        clip_mode (eta.core.types.String): ["exact"] The clipping mode to use
+            when generating video clips. Supported values are "exact", which
+            decodes and re-encodes the frames so that clips are frame-exact,
+            and "copy", which copies the encoded streams without re-encoding
+            and moves the start of each clip back to the nearest keyframe.
+            Frame outputs are always generated in "exact" mode
+        num_image_workers (eta.core.types.Number): [None] The number of
+            threads to use to encode and write frame outputs. By default, the
+            number of CPUs is used
+        png_compression (eta.core.types.Number): [None] The PNG compression
+            level in [0, 9] to use for PNG frame outputs. Lower levels are
+            faster but produce larger files
+        jpeg_quality (eta.core.types.Number): [None] The JPEG quality in
+            [0, 100] to use for JPEG frame outputs
     '''
 
+    CLIP_MODES = ("exact", "copy")
+
     def __init__(self, d):
         self.frames = self.parse_string(d, "frames", default=None)
+        self.clip_mode = self.parse_string(d, "clip_mode", default="exact")
+        self.num_image_workers = self.parse_number(
+            d, "num_image_workers", default=None)
+        self.png_compression = self.parse_number(
+            d, "png_compression", default=None)
+        self.jpeg_quality = self.parse_number(
+            d, "jpeg_quality", default=None)
+
+        if self.clip_mode not in self.CLIP_MODES:
+            raise ConfigError(
+                "Unsupported clip_mode '%s'; expected one of %s" %
+                (self.clip_mode, self.CLIP_MODES))
 
 
 def _clip_videos(clip_config):
     for data in clip_config.data:
         frames = _get_frames(data, clip_config.parameters)
-        _clip_video(data, frames)
+        if (clip_config.parameters.clip_mode == "copy" and
+                data.output_video_clips_path):
+            _copy_clips(data, frames)
+        else:
+            _clip_video(data, frames, clip_config.parameters)
 
 
 def _get_frames(data, parameters):
@@ -136,7 +168,7 @@ def _get_frames(data, parameters):
     return frames
 
 
-def _clip_video(data, frames):
+def _clip_video(data, frames, parameters):
     logger.info("Generating video clips for '%s'", data.input_path)
 
     # Collect output paths
@@ -146,14 +178,45 @@ def _clip_video(data, frames):
         out_images_path = data.output_frames_path
     out_clips_path = data.output_video_clips_path
 
+    num_image_workers = parameters.num_image_workers
+    if num_image_workers is not None:
+        num_image_workers = int(num_image_workers)
+    out_images_opts = {
+        "png_compression": parameters.png_compression,
+        "jpeg_quality": parameters.jpeg_quality,
+    }
+
     # Sample clips
     with etav.VideoProcessor(
             data.input_path, frames=frames, out_images_path=out_images_path,
-            out_clips_path=out_clips_path) as p:
+            out_clips_path=out_clips_path,
+            out_images_workers=num_image_workers,
+            out_images_opts=out_images_opts) as p:
         for img in p:
             p.write(img)
 
 
+def _copy_clips(data, frames):
+    logger.info(
+        "Generating video clips for '%s' via stream copy", data.input_path)
+
+    if frames is None or frames == "*":
+        # A single clip of the entire video
+        ranges = etav.FrameRanges(
+            [(1, etav.get_frame_count(data.input_path))])
+    else:
+        ranges = etav.FrameRanges.from_str(frames)
+
+    keyframes = etav.get_keyframe_numbers(data.input_path)
+    for first, last in ranges.iter_ranges():
+        outpath = data.output_video_clips_path % (first, last)
+        start, _ = etav.extract_clip(
+            data.input_path, outpath, first, last, keyframes=keyframes)
+        if start != first:
+            logger.info(
+                "Clip %d-%d starts at keyframe %d", first, last, start)
+
+
 def run(config_path, pipeline_config_path=None):
     '''Run the clip_videos module.
 
@@ -78,6 +78,16 @@ class ParametersConfig(Config):
     Parameters:
         crop_box (eta.core.types.Object): [None] A region of interest of
             each frame to extract before embedding
+        batch_size (eta.core.types.Number): [32] The number of frames to
+            embed at once
+        backing_store (eta.core.types.String): ["npz"] The layout in
+            which to write the embeddings. Supported values are "npz" (one
+            file per frame) and "chunked" (a single file)
+        backing_format (eta.core.types.String): [None] The file format of the
+            embeddings when backing_store is "npz". Supported values are
+            "npz_compressed" (the default), "npz", "npy", "lz4", and "zstd"
+        backing_dtype (eta.core.types.String): [None] An optional data type
+            in which to store the embeddings, e.g., "float16"
     '''
 
     def __init__(self, d):
@@ -85,6 +95,14 @@ class ParametersConfig(Config):
                 d, "vgg16", etav.VGG16Config, default=None)
         self.crop_box = self.parse_object(
                 d, "crop_box", RectangleConfig, default=None)
+        self.batch_size = self.parse_number(
+                d, "batch_size", default=etaf.DEFAULT_FEATURIZE_BATCH_SIZE)
+        self.backing_store = self.parse_string(
+                d, "backing_store", default="npz")
+        self.backing_format = self.parse_string(
+                d, "backing_format", default=None)
+        self.backing_dtype = self.parse_string(
+                d, "backing_dtype", default=None)
 
 
 class Point2Config(Config):
@@ -131,6 +149,10 @@ def _featurize_driver(config, d):
         vffcd = {
             "backing_path": data.backing_path,
             "frame_featurizer": vffcd_,
+            "batch_size": parameters.batch_size,
+            "backing_store": parameters.backing_store,
+            "backing_format": parameters.backing_format,
+            "backing_dtype": parameters.backing_dtype,
         }
 
         vffc = etaf.VideoFramesFeaturizerConfig(vffcd)
@@ -129,8 +129,11 @@ class ParametersConfig(Config):
         max_size (eta.core.types.Array): [None] A maximum (width, height)
             allowed for the video. Dimensions can be -1, in which case no
             constraint is applied to them
+        encoding_profile (eta.core.types.String): [None] The name of the
+            video encoding profile to use, e.g., "intermediate", "archive", or
+            "delivery". By default, the ETA config profile is used
         ffmpeg_out_opts (eta.core.types.Array): [None] An array of ffmpeg
-            output options
+            output options. If provided, encoding_profile is ignored
     '''
 
     def __init__(self, d):
@@ -139,6 +142,8 @@ class ParametersConfig(Config):
         self.scale = self.parse_number(d, "scale", default=None)
         self.size = self.parse_array(d, "size", default=None)
         self.max_size = self.parse_array(d, "max_size", default=None)
+        self.encoding_profile = self.parse_string(
+            d, "encoding_profile", default=None)
         self.ffmpeg_out_opts = self.parse_array(
             d, "ffmpeg_out_opts", default=None)
 
@@ -156,6 +161,10 @@ def _process_zip(input_zip, output_zip, parameters):
     input_paths = etaz.extract_zip(input_zip)
     output_paths = etaz.make_parallel_files(output_zip, input_paths)
 
+    # Probe all videos in parallel up-front; _process_video() then reads the
+    # stream info from the cache
+    etav.get_stream_info_batch(input_paths)
+
     # Iterate over videos
     for input_path, output_path in zip(input_paths, output_paths):
         _process_video(input_path, output_path, parameters)
@@ -218,8 +227,10 @@ def _process_video(input_path, output_path, parameters):
         logger.info("*** resizing to %s", str(osize))
     else:
         osize = None  # omit unused argument
-    ffmpeg = etav.FFmpeg(
-        fps=ofps, size=osize, out_opts=parameters.ffmpeg_out_opts)
+    out_opts = parameters.ffmpeg_out_opts
+    if out_opts is None and parameters.encoding_profile:
+        out_opts = etav.get_encoding_profile_opts(parameters.encoding_profile)
+    ffmpeg = etav.FFmpeg(fps=ofps, size=osize, out_opts=out_opts)
     ffmpeg.run(input_path, output_path)
 
 
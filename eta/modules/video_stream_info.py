@@ -24,11 +24,14 @@ from builtins import *
 # pragma pylint: enable=wildcard-import
 
 import logging
+import os
 import sys
 
-from eta.core.config import Config
+from eta.core.config import Config, ConfigError
 import eta.core.module as etam
+import eta.core.utils as etau
 import eta.core.video as etav
+import eta.core.ziputils as etaz
 
 
 logger = logging.getLogger(__name__)
@@ -39,33 +42,144 @@ class VideoStreamInfoConfig(etam.BaseModuleConfig):
 
     Attributes:
         data (DataConfig)
+        parameters (ParametersConfig)
     '''
 
     def __init__(self, d):
         super(VideoStreamInfoConfig, self).__init__(d)
         self.data = self.parse_object_array(d, "data", DataConfig)
+        self.parameters = self.parse_object(
+            d, "parameters", ParametersConfig,
+            default=ParametersConfig.default())
 
 
 class DataConfig(Config):
     '''Data configuration settings.
 
     Inputs:
-        video (eta.core.types.Video): The input video
+        video (eta.core.types.Video): [None] The input video
+        video_dir (eta.core.types.VideoDirectory): [None] A directory of input
+            video files
+        video_zip (eta.core.types.ZippedVideoFileDirectory): [None] A zip file
+            containing a directory of input video files
 
     Outputs:
-        stream_info (eta.core.types.VideoStreamInfo): The video stream info
+        stream_info (eta.core.types.VideoStreamInfo): [None] The video stream
+            info
+        stream_info_dir (eta.core.types.JSONDirectory): [None] A directory of
+            video stream info files, one per input video
+        stream_info_zip (eta.core.types.ZippedJSONDirectory): [None] A zip file
+            containing a directory of video stream info files, one per input
+            video
     '''
 
+    # The output field required by each input field
+    OUTPUT_FIELDS = {
+        "video": "stream_info",
+        "video_dir": "stream_info_dir",
+        "video_zip": "stream_info_zip",
+    }
+
     def __init__(self, d):
-        self.video = self.parse_string(d, "video")
-        self.stream_info = self.parse_string(d, "stream_info")
+        self.video = self.parse_string(d, "video", default=None)
+        self.video_dir = self.parse_string(d, "video_dir", default=None)
+        self.video_zip = self.parse_string(d, "video_zip", default=None)
+        self.stream_info = self.parse_string(d, "stream_info", default=None)
+        self.stream_info_dir = self.parse_string(
+            d, "stream_info_dir", default=None)
+        self.stream_info_zip = self.parse_string(
+            d, "stream_info_zip", default=None)
+
+        self._input_field, _ = Config.parse_mutually_exclusive_fields({
+            "video": self.video,
+            "video_dir": self.video_dir,
+            "video_zip": self.video_zip,
+        })
+
+        output_field = self.OUTPUT_FIELDS[self._input_field]
+        if not getattr(self, output_field):
+            raise ConfigError(
+                "'%s' must be provided when '%s' is provided" % (
+                    output_field, self._input_field))
+
+    @property
+    def is_video(self):
+        return self._input_field == "video"
+
+    @property
+    def is_dir(self):
+        return self._input_field == "video_dir"
+
+    @property
+    def is_zip(self):
+        return self._input_field == "video_zip"
+
+
+class ParametersConfig(Config):
+    '''Parameter configuration settings.
+
+    Parameters:
+        max_workers (eta.core.types.Number): [None] The maximum number of
+            ffprobe processes to run concurrently when processing directories
+            or zips of videos. By default, the number of CPUs is used
+    '''
+
+    def __init__(self, d):
+        self.max_workers = self.parse_number(d, "max_workers", default=None)
 
 
 def _get_stream_info(stream_info_config):
+    max_workers = stream_info_config.parameters.max_workers
+    if max_workers is not None:
+        max_workers = int(max_workers)
+
     for data_config in stream_info_config.data:
-        logger.info("Reading stream info for %s", data_config.video)
-        vsi = etav.VideoStreamInfo.build_for(data_config.video)
-        vsi.write_json(data_config.stream_info)
+        if data_config.is_video:
+            logger.info("Reading stream info for %s", data_config.video)
+            vsi = etav.VideoStreamInfo.build_for(data_config.video)
+            vsi.write_json(data_config.stream_info)
+        elif data_config.is_dir:
+            _process_dir(
+                data_config.video_dir, data_config.stream_info_dir,
+                max_workers)
+        else:
+            _process_zip(
+                data_config.video_zip, data_config.stream_info_zip,
+                max_workers)
+
+
+def _process_dir(video_dir, stream_info_dir, max_workers):
+    video_paths = [
+        os.path.join(video_dir, f) for f in etau.list_files(video_dir)
+        if etav.is_supported_video_file(f)]
+    stream_info_paths = [
+        os.path.join(stream_info_dir, _get_json_filename(p))
+        for p in video_paths]
+    _write_stream_infos(video_paths, stream_info_paths, max_workers)
+
+
+def _process_zip(video_zip, stream_info_zip, max_workers):
+    video_paths = [
+        p for p in etaz.extract_zip(video_zip)
+        if etav.is_supported_video_file(p)]
+    stream_info_dir = os.path.splitext(stream_info_zip)[0]
+    stream_info_paths = [
+        os.path.join(stream_info_dir, _get_json_filename(p))
+        for p in video_paths]
+    _write_stream_infos(video_paths, stream_info_paths, max_workers)
+    etaz.make_zip(stream_info_zip)
+
+
+def _write_stream_infos(video_paths, stream_info_paths, max_workers):
+    logger.info("Reading stream info for %d videos", len(video_paths))
+    vsis = etav.VideoStreamInfo.build_for_batch(
+        video_paths, max_workers=max_workers)
+    for vsi, stream_info_path in zip(vsis, stream_info_paths):
+        vsi.write_json(stream_info_path)
+
+
+def _get_json_filename(video_path):
+    return os.path.splitext(os.path.basename(video_path))[0] + ".json"
 
 
 def run(config_path, pipeline_config_path=None):
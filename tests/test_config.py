@@ -0,0 +1,45 @@
+'''
+Tests for `eta.core.config`.
+
+Run with `python -m unittest discover tests`.
+
+Copyright 2017-2018, Voxel51, LLC
+voxel51.com
+'''
+# pragma pylint: disable=redefined-builtin
+# pragma pylint: disable=unused-wildcard-import
+# pragma pylint: disable=wildcard-import
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import *
+# pragma pylint: enable=redefined-builtin
+# pragma pylint: enable=unused-wildcard-import
+# pragma pylint: enable=wildcard-import
+
+import unittest
+
+from eta.core.config import Config, ConfigError
+
+
+class MutuallyExclusiveFieldsTest(unittest.TestCase):
+    '''Tests Config.parse_mutually_exclusive_fields.'''
+
+    def test_one_field(self):
+        self.assertEqual(
+            Config.parse_mutually_exclusive_fields(
+                {"a": None, "b": "1-5", "c": ""}),
+            ("b", "1-5"))
+
+    def test_no_fields(self):
+        with self.assertRaises(ConfigError):
+            Config.parse_mutually_exclusive_fields({"a": None, "b": None})
+
+    def test_multiple_fields(self):
+        with self.assertRaises(ConfigError):
+            Config.parse_mutually_exclusive_fields({"a": "x", "b": "y"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,336 @@
+'''
+Tests for `eta.core.features`.
+
+Run with `python -m unittest discover tests`.
+
+Copyright 2017-2018, Voxel51, LLC
+voxel51.com
+'''
+# pragma pylint: disable=redefined-builtin
+# pragma pylint: disable=unused-wildcard-import
+# pragma pylint: disable=wildcard-import
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import *
+# pragma pylint: enable=redefined-builtin
+# pragma pylint: enable=unused-wildcard-import
+# pragma pylint: enable=wildcard-import
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from eta.core.config import Config
+import eta.core.features as etaf
+from eta.core.frames import FrameSet
+import eta.core.utils as etau
+import eta.core.video as etav
+
+
+class FeatureStoreTest(object):
+    '''Tests that are run against every FeatureStore class.'''
+
+    DIM = 5
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.features = {
+            f: np.arange(self.DIM, dtype=np.float32) + f
+            for f in [1, 2, 3, 7, 10]}
+
+    def tearDown(self):
+        etau.delete_dir(self.tmp_dir)
+
+    def _open(self):
+        raise NotImplementedError("subclass must implement _open()")
+
+    def _put_all(self, store):
+        for frame_number, v in self.features.items():
+            store.put(frame_number, v)
+
+    def test_round_trip(self):
+        with self._open() as store:
+            self._put_all(store)
+
+            for frame_number, v in self.features.items():
+                self.assertTrue(store.is_featurized(frame_number))
+                np.testing.assert_array_equal(store.get(frame_number), v)
+
+            self.assertFalse(store.is_featurized(4))
+            np.testing.assert_array_equal(
+                store.get_frames([10, 1]),
+                [self.features[10], self.features[1]])
+            np.testing.assert_array_equal(
+                store.get_range(1, 3),
+                [self.features[1], self.features[2], self.features[3]])
+
+    def test_reopen(self):
+        with self._open() as store:
+            self._put_all(store)
+
+        with self._open() as store:
+            self.assertEqual(
+                store.get_featurized_frames(),
+                FrameSet.from_list(list(self.features)))
+            np.testing.assert_array_equal(store.get(7), self.features[7])
+
+    def test_missing_frames(self):
+        with self._open() as store:
+            self._put_all(store)
+
+            with self.assertRaises(etaf.FeaturizedFrameNotFoundError):
+                store.get(4)
+
+            with self.assertRaises(etaf.FeaturizedFrameNotFoundError):
+                store.get_frames([1, 4])
+
+    def test_clear(self):
+        with self._open() as store:
+            self._put_all(store)
+            store.clear()
+
+            self.assertFalse(store.get_featurized_frames())
+
+        with self._open() as store:
+            self.assertFalse(store.get_featurized_frames())
+
+
+class NpzFeatureStoreTest(FeatureStoreTest, unittest.TestCase):
+    '''Tests NpzFeatureStore.'''
+
+    def _open(self):
+        return etaf.NpzFeatureStore(self.tmp_dir)
+
+
+    def test_legacy_files_do_not_override_format(self):
+        # Files written without metadata, as by older versions of ETA
+        np.savez_compressed(
+            os.path.join(self.tmp_dir, "00000001.npz"), v=self.features[1])
+
+        with etaf.NpzFeatureStore(self.tmp_dir) as store:
+            self.assertEqual(store.format, "npz_compressed")
+            np.testing.assert_array_equal(store.get(1), self.features[1])
+
+        with etaf.NpzFeatureStore(self.tmp_dir, format="npy") as store:
+            self.assertEqual(store.format, "npy")
+            store.put(2, self.features[2])
+
+        self.assertTrue(
+            os.path.isfile(os.path.join(self.tmp_dir, "00000002.npy")))
+
+
+class ChunkedFeatureStoreTest(FeatureStoreTest, unittest.TestCase):
+    '''Tests ChunkedFeatureStore.'''
+
+    def _open(self):
+        return etaf.ChunkedFeatureStore(self.tmp_dir)
+
+    def test_newest_record_wins(self):
+        with self._open() as store:
+            self._put_all(store)
+            store.put(2, self.features[3])
+
+        with self._open() as store:
+            np.testing.assert_array_equal(store.get(2), self.features[3])
+            self.assertEqual(len(store.get_featurized_frames()), 5)
+
+    def test_partial_record_is_discarded(self):
+        with self._open() as store:
+            self._put_all(store)
+            data_path = store.data_path
+
+        # Simulate a crash in the middle of appending a record
+        with open(data_path, "ab") as f:
+            f.write(b"\0" * 7)
+
+        with self._open() as store:
+            self.assertEqual(
+                store.get_featurized_frames(),
+                FrameSet.from_list(list(self.features)))
+            store.put(4, self.features[1])
+
+        # Each record is an int64 frame number followed by the features
+        record_size = 8 + self.DIM * 4
+        self.assertEqual(os.path.getsize(data_path), 6 * record_size)
+        with self._open() as store:
+            np.testing.assert_array_equal(store.get(4), self.features[1])
+            np.testing.assert_array_equal(store.get(10), self.features[10])
+
+
+class MeanColorFeaturizerConfig(Config):
+    '''Configuration settings for a MeanColorFeaturizer, which has none.'''
+
+    def __init__(self, d):
+        pass
+
+
+class MeanColorFeaturizer(etaf.Featurizer):
+    '''Featurizer whose features are the mean color of each image.'''
+
+    def __init__(self, config=None):
+        super(MeanColorFeaturizer, self).__init__()
+
+    def dim(self):
+        return 3
+
+    def _featurize(self, img):
+        return np.mean(img, axis=(0, 1))
+
+
+class VideoFramesFeaturizerTest(unittest.TestCase):
+    '''Tests VideoFramesFeaturizer on a real video file. The tests require
+    ffmpeg.
+    '''
+
+    NUM_FRAMES = 20
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.tmp_dir, "testsrc.mp4")
+        ffmpeg = etav.FFmpeg(in_opts=["-f", "lavfi"])
+        ffmpeg.run(
+            "testsrc=size=64x48:rate=10:duration=%g" % (self.NUM_FRAMES / 10),
+            self.video_path)
+
+    def tearDown(self):
+        etau.delete_dir(self.tmp_dir)
+
+    def _build(self, **kwargs):
+        d = {
+            "backing_path": os.path.join(self.tmp_dir, "features"),
+            "backing_manager": "manual",
+            "frame_featurizer": {
+                "type": __name__ + ".MeanColorFeaturizer",
+                "config": {},
+            },
+        }
+        d.update(kwargs)
+        return etaf.VideoFramesFeaturizer(
+            etaf.VideoFramesFeaturizerConfig(d))
+
+    def _expected_features(self, frames):
+        with etav.FFmpegVideoReader(self.video_path, frames=frames) as r:
+            return np.array([np.mean(img, axis=(0, 1)) for img in r])
+
+    def _record_decoded_frames(self, featurizer):
+        decoded = []
+
+        def _record(img):
+            decoded.append(featurizer.most_recent_frame)
+            return img
+
+        featurizer.frame_preprocessor = _record
+        return decoded
+
+    def test_store_is_opened_lazily(self):
+        featurizer = self._build()
+        backing_path = os.path.join(self.tmp_dir, "features")
+        self.assertFalse(os.path.exists(backing_path))
+
+        self.assertFalse(featurizer.is_featurized(1))
+        self.assertTrue(os.path.isdir(backing_path))
+
+    def test_quantized_rows_do_not_depend_on_cache(self):
+        for backing_store in ("npz", "chunked"):
+            featurizer = self._build(
+                backing_path=os.path.join(self.tmp_dir, backing_store),
+                backing_store=backing_store, backing_dtype="float16")
+
+            fresh = featurizer.featurize(self.video_path, frames="1-10")
+            cached = featurizer.featurize(self.video_path, frames="1-10")
+
+            self.assertEqual(fresh.dtype, np.float32)
+            self.assertEqual(cached.dtype, fresh.dtype)
+            np.testing.assert_array_equal(cached, fresh)
+
+    def test_resume_decodes_only_missing_frames(self):
+        featurizer = self._build(batch_size=3)
+        decoded = self._record_decoded_frames(featurizer)
+
+        featurizer.featurize(self.video_path, frames="1-5", returnX=False)
+        self.assertEqual(decoded, [1, 2, 3, 4, 5])
+
+        del decoded[:]
+        X = featurizer.featurize(self.video_path, frames="3-10")
+        self.assertEqual(decoded, [6, 7, 8, 9, 10])
+        np.testing.assert_array_equal(X, self._expected_features("3-10"))
+
+    def test_cached_run_decodes_nothing(self):
+        featurizer = self._build()
+        decoded = self._record_decoded_frames(featurizer)
+
+        X1 = featurizer.featurize(self.video_path, frames="2,4,6-8")
+        del decoded[:]
+        X2 = featurizer.featurize(self.video_path, frames="2,4,6-8")
+
+        self.assertEqual(decoded, [])
+        np.testing.assert_array_equal(X1, X2)
+        np.testing.assert_array_equal(
+            X2, self._expected_features("2,4,6-8"))
+
+    def test_all_frames_merges_stored_and_new_rows(self):
+        featurizer = self._build()
+        decoded = self._record_decoded_frames(featurizer)
+
+        featurizer.featurize(self.video_path, frames="4-6,15", returnX=False)
+        del decoded[:]
+        X = featurizer.featurize(self.video_path, frames="*")
+
+        self.assertEqual(
+            decoded, [f for f in range(1, 21) if f not in (4, 5, 6, 15)])
+        np.testing.assert_array_equal(
+            X, self._expected_features("1-%d" % self.NUM_FRAMES))
+
+    def test_all_frames_cached_run_decodes_nothing(self):
+        featurizer = self._build()
+        decoded = self._record_decoded_frames(featurizer)
+
+        X1 = featurizer.featurize(self.video_path, frames="*")
+        del decoded[:]
+        X2 = featurizer.featurize(self.video_path, frames="*")
+
+        self.assertEqual(decoded, [])
+        np.testing.assert_array_equal(X1, X2)
+
+    def test_all_frames_with_estimated_frame_count(self):
+        try_count_packets = etav._try_count_packets
+        etav._try_count_packets = lambda inpath: None
+        try:
+            for count in (self.NUM_FRAMES - 5, self.NUM_FRAMES + 5):
+                # Simulate a video whose frame count is an estimate
+                etav.invalidate_stream_info_cache()
+                stream_info = etav.get_stream_info(self.video_path)
+                stream_info[etav.FRAME_COUNT_KEY] = count
+                stream_info[etav.FRAME_COUNT_METHOD_KEY] = "duration"
+                etav._STREAM_INFO_CACHE.put(self.video_path, stream_info)
+
+                featurizer = self._build(
+                    backing_path=os.path.join(self.tmp_dir, str(count)))
+                decoded = self._record_decoded_frames(featurizer)
+
+                featurizer.featurize(
+                    self.video_path, frames="4-6,15", returnX=False)
+                del decoded[:]
+                X1 = featurizer.featurize(self.video_path, frames="*")
+                self.assertEqual(
+                    decoded,
+                    [f for f in range(1, 21) if f not in (4, 5, 6, 15)])
+
+                del decoded[:]
+                X2 = featurizer.featurize(self.video_path, frames="*")
+                self.assertEqual(decoded, [])
+
+                expected = self._expected_features("1-%d" % self.NUM_FRAMES)
+                np.testing.assert_array_equal(X1, expected)
+                np.testing.assert_array_equal(X2, expected)
+        finally:
+            etav._try_count_packets = try_count_packets
+            etav.invalidate_stream_info_cache()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+'''
+Tests for `eta.core.frames`.
+
+Run with `python -m unittest discover tests`.
+
+Copyright 2017-2018, Voxel51, LLC
+voxel51.com
+'''
+# pragma pylint: disable=redefined-builtin
+# pragma pylint: disable=unused-wildcard-import
+# pragma pylint: disable=wildcard-import
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import *
+# pragma pylint: enable=redefined-builtin
+# pragma pylint: enable=unused-wildcard-import
+# pragma pylint: enable=wildcard-import
+
+import unittest
+
+import numpy as np
+
+from eta.core.frames import FrameSet, FrameSetError
+
+
+class FrameSetTest(unittest.TestCase):
+    '''Tests FrameSet.'''
+
+    def _random_frames(self, rng, max_frame=60):
+        return set(
+            rng.choice(
+                np.arange(1, max_frame + 1), size=rng.randint(0, max_frame),
+                replace=False).tolist())
+
+    def test_ranges_are_merged(self):
+        frames = FrameSet([8, 1, 4, 12], [10, 3, 6, 12])
+
+        self.assertEqual(frames.firsts.tolist(), [1, 8, 12])
+        self.assertEqual(frames.lasts.tolist(), [6, 10, 12])
+        self.assertEqual(frames.num_ranges, 3)
+        self.assertEqual(len(frames), 10)
+        self.assertEqual(frames.first, 1)
+        self.assertEqual(frames.last, 12)
+
+    def test_membership(self):
+        frames = FrameSet.from_str("2-4,7,10-12")
+
+        members = [f for f in range(0, 15) if f in frames]
+        self.assertEqual(members, [2, 3, 4, 7, 10, 11, 12])
+        self.assertEqual(
+            frames.contains(np.arange(0, 15)).tolist(),
+            [f in members for f in range(0, 15)])
+        self.assertFalse(FrameSet().contains([1, 2]).any())
+
+    def test_set_algebra_matches_python_sets(self):
+        rng = np.random.RandomState(0)
+        for _ in range(200):
+            a = self._random_frames(rng)
+            b = self._random_frames(rng)
+            fa = FrameSet.from_list(list(a))
+            fb = FrameSet.from_list(list(b))
+
+            self.assertEqual((fa | fb).to_list(), sorted(a | b))
+            self.assertEqual((fa & fb).to_list(), sorted(a & b))
+            self.assertEqual((fa - fb).to_list(), sorted(a - b))
+            self.assertEqual(
+                fa.complement(50).to_list(),
+                sorted(set(range(1, 51)) - a))
+
+    def test_empty_sets(self):
+        empty = FrameSet()
+        frames = FrameSet.from_str("1-3")
+
+        self.assertFalse(empty)
+        self.assertEqual(len(empty), 0)
+        self.assertIsNone(empty.first)
+        self.assertEqual(empty | frames, frames)
+        self.assertEqual(empty & frames, empty)
+        self.assertEqual(frames - frames, empty)
+        self.assertEqual(frames.complement(0), empty)
+
+    def test_conversions_round_trip(self):
+        frames = FrameSet.from_str("1-3,6,8-10")
+
+        self.assertEqual(frames.to_str(), "1-3,6,8-10")
+        self.assertEqual(list(frames), [1, 2, 3, 6, 8, 9, 10])
+        self.assertEqual(frames.to_list(), [1, 2, 3, 6, 8, 9, 10])
+        self.assertEqual(FrameSet.from_list([10, 9, 8, 6, 3, 2, 1, 1]), frames)
+        self.assertEqual(
+            FrameSet.from_ranges(frames.iter_ranges()), frames)
+        self.assertEqual(FrameSet.from_bools(frames.to_bools()), frames)
+        self.assertEqual(frames.to_bools(4).tolist(), [True] * 3 + [False])
+
+    def test_invalid_sets(self):
+        with self.assertRaises(FrameSetError):
+            FrameSet([3], [1])
+
+        with self.assertRaises(FrameSetError):
+            FrameSet([1, 2], [3])
+
+        with self.assertRaises(FrameSetError):
+            FrameSet.from_str("1-a")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+'''
+Tests for `eta.core.numutils`.
+
+Run with `python -m unittest discover tests`.
+
+Copyright 2017-2018, Voxel51, LLC
+voxel51.com
+'''
+# pragma pylint: disable=redefined-builtin
+# pragma pylint: disable=unused-wildcard-import
+# pragma pylint: disable=wildcard-import
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import *
+# pragma pylint: enable=redefined-builtin
+# pragma pylint: enable=unused-wildcard-import
+# pragma pylint: enable=wildcard-import
+
+import unittest
+
+import numpy as np
+
+from eta.core.numutils import GrowableArray, GrowableArrayError
+
+
+class GrowableArrayTest(unittest.TestCase):
+    '''Tests GrowableArray.'''
+
+    def test_default_dtype_is_float64(self):
+        arr = GrowableArray(2)
+        arr.update([1, 2])
+        arr.update([0.5, 1.5])
+        X = arr.finalize()
+
+        self.assertEqual(X.dtype, np.float64)
+        np.testing.assert_array_equal(X, [[1, 2], [0.5, 1.5]])
+        self.assertEqual(GrowableArray(2).finalize().dtype, np.float64)
+
+    def test_explicit_dtype(self):
+        arr = GrowableArray(3, dtype=np.float32)
+        arr.update(np.arange(3, dtype=np.float64))
+
+        self.assertEqual(arr.finalize().dtype, np.float32)
+
+    def test_growth(self):
+        expected = np.arange(60, dtype=np.float64).reshape(20, 3)
+
+        arr = GrowableArray(3, capacity=2)
+        for idx in range(0, 20, 4):
+            arr.update(expected[idx])
+            self.assertEqual(len(arr), idx + 1)
+            arr.update_rows(expected[idx + 1:idx + 4])
+            self.assertEqual(len(arr), idx + 4)
+
+        np.testing.assert_array_equal(arr.finalize(), expected)
+
+    def test_finalize(self):
+        arr = GrowableArray(2, capacity=4)
+        self.assertEqual(arr.finalize().shape, (0, 2))
+
+        arr.update_rows([[1, 2], [3, 4], [5, 6]])
+        self.assertEqual(arr.finalize().shape, (3, 2))
+
+        arr.update([7, 8])
+        self.assertEqual(arr.finalize().shape, (4, 2))
+
+    def test_invalid_rows(self):
+        arr = GrowableArray(2)
+
+        with self.assertRaises(GrowableArrayError):
+            arr.update([1, 2, 3])
+
+        with self.assertRaises(GrowableArrayError):
+            arr.update_rows([1, 2])
+
+        with self.assertRaises(GrowableArrayError):
+            arr.update_rows([[1, 2, 3]])
+
+        self.assertEqual(len(arr), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
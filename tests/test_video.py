@@ -0,0 +1,483 @@
+'''
+Tests for `eta.core.video`.
+
+Run with `python -m unittest discover tests`. The tests require ffmpeg.
+
+Copyright 2017-2018, Voxel51, LLC
+voxel51.com
+'''
+# pragma pylint: disable=redefined-builtin
+# pragma pylint: disable=unused-wildcard-import
+# pragma pylint: disable=wildcard-import
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import *
+# pragma pylint: enable=redefined-builtin
+# pragma pylint: enable=unused-wildcard-import
+# pragma pylint: enable=wildcard-import
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import eta.core.image as etai
+import eta.core.utils as etau
+import eta.core.video as etav
+
+
+def make_test_video(outpath, size, fps, num_frames):
+    '''Writes a test pattern video with the given [width, height], frame
+    rate, and number of frames.
+    '''
+    ffmpeg = etav.FFmpeg(in_opts=["-f", "lavfi"])
+    ffmpeg.run(
+        "testsrc=size=%dx%d:rate=%d" % (size[0], size[1], fps) +
+        ":duration=%g" % (num_frames / fps),
+        outpath)
+
+
+class FrameRangesTest(unittest.TestCase):
+    '''Tests FrameRanges.'''
+
+    def _iterate(self, ranges):
+        frames = []
+        new_ranges = []
+        for frame in ranges:
+            frames.append(frame)
+            if ranges.is_new_frame_range:
+                new_ranges.append(ranges.frame_range)
+
+        return frames, new_ranges
+
+    def test_iteration(self):
+        ranges = etav.FrameRanges.from_str("1-3,4,6-7")
+        self.assertEqual(ranges.frame, -1)
+        self.assertEqual(ranges.frame_range, (-1, -1))
+
+        frames, new_ranges = self._iterate(ranges)
+        self.assertEqual(frames, [1, 2, 3, 4, 6, 7])
+        self.assertEqual(new_ranges, [(1, 3), (4, 4), (6, 7)])
+        self.assertEqual(ranges.frame, 7)
+        self.assertEqual(list(etav.FrameRanges([])), [])
+
+    def test_open_ended(self):
+        ranges = etav.FrameRanges.from_str("2,5-")
+        self.assertTrue(ranges.is_open_ended)
+        self.assertEqual(ranges.to_str(), "2,5-")
+        self.assertEqual(
+            [next(ranges) for _ in range(4)], [2, 5, 6, 7])
+        self.assertEqual(ranges.frame_range, (5, None))
+
+        with self.assertRaises(etav.FrameRangesError):
+            ranges.to_frame_set()
+
+        with self.assertRaises(etav.FrameRangesError):
+            etav.FrameRanges([(1, None), (5, 6)])
+
+    def test_membership_and_conversions(self):
+        ranges = etav.FrameRanges.from_str("2-4,5,9-")
+        self.assertEqual(
+            [f for f in range(1, 12) if f in ranges], [2, 3, 4, 5, 9, 10, 11])
+
+        ranges = etav.FrameRanges.from_str("2-4,5,9")
+        self.assertEqual(list(ranges.iter_ranges()), [(2, 4), (5, 5), (9, 9)])
+        self.assertEqual(ranges.to_list(), [2, 3, 4, 5, 9])
+        self.assertEqual(ranges.to_frame_set().to_str(), "2-5,9")
+        self.assertEqual(
+            etav.FrameRanges.from_list([9, 3, 2, 4]).to_str(), "2-4,9")
+
+
+class StreamInfoBatchTest(unittest.TestCase):
+    '''Tests batch stream info probing.'''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.video_paths = []
+        for idx, (size, num_frames) in enumerate(
+                [((64, 48), 20), ((32, 32), 7), ((48, 64), 13)]):
+            video_path = os.path.join(self.tmp_dir, "%d.mp4" % idx)
+            make_test_video(video_path, size, 10, num_frames)
+            self.video_paths.append(video_path)
+
+    def tearDown(self):
+        etau.delete_dir(self.tmp_dir)
+
+    def test_batch_matches_single_probes(self):
+        batch = etav.get_stream_info_batch(
+            self.video_paths, max_workers=2, use_cache=False)
+        single = [
+            etav.get_stream_info(video_path, use_cache=False)
+            for video_path in self.video_paths]
+
+        self.assertEqual(batch, single)
+
+    def test_build_for_batch_preserves_order(self):
+        infos = etav.VideoStreamInfo.build_for_batch(
+            self.video_paths, use_cache=False)
+
+        self.assertEqual(
+            [info.frame_size for info in infos],
+            [(64, 48), (32, 32), (48, 64)])
+
+    def test_batch_does_not_count_packets(self):
+        # MKV containers do not report their number of frames
+        video_paths = []
+        for idx, num_frames in enumerate([20, 7]):
+            video_path = os.path.join(self.tmp_dir, "%d.mkv" % idx)
+            make_test_video(video_path, (32, 32), 10, num_frames)
+            video_paths.append(video_path)
+
+        counted = []
+        count_packets = etav._count_packets
+        etav._count_packets = lambda inpath: counted.append(inpath)
+        try:
+            batch = etav.get_stream_info_batch(video_paths, use_cache=False)
+            infos = etav.VideoStreamInfo.build_for_batch(
+                video_paths, use_cache=False)
+        finally:
+            etav._count_packets = count_packets
+
+        self.assertEqual(counted, [])
+        self.assertEqual(batch, [info.stream_info for info in infos])
+        self.assertEqual(
+            [info.total_frame_count for info in infos], [20, 7])
+        self.assertEqual(
+            [info.frame_count_method for info in infos],
+            ["packets", "packets"])
+
+    def test_empty_batch(self):
+        self.assertEqual(etav.get_stream_info_batch([]), [])
+
+
+class FrameCountTest(unittest.TestCase):
+    '''Tests computing frame counts and reading videos whose frame count is
+    an estimate.
+    '''
+
+    NUM_FRAMES = 20
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+        # MKV containers do not report their number of frames
+        self.video_path = os.path.join(self.tmp_dir, "testsrc.mkv")
+        make_test_video(self.video_path, (64, 48), 10, self.NUM_FRAMES)
+
+        self._try_count_packets = etav._try_count_packets
+        etav.invalidate_stream_info_cache()
+
+    def tearDown(self):
+        etav._try_count_packets = self._try_count_packets
+        etav.invalidate_stream_info_cache()
+        etau.delete_dir(self.tmp_dir)
+
+    def _assume_frame_count(self, count):
+        # Simulate a video whose packets cannot be counted and whose duration
+        # yields the given frame count
+        etav._try_count_packets = lambda inpath: None
+        stream_info = etav.get_stream_info(self.video_path)
+        stream_info[etav.FRAME_COUNT_KEY] = count
+        stream_info[etav.FRAME_COUNT_METHOD_KEY] = "duration"
+        etav._STREAM_INFO_CACHE.put(self.video_path, stream_info)
+
+    def test_probe_does_not_count_packets(self):
+        stream_info = etav.get_stream_info(self.video_path, use_cache=False)
+        self.assertNotIn(
+            stream_info[etav.FRAME_COUNT_METHOD_KEY],
+            etav.EXACT_FRAME_COUNT_METHODS)
+
+    def test_packets_are_counted_on_demand(self):
+        info = etav.VideoStreamInfo.build_for(self.video_path)
+        self.assertEqual(info.total_frame_count, self.NUM_FRAMES)
+        self.assertEqual(info.frame_count_method, "packets")
+        self.assertTrue(info.is_frame_count_exact)
+
+        # The count is cached along with the rest of the stream info
+        stream_info = etav.get_stream_info(self.video_path)
+        self.assertEqual(stream_info[etav.FRAME_COUNT_METHOD_KEY], "packets")
+
+    def test_read_all_frames_stops_at_end_of_video(self):
+        for count in (self.NUM_FRAMES - 5, self.NUM_FRAMES + 5):
+            self._assume_frame_count(count)
+            for reader_cls in (etav.FFmpegVideoReader, etav.OpenCVVideoReader):
+                with reader_cls(self.video_path) as r:
+                    self.assertFalse(r.is_frame_count_exact)
+                    frame_numbers = [r.frame_number for _ in r]
+
+                self.assertEqual(
+                    frame_numbers, list(range(1, self.NUM_FRAMES + 1)))
+
+    def test_open_ended_frames(self):
+        with etav.FFmpegVideoReader(self.video_path, frames="3,15-") as r:
+            frame_numbers = [r.frame_number for _ in r]
+            self.assertEqual(r.frame_range, (15, None))
+
+        self.assertEqual(frame_numbers, [3] + list(range(15, 21)))
+
+    def test_bounded_frames_past_end_of_video_raise(self):
+        with etav.FFmpegVideoReader(self.video_path, frames="15-25") as r:
+            with self.assertRaises(etav.VideoReaderError):
+                for _ in r:
+                    pass
+
+    def test_open_ended_clips_are_named_by_last_frame(self):
+        self._assume_frame_count(self.NUM_FRAMES + 5)
+        clips_path = os.path.join(self.tmp_dir, "clips", "%02d-%02d.mp4")
+        with etav.VideoProcessor(
+                self.video_path, out_clips_path=clips_path) as p:
+            for img in p:
+                p.write(img)
+
+        self.assertEqual(
+            os.listdir(os.path.dirname(clips_path)), ["01-20.mp4"])
+
+
+class VideoOutputSpecTest(unittest.TestCase):
+    '''Tests writing the outputs described by VideoOutputSpecs.'''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.tmp_dir, "testsrc.mp4")
+        make_test_video(self.video_path, (64, 48), 10, 20)
+
+    def tearDown(self):
+        etau.delete_dir(self.tmp_dir)
+
+    def _process(self, out_specs, out_images_workers=0):
+        with etav.VideoProcessor(
+                self.video_path, out_specs=out_specs,
+                out_images_workers=out_images_workers) as p:
+            for img in p:
+                p.write(img)
+
+    def test_frame_subsets(self):
+        images_dir = os.path.join(self.tmp_dir, "images")
+        clips_dir = os.path.join(self.tmp_dir, "clips")
+        self._process([
+            etav.VideoOutputSpec(
+                images_path=os.path.join(images_dir, "%02d.png"),
+                clips_path=os.path.join(clips_dir, "%02d-%02d.mp4"),
+                frames="3-5,9,15-16"),
+        ], out_images_workers=2)
+
+        self.assertEqual(
+            sorted(os.listdir(images_dir)),
+            ["03.png", "04.png", "05.png", "09.png", "15.png", "16.png"])
+        self.assertEqual(
+            sorted(os.listdir(clips_dir)),
+            ["03-05.mp4", "09-09.mp4", "15-16.mp4"])
+        self.assertEqual(
+            etav.get_frame_count(os.path.join(clips_dir, "03-05.mp4")), 3)
+
+    def test_frame_rate_and_size(self):
+        images_dir = os.path.join(self.tmp_dir, "images")
+        self._process([
+            etav.VideoOutputSpec(
+                images_path=os.path.join(images_dir, "%02d.jpg"),
+                fps=5, size=(32, -1)),
+        ])
+
+        filenames = sorted(os.listdir(images_dir))
+        self.assertEqual(len(filenames), 10)
+        img = etai.read(os.path.join(images_dir, filenames[0]))
+        self.assertEqual(img.shape, (24, 32, 3))
+
+
+def invert_frame(img):
+    '''Inverts the given frame. Used by ParallelVideoProcessorTest.'''
+    return 255 - img
+
+
+class ParallelVideoProcessorTest(unittest.TestCase):
+    '''Tests splitting videos into segments for ParallelVideoProcessor.'''
+
+    NUM_FRAMES = 20
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.tmp_dir, "testsrc.mp4")
+        self.outpath = os.path.join(self.tmp_dir, "out.mp4")
+
+        # Keyframes at frames 1, 6, 11, and 16
+        ffmpeg = etav.FFmpeg(
+            in_opts=["-f", "lavfi"],
+            out_opts=etav.VIDEO_ENCODING_PROFILES["intermediate"] + [
+                "-g", "5", "-sc_threshold", "0"])
+        ffmpeg.run(
+            "testsrc=size=64x48:rate=10:duration=%g" % (self.NUM_FRAMES / 10),
+            self.video_path)
+
+        self._try_count_packets = etav._try_count_packets
+        etav.invalidate_stream_info_cache()
+
+    def tearDown(self):
+        etav._try_count_packets = self._try_count_packets
+        etav.invalidate_stream_info_cache()
+        etau.delete_dir(self.tmp_dir)
+
+    def _assume_frame_count(self, count):
+        etav._try_count_packets = lambda inpath: None
+        stream_info = etav.get_stream_info(self.video_path)
+        stream_info[etav.FRAME_COUNT_KEY] = count
+        stream_info[etav.FRAME_COUNT_METHOD_KEY] = "duration"
+        etav._STREAM_INFO_CACHE.put(self.video_path, stream_info)
+
+    def _build(self, num_segments):
+        return etav.ParallelVideoProcessor(
+            self.video_path, self.outpath, invert_frame, num_workers=2,
+            num_segments=num_segments)
+
+    def test_exact_frame_count(self):
+        self.assertEqual(
+            self._build(4).get_segments(),
+            [(1, 5), (6, 10), (11, 15), (16, 20)])
+
+    def test_estimated_frame_count(self):
+        for count in (self.NUM_FRAMES - 8, self.NUM_FRAMES + 20):
+            self._assume_frame_count(count)
+            segments = self._build(4).get_segments()
+
+            self.assertEqual(segments[-1][1], None)
+            self.assertTrue(
+                all(first in (1, 6, 11, 16) for first, _ in segments))
+
+    def test_estimated_frame_count_without_keyframes(self):
+        self._assume_frame_count(self.NUM_FRAMES + 20)
+        get_keyframe_numbers = etav.get_keyframe_numbers
+        etav.get_keyframe_numbers = lambda inpath: [1]
+        try:
+            segments = self._build(4).get_segments()
+        finally:
+            etav.get_keyframe_numbers = get_keyframe_numbers
+
+        self.assertEqual(segments, [(1, None)])
+
+    def test_run_with_estimated_frame_count(self):
+        self._assume_frame_count(self.NUM_FRAMES + 20)
+        self._build(2).run()
+
+        with etav.FFmpegVideoReader(self.outpath) as r:
+            self.assertEqual(len([img for img in r]), self.NUM_FRAMES)
+
+
+class SlidingWindowClipsTest(unittest.TestCase):
+    '''Tests sampling sliding window clips.'''
+
+    NUM_FRAMES = 23
+
+    def setUp(self):
+        # Frame i is filled with the value i, so clips are easy to check
+        self.frames = (
+            np.arange(self.NUM_FRAMES, dtype=np.uint8)[:, None, None, None] *
+            np.ones((1, 4, 6, 3), dtype=np.uint8))
+
+    def _expected_clips(self, k, stride):
+        return np.array([
+            self.frames[offset:offset + k]
+            for offset in range(0, self.NUM_FRAMES + 1 - k, stride)])
+
+    def test_batches_match_sliding_window(self):
+        for k, stride in [(5, 2), (4, 4), (3, 7), (23, 1)]:
+            expected = self._expected_clips(k, stride)
+            for batch_size in [1, 2, 3, 16]:
+                batches = [
+                    np.array(batch) for batch in
+                    etav.iter_sliding_window_clips(
+                        self.frames, k, stride, batch_size=batch_size)]
+
+                self.assertTrue(
+                    all(len(batch) <= batch_size for batch in batches))
+                np.testing.assert_array_equal(
+                    np.concatenate(batches), expected)
+
+    def test_batches_are_read_only(self):
+        batch = next(etav.iter_sliding_window_clips(self.frames, 5, 2))
+        self.assertFalse(batch.flags.writeable)
+
+    def test_short_video_has_no_clips(self):
+        clips = etav.iter_sliding_window_clips(
+            self.frames, self.NUM_FRAMES + 1, 1)
+        self.assertEqual(list(clips), [])
+
+    def test_sample_frames_returns_all_clips(self):
+        clips = etav.sliding_window_sample_frames(self.frames, 5, 3)
+        np.testing.assert_array_equal(clips, self._expected_clips(5, 3))
+
+    def test_video_file_matches_frames(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            video_path = os.path.join(tmp_dir, "testsrc.mp4")
+            make_test_video(video_path, (64, 48), 10, 20)
+            with etav.FFmpegVideoReader(video_path) as r:
+                frames = np.array([img for img in r])
+
+            from_file = np.concatenate([
+                np.array(batch) for batch in etav.iter_sliding_window_clips(
+                    video_path, 8, 3, batch_size=2)])
+            from_frames = np.concatenate([
+                np.array(batch) for batch in etav.iter_sliding_window_clips(
+                    frames, 8, 3, batch_size=2)])
+        finally:
+            etau.delete_dir(tmp_dir)
+
+        self.assertEqual(from_file.shape, (5, 8, 48, 64, 3))
+        np.testing.assert_array_equal(from_file, from_frames)
+
+
+class VideoReaderOpenTest(unittest.TestCase):
+    '''Tests VideoReader.open() on a real video file.'''
+
+    SIZE = (64, 48)
+    FPS = 10
+    NUM_FRAMES = 20
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.tmp_dir, "testsrc.mp4")
+        self.calibration_path = os.path.join(
+            self.tmp_dir, "calibration.json")
+        make_test_video(
+            self.video_path, self.SIZE, self.FPS, self.NUM_FRAMES)
+
+        self._calibration = etav._VIDEO_READER_CALIBRATION
+        etav._VIDEO_READER_CALIBRATION = etav.VideoReaderCalibration(
+            path=self.calibration_path)
+
+    def tearDown(self):
+        etav._VIDEO_READER_CALIBRATION = self._calibration
+        etau.delete_dir(self.tmp_dir)
+
+    def test_open_reads_all_frames(self):
+        with etav.VideoReader.open(self.video_path) as r:
+            imgs = [img for img in r]
+
+        self.assertEqual(len(imgs), self.NUM_FRAMES)
+        self.assertEqual(imgs[0].shape, self.SIZE[::-1] + (3,))
+        self.assertTrue(os.path.isfile(self.calibration_path))
+
+    def test_open_reads_sparse_frames(self):
+        frames = [1, 7, 15]
+        with etav.VideoReader.open(self.video_path, frames=frames) as r:
+            frame_numbers = [r.frame_number for _ in r]
+
+        self.assertEqual(frame_numbers, frames)
+
+    def test_open_with_ffmpeg_only_args(self):
+        with etav.VideoReader.open(self.video_path, size=(32, -1)) as r:
+            self.assertIsInstance(r, etav.FFmpegVideoReader)
+            self.assertEqual(r.read().shape, (24, 32, 3))
+
+    def test_calibration_measures_both_backends(self):
+        throughputs = etav._VIDEO_READER_CALIBRATION.get_throughputs(
+            self.video_path, "dense")
+
+        self.assertEqual(set(throughputs), {"ffmpeg", "opencv"})
+        self.assertGreater(throughputs["ffmpeg"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()